@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""A stand-in for mkvmerge used by the benchmarks.
+
+It answers ``-V``, ``--help``, and ``-J`` like mkvmerge does and accepts any other command as a successful mux without
+writing anything. No media is read, ``-J`` returns the same canned identification for every file. It is configured
+with environment variables:
+
+FAKE_MKVMERGE_LATENCY
+    The number of seconds each call sleeps before answering, to simulate a real mkvmerge scanning a file.
+FAKE_MKVMERGE_TRACKS
+    The number of tracks in the canned identification. The tracks cycle through video, audio, and subtitles.
+FAKE_MKVMERGE_LOG
+    A file that gets one line appended for every call, so the number of processes started can be counted.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+VERSION = "mkvmerge v70.0.0 ('Caught A Lite Sneeze') 64-bit"
+
+HELP = """mkvmerge -o out [global options] [options1] <file1> [@option-file.json] ...
+
+ Global options:
+  -v, --verbose            Increase verbosity.
+  -q, --quiet              Suppress status output.
+  -o, --output out         Write to the file 'out'.
+  --title <title>          Title for this destination file.
+  --track-order <FileID1:TID1,FileID2:TID2,FileID3:TID3,...>
+  --split <d[K,M,G]|HH:MM:SS|s>
+  --link                   Link splitted files.
+  --gui-mode               In this mode specially-formatted lines may be output.
+  -J <file>                Identify a file and output JSON.
+"""
+
+CODECS = {
+    'video': ('AVC/H.264/MPEG-4p10', 'V_MPEG4/ISO/AVC'),
+    'audio': ('AAC', 'A_AAC'),
+    'subtitles': ('SubRip/SRT', 'S_TEXT/UTF8'),
+}
+
+
+def identification(file_path, track_count):
+    """Get the canned ``mkvmerge -J`` output for a file."""
+    tracks = []
+    for track_id in range(track_count):
+        track_type = ('video', 'audio', 'subtitles')[track_id % 3]
+        codec, codec_id = CODECS[track_type]
+        tracks.append({
+            'id': track_id,
+            'type': track_type,
+            'codec': codec,
+            'properties': {
+                'codec_id': codec_id,
+                'language': 'eng' if track_id % 2 else 'jpn',
+                'default_track': track_id < 3,
+                'forced_track': False,
+                'number': track_id + 1,
+                'uid': 1000 + track_id,
+            },
+        })
+    return {
+        'attachments': [],
+        'chapters': [],
+        'container': {
+            'properties': {'title': os.path.basename(file_path)},
+            'recognized': True,
+            'supported': True,
+            'type': 'Matroska',
+        },
+        'errors': [],
+        'file_name': file_path,
+        'global_tags': [],
+        'identification_format_version': 17,
+        'track_tags': [],
+        'tracks': tracks,
+        'warnings': [],
+    }
+
+
+def main(args):
+    log_path = os.environ.get('FAKE_MKVMERGE_LOG')
+    if log_path:
+        with open(log_path, 'a') as log_file:
+            log_file.write(' '.join(args) + '\n')
+    time.sleep(float(os.environ.get('FAKE_MKVMERGE_LATENCY', '0')))
+
+    if args == ['-V']:
+        print(VERSION)
+    elif args == ['--help']:
+        print(HELP)
+    elif len(args) == 2 and args[0] == '-J':
+        print(json.dumps(identification(args[1], int(os.environ.get('FAKE_MKVMERGE_TRACKS', '3')))))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,246 @@
+"""Measure the speed of opening files, building commands, timestamps, and split options.
+
+mkvmerge is replaced by ``benchmarks/fake_mkvmerge.py``, which returns a canned identification after a configurable
+delay, so no real media, MKVToolNix install, or network is needed. Every process the fake is started for is logged,
+which makes the number of mkvmerge launches per operation part of the results. Run it from the root of the repository:
+
+    python benchmarks/speed.py
+
+Save the results and compare a later run against them to catch regressions. The comparison fails if a time grew by
+more than the tolerance or if more mkvmerge processes were started than before:
+
+    python benchmarks/speed.py --save baseline.json
+    python benchmarks/speed.py --compare baseline.json --tolerance 1.5
+
+The benchmarks are:
+
+open
+    ``MKVFile(path)`` of files that have not been identified yet and again once they have, with the number of
+    mkvmerge processes started for each. The cold time includes starting the Python interpreter of the fake.
+command
+    ``MKVFile.command()`` of a plan with many tracks, the first time and when it is built again unchanged.
+timestamp
+    Parsing, comparing, and formatting :class:`~pymkv.Timestamp` objects, per timestamp.
+split
+    The ``split_*`` option builders for an increasing number of split points. The time per split point should stay
+    flat as the count grows.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pymkv import MKVFile, MKVTrack, Timestamp  # noqa: E402
+from pymkv.cache import probe_cache  # noqa: E402
+from pymkv.Verifications import identify, invalidate_executables  # noqa: E402
+
+
+FAKE_MKVMERGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_mkvmerge.py')
+
+
+class FakeEnvironment:
+    """A temporary directory with the fake mkvmerge first in $PATH and placeholder media files.
+
+    The placeholder files are not Matroska, so the native reader gives up on them and mkvmerge is always run.
+    """
+
+    def __init__(self, latency, track_count):
+        self.latency = latency
+        self.track_count = track_count
+        self.directory = None
+        self.log_path = None
+        self._environ = None
+
+    def __enter__(self):
+        self.directory = tempfile.mkdtemp(prefix='pymkv-bench-')
+        bin_directory = os.path.join(self.directory, 'bin')
+        os.mkdir(bin_directory)
+        os.symlink(FAKE_MKVMERGE, os.path.join(bin_directory, 'mkvmerge'))
+        self.log_path = os.path.join(self.directory, 'mkvmerge.log')
+        open(self.log_path, 'w').close()
+
+        self._environ = dict(os.environ)
+        os.environ['PATH'] = bin_directory + os.pathsep + os.environ.get('PATH', '')
+        os.environ['FAKE_MKVMERGE_LATENCY'] = str(self.latency)
+        os.environ['FAKE_MKVMERGE_TRACKS'] = str(self.track_count)
+        os.environ['FAKE_MKVMERGE_LOG'] = self.log_path
+        invalidate_executables()
+        probe_cache.clear()
+        return self
+
+    def __exit__(self, *exc_info):
+        os.environ.clear()
+        os.environ.update(self._environ)
+        invalidate_executables()
+        probe_cache.clear()
+        shutil.rmtree(self.directory)
+
+    def media(self, count):
+        """Create placeholder media files and get their paths."""
+        paths = []
+        for number in range(count):
+            path = os.path.join(self.directory, 'file{}.mkv'.format(number))
+            with open(path, 'wb') as media_file:
+                media_file.write(b'not matroska')
+            paths.append(path)
+        return paths
+
+    def launches(self):
+        """Get the number of times the fake mkvmerge has been started."""
+        with open(self.log_path) as log_file:
+            return sum(1 for _ in log_file)
+
+
+def best(function, repeat=5):
+    """Get the shortest time in seconds `function` takes over `repeat` runs."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_open(environment, count):
+    paths = environment.media(count)
+    before = environment.launches()
+    start = time.perf_counter()
+    for path in paths:
+        MKVFile(path)
+    cold = (time.perf_counter() - start) / count
+    cold_launches = (environment.launches() - before) / count
+
+    before = environment.launches()
+    start = time.perf_counter()
+    for path in paths:
+        MKVFile(path)
+    warm = (time.perf_counter() - start) / count
+    warm_launches = (environment.launches() - before) / count
+    return {
+        'open.cold.seconds': cold,
+        'open.cold.launches': cold_launches,
+        'open.warm.seconds': warm,
+        'open.warm.launches': warm_launches,
+    }
+
+
+def bench_command(environment, track_count):
+    # many tracks from many files, made from one identification so only command() is timed
+    path = environment.media(1)[0]
+    info_json = identify(path)
+    files_needed = -(-track_count // len(info_json['tracks']))
+    mkv = MKVFile()
+    for number in range(files_needed):
+        for track in info_json['tracks']:
+            mkv.tracks.append(MKVTrack.from_probe('/media/file{}.mkv'.format(number), info_json,
+                                                  track_id=track['id']))
+    del mkv.tracks[track_count:]
+    mkv.tracks.reverse()
+
+    start = time.perf_counter()
+    mkv.command('/media/output.mkv', subprocess=True)
+    first = time.perf_counter() - start
+    return {
+        'command.first.seconds': first,
+        'command.repeat.seconds': best(lambda: mkv.command('/media/output.mkv', subprocess=True)),
+        'command.minimal.seconds': best(lambda: mkv.command('/media/output.mkv', subprocess=True, minimal=True)),
+    }
+
+
+def bench_timestamp(count):
+    strings = ['{:02d}:{:02d}:{:02d}.{:03d}'.format(number // 3600 % 24, number // 60 % 60, number % 60,
+                                                    number % 1000)
+               for number in range(count)]
+    timestamps = [Timestamp(string) for string in strings]
+    return {
+        'timestamp.parse.seconds_per_timestamp': best(lambda: [Timestamp(string) for string in strings]) / count,
+        'timestamp.compare.seconds_per_timestamp': best(lambda: sorted(timestamps)) / count,
+        'timestamp.format.seconds_per_timestamp': best(lambda: [Timestamp(timestamp).ts
+                                                                for timestamp in timestamps]) / count,
+    }
+
+
+def bench_split(sizes):
+    mkv = MKVFile()
+    results = {}
+    for size in sizes:
+        timestamps = [Timestamp.from_ns(number * 1000000000).ts for number in range(1, size + 1)]
+        frames = list(range(1, size + 1))
+        timestamp_parts = [[timestamps[number], timestamps[number + 1]] for number in range(0, size - 1, 2)]
+        frame_parts = [[frames[number], frames[number + 1]] for number in range(0, size - 1, 2)]
+        for name, split in (('split_timestamps', lambda: mkv.split_timestamps(timestamps)),
+                            ('split_frames', lambda: mkv.split_frames(frames)),
+                            ('split_chapters', lambda: mkv.split_chapters(frames)),
+                            ('split_timestamp_parts', lambda: mkv.split_timestamp_parts(timestamp_parts)),
+                            ('split_parts_frames', lambda: mkv.split_parts_frames(frame_parts))):
+            results['split.{}.{}.seconds_per_point'.format(name, size)] = best(split, repeat=3) / size
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Get the results that regressed from a baseline."""
+    regressions = []
+    for name, value in sorted(results.items()):
+        if name not in baseline:
+            continue
+        if name.endswith('.launches') and value > baseline[name]:
+            regressions.append('{}: {:g} launches, was {:g}'.format(name, value, baseline[name]))
+        elif not name.endswith('.launches') and value > baseline[name] * tolerance:
+            regressions.append('{}: {:.3g}s, was {:.3g}s'.format(name, value, baseline[name]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pymkv against a fake mkvmerge.')
+    parser.add_argument('--latency', type=float, default=0.01,
+                        help='seconds each fake mkvmerge call takes (default: %(default)s)')
+    parser.add_argument('--tracks', type=int, default=8,
+                        help='tracks in each identified file (default: %(default)s)')
+    parser.add_argument('--files', type=int, default=50, help='files opened (default: %(default)s)')
+    parser.add_argument('--plan-tracks', type=int, default=10000,
+                        help='tracks in the command plan (default: %(default)s)')
+    parser.add_argument('--quick', action='store_true', help='use smaller sizes for a fast run')
+    parser.add_argument('--save', metavar='PATH', help='save the results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results to ones saved with --save')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='how many times slower a result may be than the saved one (default: %(default)s)')
+    args = parser.parse_args()
+
+    files = 10 if args.quick else args.files
+    plan_tracks = 1000 if args.quick else args.plan_tracks
+    split_sizes = (100, 1000, 10000) if args.quick else (100, 1000, 10000, 100000)
+    timestamp_count = 10000 if args.quick else 100000
+
+    results = {}
+    with FakeEnvironment(args.latency, args.tracks) as environment:
+        results.update(bench_open(environment, files))
+        results.update(bench_command(environment, plan_tracks))
+        results.update(bench_timestamp(timestamp_count))
+        results.update(bench_split(split_sizes))
+
+    for name, value in results.items():
+        if name.endswith('.launches'):
+            print('{:<55}{:>12g}'.format(name, value))
+        else:
+            print('{:<55}{:>10.2f}us'.format(name, value * 1000000))
+
+    if args.save:
+        with open(args.save, 'w') as results_file:
+            json.dump(results, results_file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print('regression: ' + regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -55,6 +55,8 @@ class MKVAttachment:
         which will attach to all files.
     """
 
+    __slots__ = ('mime_type', '_file_path', 'name', 'description', 'attach_once')
+
     def __init__(self, file_path, name=None, description=None, attach_once=False):
         self.mime_type = None
         self._file_path = None
@@ -64,7 +66,7 @@ class MKVAttachment:
         self.attach_once = attach_once
 
     def __repr__(self):
-        return repr(self.__dict__)
+        return repr({name: getattr(self, name) for name in self.__slots__})
 
     @property
     def file_path(self):
@@ -33,20 +33,36 @@ Combine two MKVs. This example takes two existing MKVs and combines their tracks
 >>> mkv2 = MKVFile('/path/to/file2.mkv')
 >>> mkv1.add_file(mkv2)
 >>> mkv1.mux('/path/to/output.mkv')
+
+Extract tracks and chapters. This example extracts the subtitle tracks and the chapters of an MKV in one pass over the
+file.
+
+>>> mkv = MKVFile('/path/to/file.mkv')
+>>> subtitles = [track for track in mkv.tracks if track.track_type == 'subtitles']
+>>> mkv.extract('/path/to/directory', tracks=subtitles, chapters=True)
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import json
-from os import devnull
-from os.path import expanduser, isfile
+from os import fsencode, link, remove, replace
+from os.path import basename, dirname, expanduser, getsize, isdir, isfile, join, samefile, splitext
+import shutil
 import subprocess as sp
+from tempfile import mkstemp
 
 import bitmath
 
+from pymkv import aio
+from pymkv.executor import get_executor
 from pymkv.MKVTrack import MKVTrack
+from pymkv.progress import ProgressGroup, ProgressMonitor, output_files
 from pymkv.MKVAttachment import MKVAttachment
 from pymkv.Timestamp import Timestamp
+from pymkv.TimestampArray import TimestampArray, _integer_array
 from pymkv.ISO639_2 import is_ISO639_2
-from pymkv.Verifications import verify_matroska, verify_mkvmerge
+from pymkv.Verifications import aidentify, identify, verify_executable, verify_matroska, verify_mkvmerge
 
 
 class MKVFile:
@@ -63,7 +79,8 @@ class MKVFile:
     or :meth:`~pymkv.MKVFile.swap_tracks`.
 
     After an :class:`~pymkv.MKVFile` has been created, an mkvmerge command can be generated using
-    :meth:`~pymkv.MKVFile.command` or the file can be muxed using :meth:`~pymkv.MKVFile.mux`.
+    :meth:`~pymkv.MKVFile.command` or the file can be muxed using :meth:`~pymkv.MKVFile.mux`. Tracks, attachments, and
+    chapters can be extracted with mkvextract using :meth:`~pymkv.MKVFile.extract`.
 
     Parameters
     ----------
@@ -79,45 +96,163 @@ class MKVFile:
         Raised if the path to mkvmerge could not be verified.
     """
 
+    # the length in bytes above which a command's options are passed in an option file
+    OPTIONS_FILE_THRESHOLD = 32000
+
+    # the extensions of extracted tracks by codec, other codecs are extracted with '.bin'
+    EXTRACT_EXTENSIONS = {
+        'AVC/H.264/MPEG-4p10': '.h264', 'HEVC/H.265/MPEG-H': '.h265', 'AV1': '.ivf', 'VP8': '.ivf', 'VP9': '.ivf',
+        'MPEG-1/2': '.mpg', 'AAC': '.aac', 'AC-3': '.ac3', 'E-AC-3': '.eac3', 'DTS': '.dts', 'TrueHD': '.thd',
+        'TrueHD Atmos': '.thd', 'FLAC': '.flac', 'Opus': '.opus', 'Vorbis': '.ogg', 'MP2/MP3': '.mp3', 'MP3': '.mp3',
+        'PCM': '.wav', 'SubRip/SRT': '.srt', 'SubStationAlpha': '.ass', 'HDMV PGS': '.sup', 'VobSub': '.sub',
+        'WebVTT': '.vtt',
+    }
+
+    # the first mkvextract version that takes several modes for one source file in a single call
+    EXTRACT_MIN_VERSION = (17, 0, 0)
+
     def __init__(self, file_path=None, title=None):
         self.mkvmerge_path = 'mkvmerge'
+        self.mkvpropedit_path = 'mkvpropedit'
+        self.mkvextract_path = 'mkvextract'
         self.title = title
+        self._file_path = None
+        self._info_json = None
         self._chapters_file = None
         self._chapter_language = None
         self._global_tags_file = None
         self._link_to_previous_file = None
         self._link_to_next_file = None
+        self._split_options = []
         self.tracks = []
         self.attachments = []
+        self._probed = self._state()
         if file_path is not None and not verify_mkvmerge(mkvmerge_path=self.mkvmerge_path):
             raise FileNotFoundError('mkvmerge is not at the specified path, add it there or change the mkvmerge_path '
                                     'property')
-        if file_path is not None and verify_matroska(file_path):
-            # add file title
+        if file_path is not None:
+            # identify the file once and build every track from the same result
             file_path = expanduser(file_path)
-            info_json = json.loads(sp.check_output([self.mkvmerge_path, '-J', file_path]).decode())
-            if self.title is None and 'title' in info_json['container']['properties']:
-                self.title = info_json['container']['properties']['title']
-
-            # add tracks with info
-            for track in info_json['tracks']:
-                new_track = MKVTrack(file_path, track_id=track['id'])
-                if 'track_name' in track['properties']:
-                    new_track.track_name = track['properties']['track_name']
-                if 'language' in track['properties']:
-                    new_track.language = track['properties']['language']
-                if 'default_track' in track['properties']:
-                    new_track.default_track = track['properties']['default_track']
-                if 'forced_track' in track['properties']:
-                    new_track.forced_track = track['properties']['forced_track']
-                self.add_track(new_track)
-
-        # split options
-        self._split_options = []
+            self._load(file_path, identify(file_path, mkvmerge_path=self.mkvmerge_path))
 
     def __repr__(self):
         return repr(self.__dict__)
 
+    @classmethod
+    def from_probe(cls, file_path, info_json, title=None):
+        """Import a pre-existing MKV file from an existing mkvmerge identification.
+
+        Unlike the regular constructor, the file is not identified again. This makes it the preferred way to import
+        files identified with :func:`~pymkv.Verifications.identify_many`.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the pre-existing MKV file.
+        info_json : dict
+            The parsed output of ``mkvmerge -J`` for `file_path`.
+        title : str, optional
+            The internal title given to the :class:`~pymkv.MKVFile`. If `title` is not specified, the title of the
+            pre-existing file will be used if it exists.
+        """
+        mkv = cls(title=title)
+        mkv._load(expanduser(file_path), info_json)
+        return mkv
+
+    @classmethod
+    async def aopen(cls, file_path, title=None):
+        """Import a pre-existing MKV file without blocking the event loop.
+
+        This is the coroutine version of the :class:`~pymkv.MKVFile` constructor. The file is identified with
+        :func:`~pymkv.Verifications.aidentify`.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to a pre-existing MKV file.
+        title : str, optional
+            The internal title given to the :class:`~pymkv.MKVFile`. If `title` is not specified, the title of the
+            pre-existing file will be used if it exists.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if the path to mkvmerge could not be verified.
+        """
+        mkv = cls(title=title)
+        loop = asyncio.get_event_loop()
+        if not await loop.run_in_executor(None, verify_mkvmerge, mkv.mkvmerge_path):
+            raise FileNotFoundError('mkvmerge is not at the specified path, add it there or change the mkvmerge_path '
+                                    'property')
+        file_path = expanduser(file_path)
+        mkv._load(file_path, await aidentify(file_path, mkvmerge_path=mkv.mkvmerge_path))
+        return mkv
+
+    def _load(self, file_path, info_json):
+        if info_json['container']['type'] != 'Matroska':
+            return
+        self._file_path = file_path
+        self._info_json = info_json
+
+        # add file title
+        if self.title is None and 'title' in info_json['container']['properties']:
+            self.title = info_json['container']['properties']['title']
+
+        # add tracks with info
+        for track in info_json['tracks']:
+            self.add_track(MKVTrack.from_probe(file_path, info_json, track_id=track['id'],
+                                               mkvmerge_path=self.mkvmerge_path))
+
+        # remember the file as it is on disk to find changes later
+        self._probed = self._state()
+        self._probed['title'] = info_json['container']['properties'].get('title')
+
+    def _state(self):
+        return {
+            'title': self.title,
+            'tracks': [(track.file_path, track.track_id) for track in self.tracks],
+            'attachments': [attachment.file_path for attachment in self.attachments],
+            'chapters': self._chapters_file,
+            'chapter_language': self._chapter_language,
+            'global_tags': self._global_tags_file,
+            'link_to_previous': self._link_to_previous_file,
+            'link_to_next': self._link_to_next_file,
+            'split': list(self._split_options),
+        }
+
+    def changes(self):
+        """Get the changes made to the :class:`~pymkv.MKVFile` since it was imported.
+
+        The title, the order and source of the tracks, the added attachments, chapters, and tags, and the linking and
+        split options are compared against the imported file, or against an empty file if none was imported. The
+        changes of each track are included with their property names prefixed by the track's position, such as
+        ``'tracks[1].language'``. A title of None keeps the title of the file, so it is not a change.
+
+        Returns
+        -------
+        dict
+            The changed properties mapped to a tuple of the original value and the current value.
+        """
+        changes = {}
+        for name, current in self._state().items():
+            probed = self._probed[name]
+            if current != probed and not (name == 'title' and current is None):
+                changes[name] = (probed, current)
+        for position, track in enumerate(self.tracks):
+            for name, change in track.changes().items():
+                changes['tracks[{}].{}'.format(position, name)] = change
+        return changes
+
+    def is_dirty(self):
+        """Check if the :class:`~pymkv.MKVFile` was changed since it was imported.
+
+        Returns
+        -------
+        bool
+            True if :meth:`~pymkv.MKVFile.changes` is not empty.
+        """
+        return bool(self.changes())
+
     @property
     def chapter_language(self):
         """str: The language code of the chapters in the :class:`~pymkv.MKVFile` object.
@@ -135,15 +270,21 @@ class MKVFile:
             raise ValueError('not an ISO639-2 language code')
         self._chapter_language = language
 
-    def command(self, output_path, subprocess=False):
+    def command(self, output_path, subprocess=False, minimal=False):
         """Generates an mkvmerge command based on the configured :class:`~pymkv.MKVFile`.
 
+        Tracks from the same file are read from a single mkvmerge input, so each file is only opened and demuxed once.
+        The order of the tracks is kept with '--track-order' when it differs from the order of the inputs.
+
         Parameters
         ----------
         output_path : str
             The path to be used as the output file in the mkvmerge command.
         subprocess : bool
             Will return the command as a list so it can be used easily with the :mod:`subprocess` module.
+        minimal : bool, optional
+            Leave out options that only repeat what mkvmerge would do anyway, such as track names, languages, and
+            flags that are unchanged from the file or selecting every track of a type from the imported file.
 
         Returns
         -------
@@ -154,41 +295,37 @@ class MKVFile:
 
         output_path = expanduser(output_path)
         command = [self.mkvmerge_path, '-o', output_path]
-        if self.title is not None:
+        inputs, track_order = self._inputs()
+        # mkvmerge takes the title of the first input
+        if self.title is not None and not (minimal and self.title == self._probed['title'] and inputs
+                                           and inputs[0][0].file_path == self._file_path):
             command.extend(['--title', self.title])
-        # add tracks
-        for track in self.tracks:
-            # flags
-            if track.track_name is not None:
-                command.extend(['--track-name', str(track.track_id) + ':' + track.track_name])
-            if track.language is not None:
-                command.extend(['--language', str(track.track_id) + ':' + track.language])
-            if track.tags is not None:
-                command.extend(['--tags', str(track.track_id) + ':' + track.tags])
-            if track.default_track:
-                command.extend(['--default-track', str(track.track_id) + ':1'])
-            else:
-                command.extend(['--default-track', str(track.track_id) + ':0'])
-            if track.forced_track:
-                command.extend(['--forced-track', str(track.track_id) + ':1'])
-            else:
-                command.extend(['--forced-track', str(track.track_id) + ':0'])
+        # add tracks, with every track of a source file read from one input
+        for tracks in inputs:
+            selected = {'video': [], 'audio': [], 'subtitles': []}
+            for track in tracks:
+                # flags
+                command.extend(track.options(minimal))
+
+                if not track.resolved:
+                    # track ids are unique within a file, so selecting the id for every type keeps only this track
+                    for ids in selected.values():
+                        ids.append(str(track.track_id))
+                elif track.track_type in selected:
+                    selected[track.track_type].append(str(track.track_id))
 
             # remove extra tracks
-            if track.track_type != 'video':
-                command.append('-D')
-            else:
-                command.extend(['-d', str(track.track_id)])
-            if track.track_type != 'audio':
-                command.append('-A')
-            else:
-                command.extend(['-a', str(track.track_id)])
-            if track.track_type != 'subtitles':
-                command.append('-S')
-            else:
-                command.extend(['-s', str(track.track_id)])
+            source = self._source_tracks(tracks) if minimal else None
+            for track_type, keep, drop in (('video', '-d', '-D'), ('audio', '-a', '-A'), ('subtitles', '-s', '-S')):
+                if source is not None and sorted(selected[track_type]) == source[track_type]:
+                    continue
+                if selected[track_type]:
+                    command.extend([keep, ','.join(selected[track_type])])
+                else:
+                    command.append(drop)
 
             # exclusions
+            track = tracks[0]
             if track.no_chapters:
                 command.append('--no-chapters')
             if track.no_global_tags:
@@ -201,6 +338,10 @@ class MKVFile:
             # add path
             command.append(track.file_path)
 
+        # keep the order the tracks were added in
+        if track_order is not None:
+            command.extend(['--track-order', track_order])
+
         # add attachments
         for attachment in self.attachments:
             # info
@@ -240,7 +381,7 @@ class MKVFile:
             return command
         return " ".join(command)
 
-    def mux(self, output_path, silent=False):
+    def mux(self, output_path, silent=False, progress=None, options_file=None, unchanged=None):
         """Muxes the specified :class:`~pymkv.MKVFile`.
 
         Parameters
@@ -248,23 +389,574 @@ class MKVFile:
         output_path : str
             The path to be used as the output file in the mkvmerge command.
         silent : bool, optional
-            By default the mkvmerge output will be shown unless silent is True.
+            By default the mkvmerge command will be shown unless silent is True.
+        progress : callable, optional
+            Called with a :obj:`~pymkv.progress.Progress` update each time mkvmerge reports progress.
+        options_file : bool, optional
+            Pass the options to mkvmerge in a temporary JSON option file instead of on the command line. By default an
+            option file is only used when the command is longer than :attr:`~pymkv.MKVFile.OPTIONS_FILE_THRESHOLD`.
+        unchanged : str, optional
+            What to do instead of running mkvmerge if the :class:`~pymkv.MKVFile` was imported and has no
+            :meth:`~pymkv.MKVFile.changes`. 'skip' does nothing, 'link' hard links the imported file to `output_path`
+            or copies it if it can't be linked, and 'copy' copies it. By default mkvmerge is always run.
+
+        Returns
+        -------
+        bool
+            True if mkvmerge was run, False if the unchanged file was skipped, linked, or copied.
 
         Raises
         ------
         FileNotFoundError
             Raised if the path to mkvmerge could not be verified.
+        ValueError
+            Raised if `unchanged` is not None, 'skip', 'link', or 'copy'.
+        subprocess.CalledProcessError
+            Raised if mkvmerge exits with a non-zero return code. Its output holds the last lines mkvmerge wrote.
         """
-        if not verify_mkvmerge(mkvmerge_path=self.mkvmerge_path):
+        output_path = expanduser(output_path)
+        if self._mux_unchanged(output_path, unchanged):
+            return False
+        mkvmerge = verify_executable(self.mkvmerge_path, name='mkvmerge')
+        if mkvmerge is None:
             raise FileNotFoundError('mkvmerge is not at the specified path, add it there or change the mkvmerge_path '
                                     'property')
+        command = self.command(output_path, subprocess=True)
+        if not silent:
+            print('Running with command:\n"' + ' '.join(command) + '"')
+        if silent and progress is None:
+            with self.options_file(command, options_file) as command:
+                get_executor().run(command, stdout=sp.DEVNULL)
+            return True
+
+        # stream the output so progress is reported as it happens and only the last lines are kept
+        monitor = ProgressMonitor(output_path, callback=progress)
+        if mkvmerge.supports('--gui-mode'):
+            command.insert(1, '--gui-mode')
+        with self.options_file(command, options_file) as command:
+            try:
+                for line in get_executor().stream(command):
+                    monitor.feed(line)
+            except sp.CalledProcessError as error:
+                raise sp.CalledProcessError(error.returncode, command, monitor.output())
+        return True
+
+    async def amux(self, output_path, silent=False, progress=None, options_file=None, unchanged=None):
+        """Muxes the specified :class:`~pymkv.MKVFile` without blocking the event loop.
+
+        This is the coroutine version of :meth:`~pymkv.MKVFile.mux`. mkvmerge is run within the concurrency limit of
+        :mod:`pymkv.aio`. If the coroutine is cancelled, mkvmerge is killed and any output files it had started
+        writing are removed.
+
+        Parameters
+        ----------
+        output_path : str
+            The path to be used as the output file in the mkvmerge command.
+        silent : bool, optional
+            By default the mkvmerge command will be shown unless silent is True.
+        progress : callable, optional
+            Called with a :obj:`~pymkv.progress.Progress` update each time mkvmerge reports progress.
+        options_file : bool, optional
+            Pass the options to mkvmerge in a temporary JSON option file instead of on the command line. By default an
+            option file is only used when the command is longer than :attr:`~pymkv.MKVFile.OPTIONS_FILE_THRESHOLD`.
+        unchanged : str, optional
+            What to do instead of running mkvmerge if the :class:`~pymkv.MKVFile` was imported and has no
+            :meth:`~pymkv.MKVFile.changes`. 'skip' does nothing, 'link' hard links the imported file to `output_path`
+            or copies it if it can't be linked, and 'copy' copies it. By default mkvmerge is always run.
+
+        Returns
+        -------
+        bool
+            True if mkvmerge was run, False if the unchanged file was skipped, linked, or copied.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if the path to mkvmerge could not be verified.
+        ValueError
+            Raised if `unchanged` is not None, 'skip', 'link', or 'copy'.
+        subprocess.CalledProcessError
+            Raised if mkvmerge exits with a non-zero return code.
+        """
+        output_path = expanduser(output_path)
+        loop = asyncio.get_event_loop()
+        if await loop.run_in_executor(None, self._mux_unchanged, output_path, unchanged):
+            return False
+        command = self.command(output_path, subprocess=True)
+        if not silent:
+            print('Running with command:\n"' + ' '.join(command) + '"')
+        updates = self._amux_command(command, output_path, options_file)
+        try:
+            async for update in updates:
+                if progress is not None:
+                    progress(update)
+        finally:
+            await updates.aclose()
+        return True
+
+    def _inputs(self):
+        # group the tracks into mkvmerge inputs, tracks share an input if they come from the same file with the same
+        # exclusions and are not the same track, and find the --track-order that keeps the order of self.tracks or
+        # None if mkvmerge would use that order anyway
+        inputs = []
+        input_ids = []
+        open_inputs = {}
+        order = []
+        for track in self.tracks:
+            key = (track.file_path, track.no_chapters, track.no_global_tags, track.no_track_tags, track.no_attachments)
+            track_id = track.track_id
+            file_id = open_inputs.get(key)
+            if file_id is None or track_id in input_ids[file_id]:
+                file_id = open_inputs[key] = len(inputs)
+                inputs.append([])
+                input_ids.append(set())
+            inputs[file_id].append(track)
+            input_ids[file_id].add(track_id)
+            order.append((file_id, track_id))
+        if order == sorted(order):
+            return inputs, None
+        return inputs, ','.join('{}:{}'.format(file_id, track_id) for file_id, track_id in order)
+
+    def _source_tracks(self, tracks):
+        # the sorted ids of each type of track in the imported file if every track of an input is from it and resolved
+        if self._info_json is None or any(track.file_path != self._file_path or not track.resolved for track in tracks):
+            return None
+        source = {'video': [], 'audio': [], 'subtitles': []}
+        for track in self._info_json['tracks']:
+            if track['type'] in source:
+                source[track['type']].append(str(track['id']))
+        for ids in source.values():
+            ids.sort()
+        return source
+
+    def _mux_unchanged(self, output_path, unchanged):
+        # stand in for mkvmerge when muxing would only reproduce the imported file
+        if unchanged is None:
+            return False
+        if unchanged not in ('skip', 'link', 'copy'):
+            raise ValueError('"{}" is not a valid way to handle an unchanged file'.format(unchanged))
+        if self._file_path is None or self.is_dirty():
+            return False
+        if unchanged == 'skip' or (isfile(output_path) and samefile(output_path, self._file_path)):
+            return True
+        if isfile(output_path):
+            remove(output_path)
+        if unchanged == 'link':
+            try:
+                link(self._file_path, output_path)
+                return True
+            except OSError:
+                pass
+        shutil.copy2(self._file_path, output_path)
+        return True
+
+    async def amux_progress(self, output_path, options_file=None):
+        """Muxes the specified :class:`~pymkv.MKVFile` and iterate over its progress.
+
+        mkvmerge is run within the concurrency limit of :mod:`pymkv.aio`. If the iteration is cancelled or stopped
+        early, mkvmerge is killed and any output files it had started writing are removed.
+
+        Parameters
+        ----------
+        output_path : str
+            The path to be used as the output file in the mkvmerge command.
+        options_file : bool, optional
+            Pass the options to mkvmerge in a temporary JSON option file instead of on the command line. By default an
+            option file is only used when the command is longer than :attr:`~pymkv.MKVFile.OPTIONS_FILE_THRESHOLD`.
+
+        Yields
+        ------
+        :obj:`~pymkv.progress.Progress`
+            An update each time mkvmerge reports progress.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if the path to mkvmerge could not be verified.
+        subprocess.CalledProcessError
+            Raised if mkvmerge exits with a non-zero return code. Its output holds the last lines mkvmerge wrote.
+        """
         output_path = expanduser(output_path)
-        if silent:
-            sp.run(self.command(output_path, subprocess=True), stdout=open(devnull, 'wb'), check=True)
+        updates = self._amux_command(self.command(output_path, subprocess=True), output_path, options_file)
+        try:
+            async for update in updates:
+                yield update
+        finally:
+            # stopping early has to reach the command so mkvmerge is killed
+            await updates.aclose()
+
+    async def _amux_command(self, command, output_path, options_file):
+        # run an already built command for amux and amux_progress
+        loop = asyncio.get_event_loop()
+        mkvmerge = await loop.run_in_executor(None, verify_executable, self.mkvmerge_path, 'mkvmerge')
+        if mkvmerge is None:
+            raise FileNotFoundError('mkvmerge is not at the specified path, add it there or change the mkvmerge_path '
+                                    'property')
+        if await loop.run_in_executor(None, mkvmerge.supports, '--gui-mode'):
+            command.insert(1, '--gui-mode')
+        monitor = ProgressMonitor(output_path)
+        with self.options_file(command, options_file) as command:
+            lines = aio.stream(command)
+            try:
+                async for line in lines:
+                    update = monitor.feed(line)
+                    if update is not None:
+                        yield update
+            except sp.CalledProcessError as error:
+                raise sp.CalledProcessError(error.returncode, command, monitor.output())
+            except (asyncio.CancelledError, GeneratorExit):
+                # stop mkvmerge and remove the partial output
+                await lines.aclose()
+                for partial_output in monitor.new_files():
+                    try:
+                        remove(partial_output)
+                    except OSError:
+                        pass
+                raise
+
+    def extract(self, out_dir, tracks=None, attachments=None, chapters=False, workers=None, progress=None):
+        """Extract tracks, attachments, and chapters with mkvextract.
+
+        Each source file is read by one mkvextract process that extracts everything requested from it, and the
+        source files are extracted in parallel. Tracks are written to `out_dir` as
+        '<file name>_track<track id>[_<language>]<extension>', attachments with their own file names, and chapters as
+        '<file name>.chapters.xml'.
+
+        Parameters
+        ----------
+        out_dir : str
+            The directory to extract to.
+        tracks : list, optional
+            The tracks to extract as :class:`~pymkv.MKVTrack` objects or indexes of :attr:`~pymkv.MKVFile.tracks`. By
+            default every track is extracted. Tracks must be in Matroska files.
+        attachments : list of int, bool, optional
+            The ids of the attachments of the imported file to extract, or True to extract all of them.
+        chapters : bool, optional
+            Extract the chapters of the imported file as XML.
+        workers : int, optional
+            The maximum number of source files extracted at the same time. Defaults to the default of
+            :class:`concurrent.futures.ThreadPoolExecutor`.
+        progress : callable, optional
+            Called with a :obj:`~pymkv.progress.Progress` update of all the source files together each time
+            mkvextract reports progress.
+
+        Returns
+        -------
+        list of str
+            The paths of the extracted files in the order they were requested, tracks first.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if `out_dir` is not a directory or the path to mkvextract could not be verified.
+        IndexError
+            Raised if a track index or attachment id is out of range.
+        TypeError
+            Raised if a track is not an :class:`~pymkv.MKVTrack` or an int.
+        ValueError
+            Raised if a track is not in a Matroska file, if attachments or chapters are requested from an
+            :class:`~pymkv.MKVFile` that was not imported, or if mkvextract is older than
+            :attr:`~pymkv.MKVFile.EXTRACT_MIN_VERSION`.
+        subprocess.CalledProcessError
+            Raised if mkvextract exits with a non-zero return code. Its output holds the last lines mkvextract wrote.
+        """
+        commands, output_paths = self._extract_commands(out_dir, tracks, attachments, chapters)
+        group = ProgressGroup(output_paths, callback=progress)
+
+        def run(command, monitor):
+            try:
+                for line in get_executor().stream(command):
+                    monitor.feed(line)
+            except sp.CalledProcessError as error:
+                raise sp.CalledProcessError(error.returncode, command, monitor.output())
+
+        # register every monitor before starting so the total weight of the group never changes
+        monitors = [group.monitor(self._extract_weight(source)) for source, _ in commands]
+        with ThreadPoolExecutor(workers) as executor:
+            futures = [executor.submit(run, command, monitor) for (_, command), monitor in zip(commands, monitors)]
+        for future in futures:
+            future.result()
+        return output_paths
+
+    async def aextract(self, out_dir, tracks=None, attachments=None, chapters=False, progress=None):
+        """Extract tracks, attachments, and chapters with mkvextract without blocking the event loop.
+
+        This is the coroutine version of :meth:`~pymkv.MKVFile.extract` and takes the same parameters except for
+        `workers`. mkvextract is run within the concurrency limit of :mod:`pymkv.aio`, so many files can be extracted
+        at once with :func:`asyncio.gather`. If the coroutine is cancelled, mkvextract is killed and any files it had
+        started writing are removed.
+
+        Returns
+        -------
+        list of str
+            The paths of the extracted files in the order they were requested, tracks first.
+        """
+        loop = asyncio.get_event_loop()
+        commands, output_paths = await loop.run_in_executor(None, self._extract_commands, out_dir, tracks,
+                                                            attachments, chapters)
+        group = ProgressGroup(output_paths, callback=progress)
+        existing = {path for path in output_paths if isfile(path)}
+
+        async def run(command, monitor):
+            try:
+                async for line in aio.stream(command):
+                    monitor.feed(line)
+            except sp.CalledProcessError as error:
+                raise sp.CalledProcessError(error.returncode, command, monitor.output())
+
+        monitors = [group.monitor(self._extract_weight(source)) for source, _ in commands]
+        try:
+            await asyncio.gather(*(run(command, monitor) for (_, command), monitor in zip(commands, monitors)))
+        except asyncio.CancelledError:
+            # stop mkvextract and remove the partial output
+            for path in output_paths:
+                if path not in existing:
+                    for partial_output in output_files(path):
+                        try:
+                            remove(partial_output)
+                        except OSError:
+                            pass
+            raise
+        return output_paths
+
+    @staticmethod
+    def _extract_weight(source):
+        # the share of the progress of a source, which may not exist when a recording is replayed
+        try:
+            return getsize(source)
+        except OSError:
+            return 1
+
+    def _extract_commands(self, out_dir, tracks, attachments, chapters):
+        # one mkvextract command per source file and the paths of every extracted file
+        out_dir = expanduser(out_dir)
+        if not isdir(out_dir):
+            raise FileNotFoundError('"{}" is not a directory'.format(out_dir))
+        mkvextract = verify_executable(self.mkvextract_path, name='mkvextract')
+        if mkvextract is None:
+            raise FileNotFoundError('mkvextract is not at the specified path, add it there or change the '
+                                    'mkvextract_path property')
+        if mkvextract.version_info and mkvextract.version_info < self.EXTRACT_MIN_VERSION:
+            # older versions take one mode per call, before the source file
+            raise ValueError('mkvextract {} or newer is required, "{}" is too old'.format(
+                '.'.join(str(part) for part in self.EXTRACT_MIN_VERSION), mkvextract.version))
+        gui_mode = ['--gui-mode'] if mkvextract.supports('--gui-mode') else []
+        if (attachments or chapters) and self._info_json is None:
+            raise ValueError('attachments and chapters can only be extracted from an imported file')
+
+        # find the tracks
+        if tracks is None:
+            tracks = self.tracks
+        selected = []
+        for track in tracks:
+            if isinstance(track, int):
+                if not 0 <= track < len(self.tracks):
+                    raise IndexError('track index out of range')
+                track = self.tracks[track]
+            elif not isinstance(track, MKVTrack):
+                raise TypeError('track "{}" is not an MKVTrack or int'.format(track))
+            selected.append(track)
+        MKVTrack.resolve_pending(selected)
+
+        # the extraction specs of each source file, in the order they were first requested
+        specs = {}
+        output_paths = []
+        for track in selected:
+            if track.file_path not in specs:
+                if track.file_path != self._file_path and not verify_matroska(track.file_path, track.mkvmerge_path):
+                    raise ValueError('"{}" is not a Matroska file'.format(track.file_path))
+                specs[track.file_path] = {'tracks': {}, 'attachments': {}, 'chapters': None}
+            track_specs = specs[track.file_path]['tracks']
+            if track.track_id not in track_specs:
+                output_path = join(out_dir, '{}_track{}{}{}'.format(
+                    splitext(basename(track.file_path))[0], track.track_id,
+                    '_' + track.language if track.language else '',
+                    self.EXTRACT_EXTENSIONS.get(track.track_codec, '.bin')))
+                track_specs[track.track_id] = output_path
+                output_paths.append(output_path)
+        if attachments or chapters:
+            source_specs = specs.setdefault(self._file_path, {'tracks': {}, 'attachments': {}, 'chapters': None})
+            file_attachments = {attachment['id']: attachment for attachment in self._info_json.get('attachments', ())}
+            for attachment_id in (file_attachments if attachments is True else attachments or ()):
+                if attachment_id not in file_attachments:
+                    raise IndexError('attachment id out of range')
+                output_path = join(out_dir, basename(file_attachments[attachment_id].get('file_name') or
+                                                     'attachment{}'.format(attachment_id)))
+                source_specs['attachments'][attachment_id] = output_path
+                output_paths.append(output_path)
+            if chapters:
+                source_specs['chapters'] = join(out_dir, splitext(basename(self._file_path))[0] + '.chapters.xml')
+                output_paths.append(source_specs['chapters'])
+
+        # build the commands
+        commands = []
+        for source, source_specs in specs.items():
+            command = [self.mkvextract_path] + gui_mode + [source]
+            if source_specs['tracks']:
+                command.append('tracks')
+                command.extend('{}:{}'.format(track_id, path) for track_id, path in source_specs['tracks'].items())
+            if source_specs['attachments']:
+                command.append('attachments')
+                command.extend('{}:{}'.format(attachment_id, path)
+                               for attachment_id, path in source_specs['attachments'].items())
+            if source_specs['chapters'] is not None:
+                command.extend(['chapters', source_specs['chapters']])
+            commands.append((source, command))
+        return commands, output_paths
+
+    @classmethod
+    @contextmanager
+    def options_file(cls, command, use_options_file=None):
+        """Move the options of an mkvmerge command into a temporary JSON option file.
+
+        mkvmerge reads its options from a file when it is passed as ``@file.json``. Very long commands, such as ones
+        with hundreds of attachments, can exceed the operating system's command line limit and are expensive to
+        start. The option file is removed when the context exits.
+
+        Parameters
+        ----------
+        command : list of str
+            The full mkvmerge command, as returned by :meth:`~pymkv.MKVFile.command` with `subprocess` set to True.
+        use_options_file : bool, optional
+            Always use an option file if True and never if False. By default an option file is only used when the
+            command is longer than :attr:`~pymkv.MKVFile.OPTIONS_FILE_THRESHOLD` bytes.
+
+        Yields
+        ------
+        list of str
+            The command to run, either `command` itself or the executable followed by a reference to the option file.
+        """
+        if use_options_file is None:
+            use_options_file = sum(len(fsencode(arg)) + 1 for arg in command) > cls.OPTIONS_FILE_THRESHOLD
+        if not use_options_file:
+            yield command
+            return
+        fd, options_path = mkstemp(prefix='pymkv-', suffix='.json')
+        try:
+            with open(fd, 'w', encoding='utf-8') as options:
+                json.dump(command[1:], options)
+            yield [command[0], '@' + options_path]
+        finally:
+            try:
+                remove(options_path)
+            except OSError:
+                pass
+
+    def apply_in_place(self, silent=False):
+        """Write the changes made to an imported MKV file back to the file itself.
+
+        The current state of the :class:`~pymkv.MKVFile` is compared against the metadata the file was imported
+        with. If only the title, track names, languages, default and forced flags, tags, or chapters of a file
+        without chapters changed, the header of the file is edited with a single mkvpropedit command and none of the
+        media data is rewritten. Tags written this way replace the existing tags of the same track or the global
+        tags. Any other change, such as removing, reordering, or adding tracks or attachments, is muxed into a
+        temporary file next to the original which then replaces it.
+
+        Afterwards the :class:`~pymkv.MKVFile` is imported again from the edited file.
+
+        Parameters
+        ----------
+        silent : bool, optional
+            By default the mkvpropedit or mkvmerge command will be shown unless silent is True.
+
+        Returns
+        -------
+        bool
+            True if the header was edited in place, False if the file was muxed again.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if the path to mkvpropedit or mkvmerge could not be verified.
+        ValueError
+            Raised if the :class:`~pymkv.MKVFile` was not imported from an MKV file or is set to be split.
+        subprocess.CalledProcessError
+            Raised if mkvpropedit or mkvmerge exits with a non-zero return code.
+        """
+        if self._file_path is None:
+            raise ValueError('the MKVFile was not imported from an MKV file')
+        if self._split_options:
+            raise ValueError('"{}" can not be split in place'.format(self._file_path))
+
+        edits = self._header_edits()
+        if edits is not None:
+            if edits:
+                if verify_executable(self.mkvpropedit_path, name='mkvpropedit') is None:
+                    raise FileNotFoundError('mkvpropedit is not at the specified path, add it there or change the '
+                                            'mkvpropedit_path property')
+                command = [self.mkvpropedit_path, self._file_path] + edits
+                if not silent:
+                    print('Running with command:\n"' + ' '.join(command) + '"')
+                get_executor().run(command, stdout=sp.DEVNULL if silent else None)
         else:
-            command = self.command(output_path)
-            print('Running with command:\n"' + command + '"')
-            sp.run(self.command(output_path, subprocess=True), check=True, capture_output=True)
+            # mux next to the original so the file can be replaced without copying it across volumes
+            fd, temp_path = mkstemp(prefix='.pymkv-', suffix='.mkv', dir=dirname(self._file_path) or None)
+            with open(fd, 'wb'):
+                pass
+            try:
+                self.mux(temp_path, silent=silent)
+                shutil.copymode(self._file_path, temp_path)
+                replace(temp_path, self._file_path)
+            except BaseException:
+                try:
+                    remove(temp_path)
+                except OSError:
+                    pass
+                raise
+        self._reload()
+        return edits is not None
+
+    def _header_edits(self):
+        # the mkvpropedit options for the changes, or None if they need a mux
+        edits = []
+        for name, (probed, current) in self.changes().items():
+            if name.startswith('tracks['):
+                continue
+            if name == 'title':
+                if current:
+                    edits.extend(['--edit', 'info', '--set', 'title=' + current])
+                elif probed is not None:
+                    edits.extend(['--edit', 'info', '--delete', 'title'])
+            elif name == 'chapters' and current is not None and not self._info_json.get('chapters'):
+                edits.extend(['--chapters', current])
+            elif name == 'global_tags' and current is not None:
+                edits.extend(['--tags', 'global:' + current])
+            else:
+                return None
+
+        # the tracks are the same as in the file, so their position is their id
+        for track_id, track in enumerate(self.tracks):
+            changes = track.changes()
+            if not changes.keys() <= {'track_name', 'language', 'default_track', 'forced_track', 'tags'}:
+                return None
+            properties = self._info_json['tracks'][track_id]['properties']
+            selector = 'track:@{}'.format(properties['number']) if 'number' in properties else \
+                'track:{}'.format(track_id + 1)
+            track_edits = []
+            for name, option in (('track_name', 'name'), ('language', 'language')):
+                if name in changes:
+                    track_edits.extend(['--set', option + '=' + changes[name][1]])
+            for name, option in (('default_track', 'flag-default'), ('forced_track', 'flag-forced')):
+                if name in changes:
+                    track_edits.extend(['--set', '{}={:d}'.format(option, changes[name][1])])
+            if track_edits:
+                edits.extend(['--edit', selector] + track_edits)
+            if 'tags' in changes:
+                edits.extend(['--tags', selector + ':' + changes['tags'][1]])
+        return edits
+
+    def _reload(self):
+        # import the file again after it was changed in place
+        file_path = self._file_path
+        self.title = None
+        self._chapters_file = None
+        self._chapter_language = None
+        self._global_tags_file = None
+        self._link_to_previous_file = None
+        self._link_to_next_file = None
+        self.tracks = []
+        self.attachments = []
+        self._load(file_path, identify(file_path, mkvmerge_path=self.mkvmerge_path))
 
     def add_file(self, file):
         """Add an MKV file into the :class:`~pymkv.MKVFile` object.
@@ -501,7 +1193,7 @@ class MKVFile:
             raise TypeError('size is not a bitmath object or integer')
         self._split_options = ['--split', 'size:{}'.format(size)]
         if link:
-            self._split_options += '--link'
+            self._split_options.append('--link')
 
     def split_duration(self, duration, link=False):
         """Split the output file into parts by duration.
@@ -516,17 +1208,18 @@ class MKVFile:
         """
         self._split_options = ['--split', 'duration:' + str(Timestamp(duration))]
         if link:
-            self._split_options += '--link'
+            self._split_options.append('--link')
 
     def split_timestamps(self, *timestamps, link=False):
         """Split the output file into parts by timestamps.
 
         Parameters
         ----------
-        *timestamps : str, int, list, tuple
+        *timestamps : str, int, list, tuple, :class:`~pymkv.TimestampArray`
             The timestamps to split the file by. Can be passed as any combination of strs and ints, inside or outside
             an :obj:`Iterable` object. Any lists will be flattened. Timestamps must be ints, representing seconds,
-            or strs in the form HH:MM:SS.nnnnnnnnn. The timestamp string requires formatting of at least M:S.
+            or strs in the form HH:MM:SS.nnnnnnnnn. The timestamp string requires formatting of at least M:S. A
+            single :class:`~pymkv.TimestampArray` is checked and formatted all at once.
         link : bool, optional
             Determines if the split files should be linked together after splitting.
 
@@ -535,23 +1228,30 @@ class MKVFile:
         ValueError
             Raised if invalid or improperly formatted timestamps are passed in for `*timestamps`.
         """
-        # check if in timestamps form
-        ts_flat = MKVFile.flatten(timestamps)
-        if len(ts_flat) == 0:
-            raise ValueError('"{}" are not properly formatted timestamps'.format(timestamps))
-        if None in ts_flat:
-            raise ValueError('"{}" are not properly formatted timestamps'.format(timestamps))
-        for ts_1, ts_2 in zip(ts_flat[:-1], ts_flat[1:]):
-            if Timestamp(ts_1) >= Timestamp(ts_2):
-                raise ValueError('"{}" are not properly formatted timestamps'.format(timestamps))
+        if len(timestamps) == 1 and isinstance(timestamps[0], TimestampArray):
+            if len(timestamps[0].ns.ravel()) == 0 or not timestamps[0].is_increasing():
+                raise ValueError('"{}" are not properly formatted timestamps'.format(timestamps[0]))
+            self._split_options = ['--split', 'timestamps:' + timestamps[0].join()]
+            if link:
+                self._split_options.append('--link')
+            return
 
-        # build ts_string from timestamps
-        ts_string = 'timestamps:'
-        for ts in ts_flat:
-            ts_string += str(Timestamp(ts)) + ','
-        self._split_options = ['--split', ts_string[:-1]]
+        # check and build the timestamps in one pass
+        ts_strings = []
+        previous = None
+        for ts in MKVFile.iter_flatten(timestamps):
+            if ts is None:
+                raise ValueError('"{}" are not properly formatted timestamps'.format(timestamps))
+            ts = Timestamp(ts)
+            if previous is not None and previous >= ts:
+                raise ValueError('"{}" are not properly formatted timestamps'.format(timestamps))
+            ts_strings.append(str(ts))
+            previous = ts
+        if not ts_strings:
+            raise ValueError('"{}" are not properly formatted timestamps'.format(timestamps))
+        self._split_options = ['--split', 'timestamps:' + ','.join(ts_strings)]
         if link:
-            self._split_options += '--link'
+            self._split_options.append('--link')
 
     def split_frames(self, *frames, link=False):
         """Split the output file into parts by frames.
@@ -571,34 +1271,33 @@ class MKVFile:
         ValueError
             Raised if improperly formatted frames are passed in for `*frames`.
         """
-        # check if in frames form
-        f_flat = MKVFile.flatten(frames)
-        if len(f_flat) == 0:
-            raise ValueError('"{}" are not properly formatted frames'.format(frames))
-        for f in f_flat:
+        # check and build the frames in one pass
+        f_strings = []
+        previous = None
+        for f in MKVFile.iter_flatten(frames):
             if not isinstance(f, int):
                 raise TypeError('frame "{}" not an int'.format(f))
-        for f_1, f_2 in zip(f_flat[:-1], f_flat[1:]):
-            if f_1 >= f_2:
+            if previous is not None and previous >= f:
                 raise ValueError('"{}" are not properly formatted frames'.format(frames))
-
-        # build f_string from frames
-        f_string = 'frames:'
-        for f in f_flat:
-            f_string += str(f) + ','
-        self._split_options = ['--split', f_string[:-1]]
+            f_strings.append(str(f))
+            previous = f
+        if not f_strings:
+            raise ValueError('"{}" are not properly formatted frames'.format(frames))
+        self._split_options = ['--split', 'frames:' + ','.join(f_strings)]
         if link:
-            self._split_options += '--link'
+            self._split_options.append('--link')
 
     def split_timestamp_parts(self, timestamp_parts, link=False):
         """Split the output in parts by time parts.
 
         Parameters
         ----------
-        timestamp_parts : list, tuple
+        timestamp_parts : list, tuple, :class:`~pymkv.TimestampArray`
             An Iterable of timestamp sets. Each timestamp set should be an Iterable of an even number of timestamps
             or any number of timestamp pairs. The very first and last timestamps are permitted to be None. Timestamp
-            sets containing 4 or more timestamps will output as one file containing the parts specified.
+            sets containing 4 or more timestamps will output as one file containing the parts specified. A
+            two-dimensional :class:`~pymkv.TimestampArray` with one timestamp set per row is checked and formatted all
+            at once, but can not contain None.
         link : bool, optional
             Determines if the split files should be linked together after splitting.
 
@@ -609,41 +1308,28 @@ class MKVFile:
         ValueError
             Raised if `timestamp_parts` contains improperly formatted parts.
         """
-        # check if in parts form
-        ts_flat = MKVFile.flatten(timestamp_parts)
-        if len(timestamp_parts) == 0:
-            raise ValueError('"{}" are not properly formatted parts'.format(timestamp_parts))
-        if None in ts_flat[1:-1]:
-            raise ValueError('"{}" are not properly formatted parts'.format(timestamp_parts))
-        for ts_1, ts_2 in zip(ts_flat[:-1], ts_flat[1:]):
-            if None not in (ts_1, ts_2) and Timestamp(ts_1) >= Timestamp(ts_2):
+        if isinstance(timestamp_parts, TimestampArray):
+            shape = timestamp_parts.shape
+            if len(shape) != 2 or shape[0] == 0 or shape[1] < 2 or shape[1] % 2 != 0:
+                raise ValueError('"{}" is not a properly formatted set'.format(timestamp_parts))
+            if not timestamp_parts.is_increasing():
                 raise ValueError('"{}" are not properly formatted parts'.format(timestamp_parts))
+            strings = timestamp_parts.strings()
+            pairs = [start + '-' + end for start, end in zip(strings[:, 0::2].ravel().tolist(),
+                                                            strings[:, 1::2].ravel().tolist())]
+            pairs_per_set = shape[1] // 2
+            self._split_options = ['--split', 'parts:' + ','.join(',+'.join(pairs[index:index + pairs_per_set])
+                                                                  for index in range(0, len(pairs), pairs_per_set))]
+            if link:
+                self._split_options.append('--link')
+            return
 
-        # build ts_string from parts
-        ts_string = 'parts:'
-        for ts_set in timestamp_parts:
-            # flatten set
-            ts_set = MKVFile.flatten(ts_set)
-
-            # check if in set form
-            if not isinstance(ts_set, (list, tuple)):
-                raise TypeError('set is not of type list or tuple')
-            if len(ts_set) < 2 or len(ts_set) % 2 != 0:
-                raise ValueError('"{}" is not a properly formatted set'.format(ts_set))
-
-            # build parts from sets
-            for index, ts in enumerate(ts_set):
-                # check for combined split
-                if index % 2 == 0 and index > 0:
-                    ts_string += '+'
-                # add timestamp if not None
-                if ts is not None:
-                    ts_string += str(Timestamp(ts))
-                # add ',' or '-'
-                ts_string += '-' if index % 2 == 0 else ','
-        self._split_options = ['--split', ts_string[:-1]]
+        if len(timestamp_parts) == 0:
+            raise ValueError('"{}" are not properly formatted parts'.format(timestamp_parts))
+        ts_string = MKVFile._build_parts(timestamp_parts, Timestamp)
+        self._split_options = ['--split', 'parts:' + ts_string]
         if link:
-            self._split_options += '--link'
+            self._split_options.append('--link')
 
     def split_parts_frames(self, frame_parts, link=False):
         """Split the output in parts by frames.
@@ -665,54 +1351,22 @@ class MKVFile:
         ValueError
             Raised if `frame_parts` contains improperly formatted parts.
         """
-        # check if in parts form
-        f_flat = MKVFile.flatten(frame_parts)
         if len(frame_parts) == 0:
             raise ValueError('"{}" are not properly formatted parts'.format(frame_parts))
-        if None in f_flat[1:-1]:
-            raise ValueError('"{}" are not properly formatted parts'.format(frame_parts))
-        for f_1, f_2 in zip(f_flat[:-1], f_flat[1:]):
-            if None not in (f_1, f_2) and f_1 >= f_2:
-                raise ValueError('"{}" are not properly formatted parts'.format(frame_parts))
-
-        # build f_string from parts
-        f_string = 'parts:'
-        for f_set in frame_parts:
-            # flatten set
-            f_set = MKVFile.flatten(f_set)
-
-            # check if in set form
-            if not isinstance(f_set, (list, tuple)):
-                raise TypeError('set is not of type list or tuple')
-            if len(f_set) < 2 or len(f_set) % 2 != 0:
-                raise ValueError('"{}" is not a properly formatted set'.format(f_set))
-
-            # build parts from sets
-            for index, f in enumerate(f_set):
-                # check if frames are ints
-                if not isinstance(f, int) and f is not None:
-                    raise TypeError('frame "{}" not an int'.format(f))
-
-                # check for combined split
-                if index % 2 == 0 and index > 0:
-                    f_string += '+'
-                # add frame if not None
-                if f is not None:
-                    f_string += str(f)
-                # add ',' or '-'
-                f_string += '-' if index % 2 == 0 else ','
-        self._split_options = ['--split', f_string[:-1]]
+        f_string = MKVFile._build_parts(frame_parts, MKVFile._frame)
+        self._split_options = ['--split', 'parts:' + f_string]
         if link:
-            self._split_options += '--link'
+            self._split_options.append('--link')
 
     def split_chapters(self, *chapters, link=False):
         """Split the output file into parts by chapters.
 
         Parameters
         ----------
-        *chapters : int, list, tuple
+        *chapters : int, list, tuple, :obj:`numpy.ndarray`
            The chapters to split the file by. Can be passed as any combination of ints, inside or outside an
-           :obj:`Iterable` object. Any lists will be flattened. Chapters must be ints.
+           :obj:`Iterable` object. Any lists will be flattened. Chapters must be ints. A single NumPy array of ints is
+           checked and formatted all at once.
         link : bool, optional
             Determines if the split files should be linked together after splitting.
 
@@ -723,27 +1377,34 @@ class MKVFile:
         ValueError
             Raised if `*chapters` contains improperly formatted chapters.
        """
-        # check if in chapters form
-        c_flat = MKVFile.flatten(chapters)
+        c_array = _integer_array(chapters[0]) if len(chapters) == 1 else None
+        if c_array is not None:
+            if len(c_array) == 0 or c_array.min() < 1 or (c_array[1:] <= c_array[:-1]).any():
+                raise ValueError('"{}" are not properly formatted chapters'.format(chapters))
+            self._split_options = ['--split', 'chapters:' + ','.join(map(str, c_array.tolist()))]
+            if link:
+                self._split_options.append('--link')
+            return
+
         if len(chapters) == 0:
             self._split_options = ['--split', 'chapters:all']
             return
-        for c in c_flat:
+
+        # check and build the chapters in one pass
+        c_strings = []
+        previous = 0
+        for c in MKVFile.iter_flatten(chapters):
             if not isinstance(c, int):
                 raise TypeError('chapter "{}" not an int'.format(c))
-            if c < 1:
-                raise ValueError('"{}" are not properly formatted chapters'.format(chapters))
-        for c_1, c_2 in zip(c_flat[:-1], c_flat[1:]):
-            if c_1 >= c_2:
+            if c <= previous:
                 raise ValueError('"{}" are not properly formatted chapters'.format(chapters))
-
-        # build c_string from chapters
-        c_string = 'chapters:'
-        for c in c_flat:
-            c_string += str(c) + ','
-        self._split_options = ['--split', c_string[:-1]]
+            c_strings.append(str(c))
+            previous = c
+        if not c_strings:
+            raise ValueError('"{}" are not properly formatted chapters'.format(chapters))
+        self._split_options = ['--split', 'chapters:' + ','.join(c_strings)]
         if link:
-            self._split_options += '--link'
+            self._split_options.append('--link')
 
     def link_to_previous(self, file_path):
         """Link the output file as the predecessor of the `file_path` file.
@@ -918,10 +1579,84 @@ class MKVFile:
         list
             A flattened version of `item`.
         """
-        flat_list = []
-        if isinstance(item, (list, tuple)):
-            for item in item:
-                flat_list.extend(MKVFile.flatten(item))
-            return flat_list
-        else:
-            return [item]
+        return list(MKVFile.iter_flatten(item))
+
+    @staticmethod
+    def iter_flatten(item):
+        """Iterate over a list or a tuple as if it were flattened.
+
+        Unlike :meth:`~pymkv.MKVFile.flatten`, no intermediate lists are created and nesting depth is not limited
+        by recursion.
+
+        Examples
+        --------
+        >>> tup = ((1, 2), (3, (4, 5)))
+        >>> print(list(MKVFile.iter_flatten(tup)))
+        [1, 2, 3, 4, 5]
+
+        Parameters
+        ----------
+        item : list, tuple
+            A list or a tuple object with nested lists or tuples to be flattened.
+
+        Yields
+        ------
+        object
+            Each item that is not a list or tuple, in order.
+        """
+        if not isinstance(item, (list, tuple)):
+            yield item
+            return
+        stack = [iter(item)]
+        while stack:
+            for item in stack[-1]:
+                if isinstance(item, (list, tuple)):
+                    stack.append(iter(item))
+                    break
+                yield item
+            else:
+                stack.pop()
+
+    @staticmethod
+    def _frame(frame):
+        # frames are used as they are but must be ints
+        if not isinstance(frame, int):
+            raise TypeError('frame "{}" not an int'.format(frame))
+        return frame
+
+    @staticmethod
+    def _build_parts(parts, convert):
+        # check and build a parts split in one pass, only the very first and last values may be None
+        pieces = []
+        previous = None
+        pending_none = False
+        first = True
+        for part_set in parts:
+            count = 0
+            for value in MKVFile.iter_flatten(part_set):
+                if pending_none:
+                    raise ValueError('"{}" are not properly formatted parts'.format(parts))
+                if value is None:
+                    if not first:
+                        pending_none = True
+                else:
+                    value = convert(value)
+                    if previous is not None and previous >= value:
+                        raise ValueError('"{}" are not properly formatted parts'.format(parts))
+                    previous = value
+                first = False
+
+                # pairs are joined by '-', parts are separated by ',' and appended to the previous part with '+'
+                if count % 2 == 0:
+                    if count > 0:
+                        pieces.append(',+')
+                    elif pieces:
+                        pieces.append(',')
+                if value is not None:
+                    pieces.append(str(value))
+                if count % 2 == 0:
+                    pieces.append('-')
+                count += 1
+            if count < 2 or count % 2 != 0:
+                raise ValueError('"{}" is not a properly formatted set'.format(part_set))
+        return ''.join(pieces)
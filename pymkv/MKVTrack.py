@@ -35,14 +35,18 @@ Now all these tracks can be added to an :class:`~pymkv.MKVFile` object and muxed
 >>> file.mux('path/to/output.mkv')
 """
 
-import json
 from os.path import expanduser, isfile
-import subprocess as sp
+from sys import intern
 
-from pymkv.Verifications import verify_supported
+from pymkv.Verifications import aidentify, identify, identify_many, verify_supported
 from pymkv.ISO639_2 import is_ISO639_2
 
 
+def _intern(string):
+    # share the few distinct codecs, types, and languages between all tracks
+    return intern(string) if isinstance(string, str) else string
+
+
 class MKVTrack:
     """A class that represents a track for an :class:`~pymkv.MKVFile` object.
 
@@ -67,6 +71,10 @@ class MKVTrack:
         Determines if the track should be the default track of its type when muxed into an MKV file.
     forced_track : bool, optional
         Determines if the track should be a forced track when muxed into an MKV file.
+    lazy : bool, optional
+        Don't identify the file until the codec or type of the track is needed. The file is not checked when the
+        track is created, so an unsupported file or a `track_id` out of range only raises an error once the track is
+        resolved. Many lazy tracks can be resolved at once with :meth:`~pymkv.MKVTrack.resolve_pending`.
 
     Attributes
     ----------
@@ -98,18 +106,102 @@ class MKVTrack:
         that are already part of an MKV file.
     """
 
-    def __init__(self, file_path, track_id=0, track_name=None, language=None, default_track=False, forced_track=False):
+    __slots__ = ('_track_codec', '_track_type', '_probed', 'mkvmerge_path', '_file_path', '_track_id', 'track_name',
+                 '_language', '_tags', 'default_track', 'forced_track', 'no_chapters', 'no_global_tags',
+                 'no_track_tags', 'no_attachments', '_options_cache')
+
+    # the properties compared by changes(), the values of the last ones are never read from the file
+    _COMPARED = ('file_path', 'track_id', 'track_name', 'language', 'default_track', 'forced_track', 'tags',
+                 'no_chapters', 'no_global_tags', 'no_track_tags', 'no_attachments')
+    _UNPROBED = (None, False, False, False, False)
+
+    def __init__(self, file_path, track_id=0, track_name=None, language=None, default_track=False, forced_track=False,
+                 lazy=False):
         # track info
         self._track_codec = None
         self._track_type = None
+        self._probed = None
 
         # base
         self.mkvmerge_path = 'mkvmerge'
-        self._file_path = None
-        self.file_path = file_path
-        self._track_id = None
-        self.track_id = track_id
+        if lazy:
+            self._file_path = expanduser(file_path)
+            self._track_id = track_id
+        else:
+            self._file_path = None
+            self.file_path = file_path
+            self._track_id = None
+            self.track_id = track_id
+
+        self._init_flags(track_name, language, default_track, forced_track)
+
+    def __repr__(self):
+        return repr({name: getattr(self, name) for name in self.__slots__})
+
+    @classmethod
+    def from_probe(cls, file_path, info_json, track_id=0, mkvmerge_path='mkvmerge'):
+        """Create an :class:`~pymkv.MKVTrack` from an existing mkvmerge identification.
+
+        Unlike the regular constructor, no mkvmerge process is started. The codec, type, name, language, and flags of
+        the track are all read from `info_json`, which makes this the preferred way to build many tracks from a
+        file that has already been identified.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the track file or the MKV file containing the track.
+        info_json : dict
+            The parsed output of ``mkvmerge -J`` for `file_path`.
+        track_id : int, optional
+            The id of the track to be used from the file.
+        mkvmerge_path : str, optional
+            The path to the mkvmerge executable the new track will use.
+
+        Raises
+        ------
+        IndexError
+            Raised if `track_id` is out of range of the file's tracks.
+        ValueError
+            Raised if `info_json` does not describe a supported file.
+        """
+        if not info_json['container']['supported']:
+            raise ValueError('"{}" is not a supported file'.format(file_path))
+        track = cls.__new__(cls)
+        track._track_codec = None
+        track._track_type = None
+        track._probed = None
+        track.mkvmerge_path = mkvmerge_path
+        track._file_path = expanduser(file_path)
+        track._track_id = None
+        track._load_track(info_json, track_id)
+
+        properties = info_json['tracks'][track_id]['properties']
+        track._init_flags(properties.get('track_name'), properties.get('language'),
+                          properties.get('default_track', False), properties.get('forced_track', False))
+        return track
+
+    @classmethod
+    async def aopen(cls, file_path, track_id=0, track_name=None, language=None, default_track=False,
+                    forced_track=False, mkvmerge_path='mkvmerge'):
+        """Create an :class:`~pymkv.MKVTrack` without blocking the event loop.
+
+        This is the coroutine version of the :class:`~pymkv.MKVTrack` constructor and takes the same parameters. The
+        file is identified with :func:`~pymkv.Verifications.aidentify`.
+
+        Raises
+        ------
+        IndexError
+            Raised if `track_id` is out of range of the file's tracks.
+        ValueError
+            Raised if `file_path` is not a supported file type.
+        """
+        file_path = expanduser(file_path)
+        info_json = await aidentify(file_path, mkvmerge_path=mkvmerge_path)
+        track = cls.from_probe(file_path, info_json, track_id=track_id, mkvmerge_path=mkvmerge_path)
+        track._init_flags(track_name, language, default_track, forced_track)
+        return track
 
+    def _init_flags(self, track_name, language, default_track, forced_track):
         # flags
         self.track_name = track_name
         self._language = None
@@ -124,8 +216,135 @@ class MKVTrack:
         self.no_track_tags = False
         self.no_attachments = False
 
-    def __repr__(self):
-        return repr(self.__dict__)
+        # the mkvmerge options of the track and the state they were built from
+        self._options_cache = None
+
+    @staticmethod
+    def resolve_pending(tracks, workers=None):
+        """Identify the files of lazy tracks that have not been resolved yet.
+
+        Each file is identified once no matter how many of the tracks are in it, and the files are identified in
+        parallel with :func:`~pymkv.Verifications.identify_many`.
+
+        Parameters
+        ----------
+        tracks : iterable of :class:`~pymkv.MKVTrack`
+            The tracks to resolve. Tracks that are already resolved are skipped.
+        workers : int, optional
+            The maximum number of files identified at the same time. Defaults to the default of
+            :class:`concurrent.futures.ThreadPoolExecutor`.
+
+        Raises
+        ------
+        IndexError
+            Raised if the `track_id` of a track is out of range of its file's tracks.
+        ValueError
+            Raised if the file of a track is not a supported file type.
+        """
+        pending = {}
+        for track in tracks:
+            if track._probed is None:
+                pending.setdefault(track.mkvmerge_path, []).append(track)
+        for mkvmerge_path, pending_tracks in pending.items():
+            results = identify_many([track.file_path for track in pending_tracks], mkvmerge_path=mkvmerge_path,
+                                    workers=workers)
+            for track in pending_tracks:
+                if isinstance(results[track.file_path], Exception):
+                    raise results[track.file_path]
+                track._resolve(results[track.file_path])
+
+    def _resolve(self, info_json=None):
+        # identify the file of a lazy track
+        if info_json is None:
+            info_json = identify(self._file_path, mkvmerge_path=self.mkvmerge_path)
+        if not info_json['container']['supported']:
+            raise ValueError('"{}" is not a supported file'.format(self._file_path))
+        self._load_track(info_json, self._track_id)
+
+    def _load_track(self, info_json, track_id):
+        if not 0 <= track_id < len(info_json['tracks']):
+            raise IndexError('track index out of range')
+        self._track_id = track_id
+        self._track_codec = _intern(info_json['tracks'][track_id]['codec'])
+        self._track_type = _intern(info_json['tracks'][track_id]['type'])
+
+        # remember the track as it is in the file to find changes later
+        properties = info_json['tracks'][track_id]['properties']
+        self._probed = (self._file_path, track_id, properties.get('track_name'), _intern(properties.get('language')),
+                        properties.get('default_track', False), properties.get('forced_track', False))
+
+    def changes(self):
+        """Get the properties that differ from the track in its file.
+
+        A track name or language of None keeps the one in the file, so it is not a change.
+
+        Returns
+        -------
+        dict
+            The changed properties mapped to a tuple of the value in the file and the current value.
+        """
+        if self._probed is None:
+            self._resolve()
+        changes = {}
+        for name, probed in zip(self._COMPARED, self._probed + self._UNPROBED):
+            current = getattr(self, name)
+            if current is None and name in ('track_name', 'language'):
+                continue
+            if isinstance(probed, bool):
+                current = bool(current)
+            if current != probed:
+                changes[name] = (probed, current)
+        return changes
+
+    def options(self, minimal=False):
+        """Get the mkvmerge options that set the name, language, tags, and flags of the track.
+
+        The options are cached and only built again after one of the properties they depend on changes. The returned
+        list is shared with the cache and must not be modified.
+
+        Parameters
+        ----------
+        minimal : bool, optional
+            Leave out options that set a property to the value it already has in the file. Has no effect on lazy
+            tracks that have not been resolved yet.
+
+        Returns
+        -------
+        list of str
+            The options for the track.
+        """
+        state = (minimal, self._track_id, self.track_name, self._language, self._tags, bool(self.default_track),
+                 bool(self.forced_track), self._probed)
+        if self._options_cache is None or self._options_cache[0] != state:
+            self._options_cache = (state, self._build_options(minimal))
+        return self._options_cache[1]
+
+    def _build_options(self, minimal):
+        # leave out what is already in the file when minimal, probed is (file, id, name, language, default, forced)
+        probed = self._probed if minimal and self._probed is not None else (None,) * 6
+        track_id = str(self._track_id)
+        options = []
+        if self.track_name is not None and self.track_name != probed[2]:
+            options.extend(['--track-name', track_id + ':' + self.track_name])
+        if self._language is not None and self._language != probed[3]:
+            options.extend(['--language', track_id + ':' + self._language])
+        if self._tags is not None:
+            options.extend(['--tags', track_id + ':' + self._tags])
+        if probed[4] is None or bool(self.default_track) != bool(probed[4]):
+            options.extend(['--default-track', track_id + (':1' if self.default_track else ':0')])
+        if probed[5] is None or bool(self.forced_track) != bool(probed[5]):
+            options.extend(['--forced-track', track_id + (':1' if self.forced_track else ':0')])
+        return options
+
+    def is_dirty(self):
+        """Check if any property differs from the track in its file.
+
+        Returns
+        -------
+        bool
+            True if :meth:`~pymkv.MKVTrack.changes` is not empty.
+        """
+        return bool(self.changes())
 
     @property
     def file_path(self):
@@ -144,8 +363,8 @@ class MKVTrack:
     @file_path.setter
     def file_path(self, file_path):
         file_path = expanduser(file_path)
-        if not verify_supported(file_path):
-            raise ValueError('"{}" is not a supported file')
+        if not verify_supported(file_path, mkvmerge_path=self.mkvmerge_path):
+            raise ValueError('"{}" is not a supported file'.format(file_path))
         self._file_path = file_path
         self.track_id = 0
 
@@ -165,12 +384,7 @@ class MKVTrack:
 
     @track_id.setter
     def track_id(self, track_id):
-        info_json = json.loads(sp.check_output([self.mkvmerge_path, '-J', self.file_path]).decode())
-        if not 0 <= track_id < len(info_json['tracks']):
-            raise IndexError('track index out of range')
-        self._track_id = track_id
-        self._track_codec = info_json['tracks'][track_id]['codec']
-        self._track_type = info_json['tracks'][track_id]['type']
+        self._load_track(identify(self.file_path, mkvmerge_path=self.mkvmerge_path), track_id)
 
     @property
     def language(self):
@@ -189,7 +403,7 @@ class MKVTrack:
     @language.setter
     def language(self, language):
         if language is None or is_ISO639_2(language):
-            self._language = language
+            self._language = _intern(language)
         else:
             raise ValueError('not an ISO639-2 language code')
 
@@ -219,10 +433,19 @@ class MKVTrack:
 
     @property
     def track_codec(self):
-        """str: The codec of the track such as h264 or AAC."""
+        """str: The codec of the track such as h264 or AAC. A lazy track is resolved when this is first read."""
+        if self._probed is None:
+            self._resolve()
         return self._track_codec
 
     @property
     def track_type(self):
-        """str: The type of track such as video or audio."""
+        """str: The type of track such as video or audio. A lazy track is resolved when this is first read."""
+        if self._probed is None:
+            self._resolve()
         return self._track_type
+
+    @property
+    def resolved(self):
+        """bool: False if the track is lazy and its file has not been identified yet."""
+        return self._probed is not None
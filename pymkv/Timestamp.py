@@ -3,10 +3,32 @@
 
 """Timestamp Class"""
 
-from re import match
+from datetime import timedelta
+from functools import lru_cache
+import re
+
+
+# the number of nanoseconds in a second, minute, and hour
+_SECOND = 1000000000
+_MINUTE = 60 * _SECOND
+_HOUR = 60 * _MINUTE
+
+# a timestamp acceptable to mkvmerge
+_TIMESTAMP = re.compile(r'^(?:([0-9]{1,2}):)?([0-9]{1,2}):([0-9]{1,2})(?:\.([0-9]{1,9}))?$')
+# the form of a rendered timestamp
+_FORM = re.compile(r'^(([Hh]{1,2}):)?([Mm]{1,2}):([Ss]{1,2})(\.([Nn]{1,9}))?$')
+
+
+@lru_cache(maxsize=64)
+def _parse_form(form):
+    # which of hours, minutes, seconds, and nanoseconds are always rendered
+    form_groups = _FORM.match(form).groups()
+    return tuple(form_groups[i] is not None for i in (1, 2, 3, 5))
 
 
 class Timestamp:
+    __slots__ = ('_ns', '_form', '_string')
+
     def __init__(self, timestamp=None, hh=None, mm=None, ss=None, nn=None, form='MM:SS'):
         """A class that represents a timestamp used in MKVFiles.
 
@@ -14,6 +36,9 @@ class Timestamp:
         Specific time values can overridden in the timestamp using 'hh', 'mm', 'ss', and 'nn'. Any override value
         that is greater than its maximum (ex. 61 minutes) will be set to 0.
 
+        The timestamp is stored as a single number of nanoseconds. Timestamps can be compared, hashed, and added to or
+        subtracted from each other, ints of seconds, and :class:`datetime.timedelta` durations.
+
         timestamp (str, int, Timestamp):
             A str of a timestamp acceptable to mkvmerge or an int representing seconds. This value will be
             the basis of the timestamp.
@@ -29,73 +54,87 @@ class Timestamp:
             A str for the form of the returned timestamp. 'MM' and 'SS' must be included where 'HH' and 'NN' are
             optional but will be included if 'hh' and 'nn' are not zero.
         """
-        self._hh = hh
-        self._mm = mm
-        self._ss = ss
-        self._nn = nn
         self._form = form
+        self._string = None
         if isinstance(timestamp, Timestamp):
-            self._hh = timestamp.hh
-            self._mm = timestamp.mm
-            self._ss = timestamp.ss
-            self._nn = timestamp.nn
+            self._ns = timestamp._ns
         elif timestamp is not None:
             self.extract(timestamp)
+            if isinstance(timestamp, str):
+                if hh is not None:
+                    self.hh = hh
+                if mm is not None:
+                    self.mm = mm
+                if ss is not None:
+                    self.ss = ss
+                if nn is not None:
+                    self.nn = nn
         else:
-            self._hh = 0 if self._hh is None else self._hh
-            self._mm = 0 if self._mm is None else self._mm
-            self._ss = 0 if self._ss is None else self._ss
-            self._nn = 0 if self._nn is None else self._nn
+            self._ns = (hh or 0) * _HOUR + (mm or 0) * _MINUTE + (ss or 0) * _SECOND + (nn or 0)
+
+    @classmethod
+    def from_ns(cls, ns, form='MM:SS'):
+        """Create a timestamp from a number of nanoseconds.
+
+        ns (int):
+            The number of nanoseconds in the timestamp.
+        form (str):
+            The form of the returned timestamp.
+        """
+        timestamp = cls.__new__(cls)
+        timestamp._ns = ns
+        timestamp._form = form
+        timestamp._string = None
+        return timestamp
 
     def __eq__(self, other):
-        return self.hh == other.hh and self.mm == other.mm and self.ss == other.ss and self.nn == other.nn
+        if not isinstance(other, Timestamp):
+            return NotImplemented
+        return self._ns == other._ns
 
     def __ne__(self, other):
-        return self.hh != other.hh or self.mm != other.mm or self.ss != other.ss or self.nn != other.nn
+        if not isinstance(other, Timestamp):
+            return NotImplemented
+        return self._ns != other._ns
 
     def __lt__(self, other):
-        if self.hh != other.hh:
-            return self.hh < other.hh
-        elif self.mm != other.mm:
-            return self.mm < other.mm
-        elif self.ss != other.ss:
-            return self.ss < other.ss
-        elif self.nn != other.nn:
-            return self.nn < other.nn
-        return False
+        if not isinstance(other, Timestamp):
+            return NotImplemented
+        return self._ns < other._ns
 
     def __le__(self, other):
-        if self.hh != other.hh:
-            return self.hh <= other.hh
-        elif self.mm != other.mm:
-            return self.mm <= other.mm
-        elif self.ss != other.ss:
-            return self.ss <= other.ss
-        elif self.nn != other.nn:
-            return self.nn <= other.nn
-        return True
+        if not isinstance(other, Timestamp):
+            return NotImplemented
+        return self._ns <= other._ns
 
     def __gt__(self, other):
-        if self.hh != other.hh:
-            return self.hh > other.hh
-        elif self.mm != other.mm:
-            return self.mm > other.mm
-        elif self.ss != other.ss:
-            return self.ss > other.ss
-        elif self.nn != other.nn:
-            return self.nn > other.nn
-        return False
+        if not isinstance(other, Timestamp):
+            return NotImplemented
+        return self._ns > other._ns
 
     def __ge__(self, other):
-        if self.hh != other.hh:
-            return self.hh >= other.hh
-        elif self.mm != other.mm:
-            return self.mm >= other.mm
-        elif self.ss != other.ss:
-            return self.ss >= other.ss
-        elif self.nn != other.nn:
-            return self.nn >= other.nn
-        return True
+        if not isinstance(other, Timestamp):
+            return NotImplemented
+        return self._ns >= other._ns
+
+    def __hash__(self):
+        return hash(self._ns)
+
+    def __add__(self, other):
+        duration = Timestamp._duration(other)
+        if duration is None:
+            return NotImplemented
+        return Timestamp.from_ns(self._ns + duration, self._form)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        duration = Timestamp._duration(other)
+        if duration is None:
+            return NotImplemented
+        if duration > self._ns:
+            raise ValueError('"{}" is longer than "{}"'.format(other, self))
+        return Timestamp.from_ns(self._ns - duration, self._form)
 
     def __str__(self):
         return self.ts
@@ -103,24 +142,36 @@ class Timestamp:
     def __getitem__(self, index):
         return (self.hh, self.mm, self.ss, self.ss)[index]
 
+    @staticmethod
+    def _duration(other):
+        # the number of nanoseconds in a duration, or None if it is not one
+        if isinstance(other, Timestamp):
+            return other._ns
+        if isinstance(other, timedelta):
+            return (other.days * 86400 + other.seconds) * _SECOND + other.microseconds * 1000
+        if isinstance(other, (int, str)):
+            return Timestamp(other)._ns
+        return None
+
     @property
     def ts(self):
         """Generates the timestamp specified in the object."""
-        # parse timestamp format
-        format_groups = match('^(([Hh]{1,2}):)?([Mm]{1,2}):([Ss]{1,2})(\.([Nn]{1,9}))?$', self.form).groups()
-        timestamp_format = [False if format_groups[i] is None else True for i in (1, 2, 3, 5)]
-
-        # create timestamp string
-        timestamp_string = ''
-        if timestamp_format[0] or self._hh:
-            timestamp_string += '{0:0=2d}:'.format(self.hh)
-        if timestamp_format[1] or self._mm:
-            timestamp_string += '{0:0=2d}:'.format(self.mm)
-        if timestamp_format[2] or self._ss:
-            timestamp_string += '{0:0=2d}'.format(self.ss)
-        if timestamp_format[3] or self._nn:
-            timestamp_string += '{:.9f}'.format(self.nn / 1000000000).rstrip('0')[1:] if self.nn else '.0'
-        return timestamp_string
+        if self._string is None:
+            show_hh, show_mm, show_ss, show_nn = _parse_form(self._form)
+            hh, mm, ss, nn = self.hh, self.mm, self.ss, self.nn
+
+            # create timestamp string
+            timestamp_string = ''
+            if show_hh or hh:
+                timestamp_string += '{:02d}:'.format(hh)
+            if show_mm or mm:
+                timestamp_string += '{:02d}:'.format(mm)
+            if show_ss or ss:
+                timestamp_string += '{:02d}'.format(ss)
+            if show_nn or nn:
+                timestamp_string += '.' + '{:09d}'.format(nn).rstrip('0') if nn else '.0'
+            self._string = timestamp_string
+        return self._string
 
     @ts.setter
     def ts(self, timestamp):
@@ -133,43 +184,49 @@ class Timestamp:
         if not isinstance(timestamp, (int, str)):
             raise TypeError('"{}" is not str or int type'.format(type(timestamp)))
         else:
-            self._hh = None
-            self._mm = None
-            self._ss = None
-            self._nn = None
             self.extract(timestamp)
 
+    @property
+    def ns(self):
+        """The total number of nanoseconds in the timestamp."""
+        return self._ns
+
+    @ns.setter
+    def ns(self, value):
+        self._ns = value
+        self._string = None
+
     @property
     def hh(self):
-        return self._hh
+        return self._ns // _HOUR
 
     @hh.setter
     def hh(self, value):
-        self._hh = value
+        self.ns = value * _HOUR + self._ns % _HOUR
 
     @property
     def mm(self):
-        return self._mm
+        return self._ns % _HOUR // _MINUTE
 
     @mm.setter
     def mm(self, value):
-        self._mm = value if value < 60 else 0
+        self.ns = self._ns - self._ns % _HOUR + (value if value < 60 else 0) * _MINUTE + self._ns % _MINUTE
 
     @property
     def ss(self):
-        return self._ss
+        return self._ns % _MINUTE // _SECOND
 
     @ss.setter
     def ss(self, value):
-        self._ss = value if value < 60 else 0
+        self.ns = self._ns - self._ns % _MINUTE + (value if value < 60 else 0) * _SECOND + self._ns % _SECOND
 
     @property
     def nn(self):
-        return self._nn
+        return self._ns % _SECOND
 
     @nn.setter
     def nn(self, value):
-        self._nn = value if value < 1000000000 else 0
+        self.ns = self._ns - self._ns % _SECOND + (value if value < _SECOND else 0)
 
     @property
     def form(self):
@@ -178,6 +235,7 @@ class Timestamp:
     @form.setter
     def form(self, form):
         self._form = form
+        self._string = None
 
     @staticmethod
     def verify(timestamp):
@@ -188,9 +246,7 @@ class Timestamp:
         """
         if not isinstance(timestamp, str):
             raise TypeError('"{}" is not str type'.format(type(timestamp)))
-        elif match('^[0-9]{1,2}(:[0-9]{1,2}){1,2}(\.[0-9]{1,9})?$', timestamp):
-            return True
-        return False
+        return _TIMESTAMP.match(timestamp) is not None
 
     def extract(self, timestamp):
         """Extracts time info from a timestamp.
@@ -199,30 +255,14 @@ class Timestamp:
             A str of a timestamp acceptable to mkvmerge or an int representing seconds. The timing info will be
             extracted from this parameter.
         """
-        if not isinstance(timestamp, (str, int)):
-            raise TypeError('"{}" is not str or int type'.format(type(timestamp)))
-        elif isinstance(timestamp, str) and not Timestamp.verify(timestamp):
-            raise ValueError('"{}" is not a valid timestamp'.format(timestamp))
-        elif isinstance(timestamp, str):
-            # parse timestamp
-            timestamp_groups = match('^(([0-9]{1,2}):)?([0-9]{1,2}):([0-9]{1,2})(\.([0-9]{1,9}))?$', timestamp).groups()
-            timestamp = [timestamp_groups[i] for i in (1, 2, 3, 4)]
-            timestamp_clean = []
-
-            # clean timestamp
-            for ts in timestamp:
-                if ts is None:
-                    timestamp_clean.append(0)
-                else:
-                    timestamp_clean.append(float(ts))
-
-            # set timestamp variables
-            self.hh = int(timestamp_clean[0]) if self._hh is None else self._hh
-            self.mm = int(timestamp_clean[1]) if self._mm is None else self._mm
-            self.ss = int(timestamp_clean[2]) if self._ss is None else self._ss
-            self.nn = int(timestamp_clean[3] * 1000000000) if self._nn is None else self._nn
+        if isinstance(timestamp, str):
+            timestamp_match = _TIMESTAMP.match(timestamp)
+            if timestamp_match is None:
+                raise ValueError('"{}" is not a valid timestamp'.format(timestamp))
+            hh, mm, ss, nn = timestamp_match.groups()
+            self.ns = ((int(hh) * _HOUR if hh else 0) + (int(mm) if int(mm) < 60 else 0) * _MINUTE
+                       + (int(ss) if int(ss) < 60 else 0) * _SECOND + (int(nn.ljust(9, '0')) if nn else 0))
         elif isinstance(timestamp, int):
-            self._hh = int(timestamp / 3600)
-            self._mm = int(timestamp % 3600 / 60)
-            self._ss = int(timestamp % 3600 % 60)
-            self._nn = 0
+            self.ns = timestamp * _SECOND
+        else:
+            raise TypeError('"{}" is not str or int type'.format(type(timestamp)))
@@ -0,0 +1,234 @@
+""":class:`~pymkv.TimestampArray` holds many timestamps as one NumPy array of nanoseconds.
+
+Split plans generated by tools such as scene detection can have tens of thousands of cut points. Parsing, checking,
+and formatting them one :class:`~pymkv.Timestamp` at a time is slow, so a :class:`~pymkv.TimestampArray` does each
+of these once for the whole array. It can be passed directly to :meth:`~pymkv.MKVFile.split_timestamps` and
+:meth:`~pymkv.MKVFile.split_timestamp_parts`.
+
+NumPy is an optional dependency of pymkv. Install it with ``pip install pymkv[numpy]`` to use this class.
+
+Examples
+--------
+Below are some basic examples of how a :class:`~pymkv.TimestampArray` can be used.
+
+Split a file at cut points given in seconds.
+
+>>> import numpy as np
+>>> from pymkv import MKVFile, TimestampArray
+>>> cuts = TimestampArray(np.array([12.5, 61.04, 3600.0]))
+>>> cuts.strings()
+array(['00:12.5', '01:01.04', '01:00:00'], dtype='<U8')
+>>> mkv = MKVFile('path/to/file.mkv')
+>>> mkv.split_timestamps(cuts)
+
+Keep two parts of a file, given as rows of start and end timestamps.
+
+>>> parts = TimestampArray([['00:00:10', '00:01:00'], ['00:05:00', '00:06:30']])
+>>> mkv.split_timestamp_parts(parts)
+"""
+
+import re
+
+from pymkv.Timestamp import Timestamp, _parse_form
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# the number of nanoseconds in a second, minute, and hour
+_SECOND = 1000000000
+_MINUTE = 60 * _SECOND
+_HOUR = 60 * _MINUTE
+
+# one timestamp acceptable to mkvmerge per line
+_TIMESTAMP_LINE = re.compile(r'^(?:([0-9]{1,2}):)?([0-9]{1,2}):([0-9]{1,2})(?:\.([0-9]{1,9}))?$', re.MULTILINE)
+
+
+def _integer_array(values):
+    # a one-dimensional NumPy array of ints, or None if the values are anything else
+    if np is not None and isinstance(values, np.ndarray) and values.dtype.kind in 'iu' and values.ndim == 1:
+        return values
+    return None
+
+
+class TimestampArray:
+    """An array of timestamps stored as int64 nanoseconds.
+
+    Parameters
+    ----------
+    timestamps : :obj:`numpy.ndarray`, list
+        The timestamps. A numeric array is read as seconds, which may be fractional. A list can contain strs of
+        timestamps acceptable to mkvmerge, ints of seconds, or :class:`~pymkv.Timestamp` objects, and may be nested
+        into rows of equal length.
+    form : str, optional
+        The form of the formatted timestamps, as for :class:`~pymkv.Timestamp`.
+
+    Attributes
+    ----------
+    ns : :obj:`numpy.ndarray`
+        The timestamps in nanoseconds.
+    form : str
+        The form of the formatted timestamps.
+
+    Raises
+    ------
+    ImportError
+        Raised if NumPy is not installed.
+    TypeError
+        Raised if a timestamp is not a str, int, or :class:`~pymkv.Timestamp`.
+    ValueError
+        Raised if a str is not a valid timestamp or a timestamp is negative.
+    """
+
+    __slots__ = ('ns', 'form')
+
+    def __init__(self, timestamps, form='MM:SS'):
+        if np is None:
+            raise ImportError('NumPy is required for TimestampArray, install it with "pip install pymkv[numpy]"')
+        self.form = form
+        if isinstance(timestamps, TimestampArray):
+            self.ns = timestamps.ns.copy()
+            return
+        values = np.asarray(timestamps, dtype=object if not isinstance(timestamps, np.ndarray) else None)
+        if values.dtype.kind in 'iu':
+            self.ns = values.astype(np.int64) * _SECOND
+        elif values.dtype.kind == 'f':
+            self.ns = np.rint(values * _SECOND).astype(np.int64)
+        elif values.dtype.kind in 'UO':
+            self.ns = TimestampArray._parse(values)
+        else:
+            raise TypeError('"{}" is not an array of timestamps'.format(values.dtype))
+        if self.ns.size and self.ns.min() < 0:
+            raise ValueError('timestamps can not be negative')
+
+    @classmethod
+    def from_ns(cls, ns, form='MM:SS'):
+        """Create a :class:`~pymkv.TimestampArray` from nanoseconds.
+
+        Parameters
+        ----------
+        ns : :obj:`numpy.ndarray`, list of int
+            The timestamps in nanoseconds.
+        form : str, optional
+            The form of the formatted timestamps.
+
+        Returns
+        -------
+        :class:`~pymkv.TimestampArray`
+            The timestamps.
+        """
+        if np is None:
+            raise ImportError('NumPy is required for TimestampArray, install it with "pip install pymkv[numpy]"')
+        timestamps = cls.__new__(cls)
+        timestamps.ns = np.asarray(ns, dtype=np.int64)
+        timestamps.form = form
+        return timestamps
+
+    def __len__(self):
+        return len(self.ns)
+
+    def __getitem__(self, index):
+        ns = self.ns[index]
+        if isinstance(ns, np.ndarray):
+            return TimestampArray.from_ns(ns, self.form)
+        return Timestamp.from_ns(int(ns), self.form)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return 'TimestampArray({!r})'.format(self.strings().tolist())
+
+    @property
+    def shape(self):
+        """tuple of int: The shape of the array."""
+        return self.ns.shape
+
+    def is_increasing(self):
+        """Check if every timestamp is later than the one before it.
+
+        The timestamps are checked in order after flattening the array.
+
+        Returns
+        -------
+        bool
+            True if the timestamps are strictly increasing.
+        """
+        return bool(np.all(np.diff(self.ns.ravel()) > 0))
+
+    def strings(self):
+        """Format every timestamp in the form of the array.
+
+        The timestamps are formatted exactly like :attr:`~pymkv.Timestamp.ts`.
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            An array of strs with the same shape as the timestamps.
+        """
+        show_hh, show_mm, show_ss, show_nn = _parse_form(self.form)
+        ns = self.ns
+        hh, rest = np.divmod(ns, _HOUR)
+        mm, rest = np.divmod(rest, _MINUTE)
+        ss, nn = np.divmod(rest, _SECOND)
+
+        def field(values, show, suffix):
+            text = np.char.add(np.char.zfill(values.astype(str), 2), suffix)
+            return text if show else np.where(values != 0, text, '')
+
+        strings = np.char.add(np.char.add(field(hh, show_hh, ':'), field(mm, show_mm, ':')), field(ss, show_ss, ''))
+        fraction = np.char.add('.', np.char.rstrip(np.char.zfill(nn.astype(str), 9), '0'))
+        return np.char.add(strings, np.where(nn != 0, fraction, '.0' if show_nn else ''))
+
+    def join(self, separator=','):
+        """Format every timestamp and join them into one str.
+
+        Parameters
+        ----------
+        separator : str, optional
+            The str placed between timestamps.
+
+        Returns
+        -------
+        str
+            The formatted timestamps in order after flattening the array.
+        """
+        return separator.join(self.strings().ravel().tolist())
+
+    @staticmethod
+    def _parse(values):
+        # parse all timestamps with one regex pass over the strs joined by newlines
+        flat = values.ravel()
+        strings = []
+        ns = np.zeros(len(flat), dtype=np.int64)
+        positions = []
+        for position, value in enumerate(flat):
+            if isinstance(value, str):
+                if '\n' in value:
+                    raise ValueError('"{}" is not a valid timestamp'.format(value))
+                strings.append(value)
+                positions.append(position)
+            elif isinstance(value, Timestamp):
+                ns[position] = value.ns
+            elif isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+                ns[position] = value * _SECOND
+            else:
+                raise TypeError('"{}" is not str or int type'.format(type(value)))
+        if strings:
+            matches = _TIMESTAMP_LINE.findall('\n'.join(strings))
+            if len(matches) != len(strings):
+                # find the first invalid timestamp for the error
+                for value in strings:
+                    if not Timestamp.verify(value):
+                        raise ValueError('"{}" is not a valid timestamp'.format(value))
+            fields = np.array(matches, dtype=str).reshape(len(strings), 4)
+            fields = np.where(fields == '', '0', fields)
+            hh, mm, ss = (fields[:, i].astype(np.int64) for i in range(3))
+            nn = np.char.ljust(fields[:, 3], 9, '0').astype(np.int64)
+            mm = np.where(mm < 60, mm, 0)
+            ss = np.where(ss < 60, ss, 0)
+            ns[positions] = hh * _HOUR + mm * _MINUTE + ss * _SECOND + nn
+        return ns.reshape(values.shape)
@@ -3,26 +3,298 @@
 
 """Verification functions for mkvmerge and associated files."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
-from os.path import expanduser, isfile
-from re import match
+from os.path import abspath, expanduser, isfile
+from re import findall, match, search
 import subprocess as sp
+from threading import Lock
+
+from pymkv import aio, ebml
+from pymkv.cache import probe_cache
+from pymkv.executor import get_executor
+
+
+class Executable:
+    """A verified MKVToolNix executable such as mkvmerge.
+
+    Instances are created by :func:`~pymkv.Verifications.verify_executable` and remembered until the executable on
+    disk changes.
+
+    Attributes
+    ----------
+    path : str
+        The resolved path to the executable.
+    version : str
+        The version line printed by the executable.
+    version_info : tuple of int
+        The numeric version of the executable, such as (70, 0, 0).
+    mtime_ns : int
+        The modification time of the executable when it was verified.
+    inode : int
+        The inode of the executable when it was verified.
+    """
+
+    def __init__(self, path, version, mtime_ns, inode):
+        self.path = path
+        self.version = version
+        version_match = search(r'v(\d+(\.\d+)*)', version)
+        self.version_info = tuple(int(part) for part in version_match.group(1).split('.')) if version_match else ()
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+        self._options = None
+
+    def __repr__(self):
+        return repr(self.__dict__)
+
+    @property
+    def options(self):
+        """frozenset of str: The command line options listed by the executable's help output.
+
+        The help output is only read the first time the options are needed.
+        """
+        if self._options is None:
+            try:
+                output = get_executor().run([self.path, '--help']).stdout.decode()
+            except (sp.CalledProcessError, OSError):
+                output = ''
+            self._options = frozenset(findall(r'(?<![\w-])(--?[\w][\w-]*)', output))
+        return self._options
+
+    def supports(self, option):
+        """Check if the executable supports a command line option.
+
+        option (str):
+            The option to look for, such as '--gui-mode'.
+        """
+        return option in self.options
+
+
+# verified executables keyed by the requested path and the $PATH it was resolved with
+_executables = {}
+_executables_lock = Lock()
+
+
+def verify_executable(executable_path='mkvmerge', name='mkvmerge'):
+    """Verify an MKVToolNix executable is working and get its information.
+
+    The executable is only run the first time it is verified. Afterwards the result is reused until the executable's
+    modification time or inode changes, or :func:`~pymkv.Verifications.invalidate_executables` is called.
+
+    executable_path (str):
+        Path to the executable or its name if it is in the $PATH variable.
+    name (str):
+        The name the executable reports in its version output, such as 'mkvmerge' or 'mkvpropedit'.
+
+    Returns the verified :class:`~pymkv.Verifications.Executable` or None if it is not working.
+    """
+    key = (executable_path, name, os.environ.get('PATH'))
+    executable = _executables.get(key)
+    if executable is not None:
+        try:
+            stat = os.stat(executable.path)
+            if (stat.st_mtime_ns, stat.st_ino) == (executable.mtime_ns, executable.inode):
+                return executable
+        except OSError:
+            pass
+
+    # resolve and run the executable
+    executor = get_executor()
+    resolved = executor.resolve(executable_path)
+    if resolved is None:
+        executable = None
+    else:
+        resolved_path, mtime_ns, inode = resolved
+        try:
+            output = executor.run([resolved_path, '-V']).stdout.decode()
+        except (sp.CalledProcessError, OSError):
+            output = ''
+        if match(name + '.*', output):
+            executable = Executable(resolved_path, output.strip(), mtime_ns, inode)
+        else:
+            executable = None
+    with _executables_lock:
+        if executable is None:
+            _executables.pop(key, None)
+        else:
+            _executables[key] = executable
+    return executable
+
+
+def invalidate_executables(executable_path=None):
+    """Forget verified executables so they are run again the next time they are verified.
+
+    executable_path (str):
+        The path of the executable to forget as it was passed to :func:`~pymkv.Verifications.verify_executable`. All
+        executables are forgotten if it is None.
+    """
+    with _executables_lock:
+        for key in list(_executables):
+            if executable_path is None or key[0] == executable_path:
+                del _executables[key]
+
+
+def mkvmerge_version(mkvmerge_path='mkvmerge'):
+    """Get the version of mkvmerge.
+
+    Returns the version line printed by ``mkvmerge -V`` or None if mkvmerge is not working.
+
+    mkvmerge_path (str):
+        Alternate path to mkvmerge if it is not already in the $PATH variable.
+    """
+    executable = verify_executable(mkvmerge_path, name='mkvmerge')
+    return executable.version if executable is not None else None
 
 
 def verify_mkvmerge(mkvmerge_path='mkvmerge'):
     """Verify mkvmerge is working.
 
+    The result is remembered for each path and only checked again when the mkvmerge executable changes.
+
+    mkvmerge_path (str):
+        Alternate path to mkvmerge if it is not already in the $PATH variable.
+    """
+    return verify_executable(mkvmerge_path, name='mkvmerge') is not None
+
+
+def identify(file_path, mkvmerge_path='mkvmerge', native=True, timeout=None):
+    """Identify a file with mkvmerge and return the parsed JSON output.
+
+    This is the single place pymkv runs ``mkvmerge -J``. Matroska files are read with the native reader in
+    :mod:`pymkv.ebml` instead when possible, which does not need to start a process. Results are kept in
+    :data:`pymkv.cache.probe_cache` so an unchanged file is only identified once. If the cache has a persistent
+    :class:`~pymkv.cache.ProbeStore`, mkvmerge results are also looked up in and saved to it. The returned dict is
+    shared with the cache and must not be modified. While the executor replays a recording, see
+    :attr:`pymkv.executor.Executor.replay`, mkvmerge is always run and the file and caches are not used.
+
+    file_path (str):
+        Path to the file to be identified.
+    mkvmerge_path (str):
+        Alternate path to mkvmerge if it is not already in the $PATH variable.
+    native (bool):
+        Read Matroska files with the native reader. If False, mkvmerge is always used.
+    timeout (float):
+        The number of seconds mkvmerge may run before it is killed and :exc:`subprocess.TimeoutExpired` is raised.
+    """
+    return _identify(expanduser(file_path), mkvmerge_path, native, timeout)
+
+
+def _identify(file_path, mkvmerge_path, native, timeout, use_store=True):
+    # identify() with the option of leaving the persistent store alone, for callers that write to it themselves
+    key, info_json, version = _lookup(file_path, mkvmerge_path, native, use_store)
+    if info_json is not None:
+        return info_json
+    try:
+        info_json = json.loads(get_executor().run([mkvmerge_path, '-J', file_path], timeout=timeout).stdout.decode())
+    except sp.CalledProcessError:
+        raise ValueError('"{}" could not be opened'.format(file_path))
+    _remember(file_path, key, version, info_json)
+    return info_json
+
+
+def identify_many(file_paths, mkvmerge_path='mkvmerge', workers=None, timeout=None, native=True):
+    """Identify many files at once.
+
+    The files are identified in parallel with :func:`~pymkv.Verifications.identify`, so they share its caches and
+    Matroska files are read natively when possible. Paths that point to the same file are only identified once. A
+    file that can't be identified does not stop the others, its error is returned in place of its result.
+
+    file_paths (list of str):
+        Paths to the files to be identified.
     mkvmerge_path (str):
         Alternate path to mkvmerge if it is not already in the $PATH variable.
+    workers (int):
+        The maximum number of files identified at the same time. Defaults to the default of
+        :class:`concurrent.futures.ThreadPoolExecutor`.
+    timeout (float):
+        The number of seconds mkvmerge may run for each file.
+    native (bool):
+        Read Matroska files with the native reader. If False, mkvmerge is always used.
+
+    Returns a dict mapping each path in `file_paths` to its parsed ``mkvmerge -J`` output, or to the exception raised
+    while identifying it. The results can be turned into objects with :meth:`~pymkv.MKVFile.from_probe` and
+    :meth:`~pymkv.MKVTrack.from_probe`.
     """
+    paths = {}
+    for file_path in file_paths:
+        paths.setdefault(abspath(expanduser(file_path)), []).append(file_path)
+
+    def probe(path):
+        try:
+            return identify(path, mkvmerge_path=mkvmerge_path, native=native, timeout=timeout)
+        except Exception as error:
+            return error
+
+    results = {}
+    with ThreadPoolExecutor(workers) as executor:
+        for path, result in zip(paths, executor.map(probe, paths)):
+            for file_path in paths[path]:
+                results[file_path] = result
+    return results
+
+
+async def aidentify(file_path, mkvmerge_path='mkvmerge', native=True):
+    """Identify a file without blocking the event loop.
+
+    This is the coroutine version of :func:`~pymkv.Verifications.identify` and shares its caches. mkvmerge is run
+    with :func:`pymkv.aio.run`, within the concurrency limit of :mod:`pymkv.aio`.
+
+    file_path (str):
+        Path to the file to be identified.
+    mkvmerge_path (str):
+        Alternate path to mkvmerge if it is not already in the $PATH variable.
+    native (bool):
+        Read Matroska files with the native reader. If False, mkvmerge is always used.
+    """
+    file_path = expanduser(file_path)
+    loop = asyncio.get_event_loop()
+    key, info_json, version = await loop.run_in_executor(None, _lookup, file_path, mkvmerge_path, native)
+    if info_json is not None:
+        return info_json
     try:
-        output = sp.check_output([mkvmerge_path, '-V']).decode()
-    except (sp.CalledProcessError, FileNotFoundError):
-        return False
-    if match('mkvmerge.*', output):
-        return True
-    return False
+        info_json = json.loads((await aio.run([mkvmerge_path, '-J', file_path], stderr=None)).stdout.decode())
+    except sp.CalledProcessError:
+        raise ValueError('"{}" could not be opened'.format(file_path))
+    _remember(file_path, key, version, info_json)
+    return info_json
+
+
+def _lookup(file_path, mkvmerge_path, native, use_store=True):
+    # look for an identification that does not need mkvmerge to be run
+    if get_executor().replay:
+        # a recording holds the mkvmerge output of every file, which may not exist here
+        return None, None, None
+    if not isfile(file_path):
+        raise FileNotFoundError('"{}" does not exist'.format(file_path))
+    key = probe_cache.key(file_path, mkvmerge_path=mkvmerge_path)
+    info_json = probe_cache.get(key)
+    if info_json is not None:
+        return key, info_json, None
+    if native:
+        try:
+            info_json = ebml.identify(file_path)
+        except ebml.EBMLError:
+            pass
+        else:
+            probe_cache.put(key, info_json)
+            return key, info_json, None
+    store = probe_cache.store
+    version = mkvmerge_version(mkvmerge_path=mkvmerge_path) if store is not None and use_store else None
+    if version is not None:
+        info_json = store.get(file_path, version)
+        if info_json is not None:
+            probe_cache.put(key, info_json)
+    return key, info_json, version
+
+
+def _remember(file_path, key, version, info_json):
+    if key is None:
+        return
+    probe_cache.put(key, info_json)
+    if version is not None:
+        probe_cache.store.put(file_path, version, info_json, identity=key[1:])
 
 
 def verify_matroska(file_path, mkvmerge_path='mkvmerge'):
@@ -40,13 +312,7 @@ def verify_matroska(file_path, mkvmerge_path='mkvmerge'):
         file_path = str(file_path)
     elif not isinstance(file_path, str):
         raise TypeError('"{}" is not of type str'.format(file_path))
-    file_path = expanduser(file_path)
-    if not isfile(file_path):
-        raise FileNotFoundError('"{}" does not exist'.format(file_path))
-    try:
-        info_json = json.loads(sp.check_output([mkvmerge_path, '-J', expanduser(file_path)]).decode())
-    except sp.CalledProcessError:
-        raise ValueError('"{}" could not be opened'.format(file_path))
+    info_json = identify(file_path, mkvmerge_path=mkvmerge_path)
     return info_json['container']['type'] == 'Matroska'
 
 
@@ -63,13 +329,7 @@ def verify_recognized(file_path, mkvmerge_path='mkvmerge'):
                                 'property')
     if not isinstance(file_path, str):
         raise TypeError('"{}" is not of type str'.format(file_path))
-    file_path = expanduser(file_path)
-    if not isfile(file_path):
-        raise FileNotFoundError('"{}" does not exist'.format(file_path))
-    try:
-        info_json = json.loads(sp.check_output([mkvmerge_path, '-J', file_path]).decode())
-    except sp.CalledProcessError:
-        raise ValueError('"{}" could not be opened'.format(file_path))
+    info_json = identify(file_path, mkvmerge_path=mkvmerge_path)
     return info_json['container']['recognized']
 
 
@@ -86,11 +346,5 @@ def verify_supported(file_path, mkvmerge_path='mkvmerge'):
                                 'property')
     if not isinstance(file_path, str):
         raise TypeError('"{}" is not of type str'.format(file_path))
-    file_path = expanduser(file_path)
-    if not isfile(file_path):
-        raise FileNotFoundError('"{}" does not exist'.format(file_path))
-    try:
-        info_json = json.loads(sp.check_output([mkvmerge_path, '-J', file_path]).decode())
-    except sp.CalledProcessError:
-        raise ValueError('"{}" could not be opened')
+    info_json = identify(file_path, mkvmerge_path=mkvmerge_path)
     return info_json['container']['supported']
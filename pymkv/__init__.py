@@ -8,7 +8,8 @@ from .MKVAttachment import MKVAttachment
 from .MKVTrack import MKVTrack
 from .MKVFile import MKVFile
 from .Timestamp import Timestamp
-from .Verifications import verify_matroska, verify_mkvmerge, verify_recognized, verify_supported
+from .TimestampArray import TimestampArray
+from .Verifications import identify_many, verify_matroska, verify_mkvmerge, verify_recognized, verify_supported
 
 
 # set the version number within the package using setuptools-scm
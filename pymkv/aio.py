@@ -0,0 +1,148 @@
+"""Running MKVToolNix processes from :mod:`asyncio`.
+
+The coroutine versions of the pymkv operations, such as :meth:`~pymkv.MKVFile.amux`, :meth:`~pymkv.MKVFile.aopen`,
+and :meth:`~pymkv.MKVTrack.aopen`, start their processes with the coroutine methods of the executor from
+:func:`~pymkv.executor.get_executor` so they never block the event loop. All of them share one concurrency limit per
+event loop. Operations over the limit wait for a running process to finish before starting their own.
+
+Cancelling an operation kills its process and waits for it to exit, so no orphaned processes are left behind.
+
+Examples
+--------
+Below are some basic examples of how the asynchronous API can be used.
+
+Mux many files at once while never running more than 8 mkvmerge processes.
+
+>>> import asyncio
+>>> from pymkv import MKVFile, aio
+>>> aio.set_limit(8)
+>>> async def remux(paths):
+...     files = await asyncio.gather(*(MKVFile.aopen(path) for path in paths))
+...     await asyncio.gather(*(mkv.amux(path + '.remux.mkv', silent=True) for mkv, path in zip(files, paths)))
+>>> asyncio.run(remux(['/path/to/file1.mkv', '/path/to/file2.mkv']))
+"""
+
+import asyncio
+import os
+import subprocess as sp
+from weakref import WeakKeyDictionary
+
+from pymkv.executor import get_executor
+
+
+# the maximum number of processes run at the same time in each event loop
+_limit = os.cpu_count() or 1
+_semaphores = WeakKeyDictionary()
+
+
+def get_limit():
+    """Get the maximum number of processes run at the same time.
+
+    Returns
+    -------
+    int, None
+        The maximum number of processes, or None if there is no limit.
+    """
+    return _limit
+
+
+def set_limit(limit):
+    """Set the maximum number of processes run at the same time in each event loop.
+
+    The new limit applies to processes started after it is set.
+
+    Parameters
+    ----------
+    limit : int, None
+        The maximum number of processes. Set to None to remove the limit.
+
+    Raises
+    ------
+    ValueError
+        Raised if `limit` is not a positive int or None.
+    """
+    global _limit
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        raise ValueError('"{}" is not a valid limit'.format(limit))
+    _limit = limit
+    _semaphores.clear()
+
+
+def _semaphore():
+    loop = asyncio.get_event_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None and _limit is not None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_limit)
+    return semaphore
+
+
+async def run(args, stdout=sp.PIPE, stderr=sp.PIPE, check=True):
+    """Run a process within the concurrency limit and wait for it to finish.
+
+    If the coroutine is cancelled, the process is killed and reaped before the cancellation is propagated.
+
+    Parameters
+    ----------
+    args : list of str
+        The command to run.
+    stdout : int, optional
+        Where the output of the process goes. Takes the same values as :func:`subprocess.run`.
+    stderr : int, optional
+        Where the error output of the process goes. Takes the same values as :func:`subprocess.run`.
+    check : bool, optional
+        Raise an error if the process exits with a non-zero return code.
+
+    Returns
+    -------
+    :obj:`subprocess.CompletedProcess`
+        The arguments, return code, and captured output of the process.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        Raised if `check` is True and the process exits with a non-zero return code.
+    """
+    semaphore = _semaphore()
+    if semaphore is not None:
+        await semaphore.acquire()
+    try:
+        return await get_executor().arun(args, stdout=stdout, stderr=stderr, check=check)
+    finally:
+        if semaphore is not None:
+            semaphore.release()
+
+
+async def stream(args):
+    """Run a process within the concurrency limit and iterate over its output lines as they are written.
+
+    The error output of the process is merged into its output. If the iteration is cancelled or stopped early, the
+    process is killed and reaped.
+
+    Parameters
+    ----------
+    args : list of str
+        The command to run.
+
+    Yields
+    ------
+    bytes
+        Each line of output, including its line ending.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        Raised after the last line if the process exits with a non-zero return code.
+    """
+    semaphore = _semaphore()
+    if semaphore is not None:
+        await semaphore.acquire()
+    try:
+        lines = get_executor().astream(args)
+        try:
+            async for line in lines:
+                yield line
+        finally:
+            await lines.aclose()
+    finally:
+        if semaphore is not None:
+            semaphore.release()
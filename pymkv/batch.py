@@ -0,0 +1,269 @@
+""":class:`~pymkv.batch.MuxQueue` runs many mux jobs in parallel with a bounded number of mkvmerge processes.
+
+Muxing is mostly limited by disk throughput, so running too many jobs against the same disk slows all of them down
+while running them one at a time leaves other disks and cores idle. A :class:`~pymkv.batch.MuxQueue` runs up to
+`workers` jobs at once, never runs more than `per_volume` jobs that read from or write to the same volume, and starts
+the largest jobs first so the batch doesn't end waiting on one big job.
+
+Examples
+--------
+Below are some basic examples of how the :class:`~pymkv.batch.MuxQueue` can be used.
+
+Remux a set of files with at most 8 mkvmerge processes and 2 per volume.
+
+>>> from pymkv import MKVFile
+>>> from pymkv.batch import MuxQueue
+>>> queue = MuxQueue(workers=8, per_volume=2)
+>>> for path in ['/path/to/file1.mkv', '/path/to/file2.mkv']:
+...     mkv = MKVFile(path)
+...     mkv.no_global_tags()
+...     queue.add(mkv, path + '.remux.mkv')
+>>> for result in queue.run():
+...     print(result.output_path, result.success, result.elapsed)
+"""
+
+from collections import namedtuple
+import errno
+import os
+from os.path import abspath, dirname, expanduser, getsize
+import subprocess as sp
+import threading
+import time
+
+from pymkv.executor import get_executor
+from pymkv.Verifications import verify_mkvmerge
+
+
+class MuxResult(namedtuple('MuxResult', ['file', 'output_path', 'returncode', 'attempts', 'elapsed', 'error',
+                                         'output'])):
+    """The result of a mux job.
+
+    Attributes
+    ----------
+    file : :class:`~pymkv.MKVFile`
+        The muxed file.
+    output_path : str
+        The path of the output file.
+    returncode : int, None
+        The return code of mkvmerge. None if mkvmerge could not be run.
+    attempts : int
+        The number of times the job was run.
+    elapsed : float
+        The number of seconds the last attempt took.
+    error : Exception, None
+        The error of the last attempt, or None if the job succeeded.
+    output : bytes
+        The output of mkvmerge in the last attempt.
+    """
+
+    __slots__ = ()
+
+    @property
+    def success(self):
+        """bool: True if mkvmerge finished, with or without warnings."""
+        return self.returncode in (0, 1)
+
+
+class MuxQueue:
+    """A queue of mux jobs run in parallel.
+
+    Parameters
+    ----------
+    workers : int, optional
+        The maximum number of mkvmerge processes run at the same time. Defaults to the number of CPUs.
+    per_volume : int, None, optional
+        The maximum number of jobs that read from or write to the same volume at the same time. Set to None for no
+        limit.
+    retries : int, optional
+        The number of times a job is run again after a transient failure.
+    retry_delay : float, optional
+        The number of seconds to wait before running a job again.
+
+    Raises
+    ------
+    ValueError
+        Raised if `per_volume` is less than 1.
+    """
+
+    # errors starting a process that can go away on their own
+    TRANSIENT_ERRNOS = frozenset((errno.EAGAIN, errno.ENOMEM, errno.EMFILE, errno.ENFILE, errno.EINTR))
+
+    def __init__(self, workers=None, per_volume=2, retries=2, retry_delay=1.0):
+        if per_volume is not None and per_volume < 1:
+            raise ValueError('"{}" is not a valid number of jobs per volume'.format(per_volume))
+        self.workers = workers or os.cpu_count() or 1
+        self.per_volume = per_volume
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._jobs = []
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __repr__(self):
+        return repr(self.__dict__)
+
+    def add(self, file, output_path):
+        """Add a mux job to the queue.
+
+        Parameters
+        ----------
+        file : :class:`~pymkv.MKVFile`
+            The file to be muxed.
+        output_path : str
+            The path to be used as the output file.
+        """
+        self._jobs.append((file, abspath(expanduser(output_path))))
+
+    def clear(self):
+        """Remove all jobs from the queue."""
+        self._jobs = []
+
+    @staticmethod
+    def estimate_size(file):
+        """Estimate the number of bytes a mux job reads.
+
+        Parameters
+        ----------
+        file : :class:`~pymkv.MKVFile`
+            The file to be muxed.
+
+        Returns
+        -------
+        int
+            The combined size of every distinct input file of the job.
+        """
+        size = 0
+        for path in MuxQueue._inputs(file):
+            try:
+                size += getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def is_transient(self, error):
+        """Check if a failed attempt should be retried.
+
+        A job is retried if mkvmerge could not be started because of a temporary lack of resources or if it was
+        killed by a signal, such as by the out of memory killer. Subclasses can override this to retry other errors.
+
+        Parameters
+        ----------
+        error : Exception
+            The error of the failed attempt.
+
+        Returns
+        -------
+        bool
+            True if the job should be run again.
+        """
+        if isinstance(error, sp.CalledProcessError):
+            return error.returncode < 0
+        return isinstance(error, OSError) and error.errno in self.TRANSIENT_ERRNOS
+
+    def run(self):
+        """Run every job in the queue and wait for them to finish.
+
+        The queue is emptied once the jobs have been started.
+
+        Returns
+        -------
+        list of :obj:`MuxResult`
+            The result of each job, in the order the jobs were added.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if the path to mkvmerge of any job could not be verified.
+        """
+        jobs, self._jobs = self._jobs, []
+        for mkvmerge_path in {file.mkvmerge_path for file, _ in jobs}:
+            if not verify_mkvmerge(mkvmerge_path=mkvmerge_path):
+                raise FileNotFoundError('mkvmerge is not at the specified path, add it there or change the '
+                                        'mkvmerge_path property')
+
+        # start the largest jobs first
+        pending = sorted(range(len(jobs)), key=lambda index: self.estimate_size(jobs[index][0]), reverse=True)
+        volumes = [self._volumes(file, output_path) for file, output_path in jobs]
+        busy_volumes = {}
+        results = [None] * len(jobs)
+        condition = threading.Condition()
+
+        def next_job():
+            # the largest pending job whose volumes all have a free slot
+            for position, index in enumerate(pending):
+                if self.per_volume is None or all(busy_volumes.get(volume, 0) < self.per_volume
+                                                  for volume in volumes[index]):
+                    del pending[position]
+                    return index
+            return None
+
+        def worker():
+            while True:
+                with condition:
+                    index = next_job()
+                    while index is None and pending:
+                        condition.wait()
+                        index = next_job()
+                    if index is None:
+                        return
+                    for volume in volumes[index]:
+                        busy_volumes[volume] = busy_volumes.get(volume, 0) + 1
+                try:
+                    results[index] = self._run_job(*jobs[index])
+                finally:
+                    with condition:
+                        for volume in volumes[index]:
+                            busy_volumes[volume] -= 1
+                        condition.notify_all()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(jobs)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _run_job(self, file, output_path):
+        attempts = 0
+        while True:
+            attempts += 1
+            returncode = None
+            output = b''
+            error = None
+            start = time.monotonic()
+            try:
+                with file.options_file(file.command(output_path, subprocess=True)) as command:
+                    process = get_executor().run(command, stdout=sp.PIPE, stderr=sp.STDOUT, check=False)
+                returncode, output = process.returncode, process.stdout
+                if returncode not in (0, 1):
+                    error = sp.CalledProcessError(returncode, process.args, output)
+            except Exception as run_error:
+                # any error becomes the job's result so the worker keeps running the queue
+                error = run_error
+            elapsed = time.monotonic() - start
+            if error is None or attempts > self.retries or not self.is_transient(error):
+                return MuxResult(file, output_path, returncode, attempts, elapsed, error, output)
+            time.sleep(self.retry_delay)
+
+    @staticmethod
+    def _inputs(file):
+        inputs = {track.file_path for track in file.tracks}
+        inputs.update(attachment.file_path for attachment in file.attachments)
+        return inputs
+
+    @staticmethod
+    def _volumes(file, output_path):
+        volumes = set()
+        for path in MuxQueue._inputs(file) | {output_path}:
+            # the output file may not exist yet, use the closest existing directory
+            while True:
+                try:
+                    volumes.add(os.stat(path).st_dev)
+                    break
+                except OSError:
+                    parent = dirname(path)
+                    if parent == path:
+                        break
+                    path = parent
+        return volumes
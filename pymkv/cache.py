@@ -0,0 +1,425 @@
+"""Caching of mkvmerge identification results.
+
+pymkv identifies files by running ``mkvmerge -J``, which costs a process launch and a scan of the container every
+time. The results are kept in a process-wide :class:`~pymkv.cache.ProbeCache` so that looking at the same unchanged
+file again is served from memory. Entries are keyed on the identity of the file on disk, its path, size,
+modification time and inode, so a file that has been edited or replaced is identified again.
+
+Examples
+--------
+Below are some basic examples of how the probe cache can be used.
+
+Check how effective the cache has been so far.
+
+>>> from pymkv.cache import probe_cache
+>>> probe_cache.info()
+CacheInfo(hits=12, misses=3, maxsize=1024, currsize=3)
+
+Allow more files to be remembered, or disable caching entirely by setting the size to 0.
+
+>>> probe_cache.maxsize = 10000
+>>> probe_cache.maxsize = 0
+
+Forget everything that has been cached.
+
+>>> probe_cache.clear()
+
+Keep identification results on disk so they survive restarts and are shared between processes. Results stored by a
+different version of mkvmerge or for a file that has since changed are ignored.
+
+>>> from pymkv.cache import ProbeStore
+>>> probe_cache.store = ProbeStore('/var/cache/pymkv.db')
+>>> probe_cache.store.warm(['/path/to/file1.mkv', '/path/to/file2.mkv'], workers=8)
+2
+"""
+
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+from os.path import abspath, expanduser
+import sqlite3
+from threading import Lock, local
+import time
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def file_identity(file_path):
+    """Get the identity of a file on disk.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file.
+
+    Returns
+    -------
+    tuple
+        The absolute path, size, modification time in nanoseconds, and inode of the file.
+
+    Raises
+    ------
+    FileNotFoundError
+        Raised if the file does not exist.
+    """
+    file_path = abspath(expanduser(file_path))
+    stat = os.stat(file_path)
+    return file_path, stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class ProbeCache:
+    """A thread safe, least recently used cache of mkvmerge identification results.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of identification results to keep. The least recently used result is evicted once the
+        cache is full. A `maxsize` of 0 disables the cache.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups that were answered from the cache.
+    misses : int
+        The number of lookups that were not found in the cache.
+    store : :class:`~pymkv.cache.ProbeStore`
+        An optional persistent store that is consulted when a result is not in memory and that is given every new
+        identification result. None by default.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.store = None
+        self._entries = OrderedDict()
+        self._paths = {}
+        self._lock = Lock()
+        self._maxsize = None
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return repr(self.info())
+
+    @property
+    def maxsize(self):
+        """int: The maximum number of identification results to keep.
+
+        Lowering *maxsize* immediately evicts the least recently used results that no longer fit.
+
+        Raises
+        ------
+        ValueError
+            Raised if *maxsize* is negative.
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError('"{}" is not a valid cache size'.format(maxsize))
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    @staticmethod
+    def key(file_path, mkvmerge_path='mkvmerge'):
+        """Build the cache key of a file.
+
+        The key should be built before the file is identified so a file that changes while mkvmerge is reading it
+        will not be served from the cache afterwards.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the identified file.
+        mkvmerge_path : str, optional
+            The mkvmerge executable used to identify the file. Different executables are cached separately.
+
+        Returns
+        -------
+        tuple
+            The mkvmerge path followed by the :func:`~pymkv.cache.file_identity` of `file_path`.
+        """
+        return (mkvmerge_path,) + file_identity(file_path)
+
+    def get(self, key):
+        """Get a cached identification result.
+
+        The returned object is shared with the cache and must not be modified.
+
+        Parameters
+        ----------
+        key : tuple
+            A key built with :meth:`~pymkv.cache.ProbeCache.key`.
+
+        Returns
+        -------
+        dict, None
+            The parsed ``mkvmerge -J`` output, or None if `key` is not cached.
+        """
+        with self._lock:
+            info_json = self._entries.get(key)
+            if info_json is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return info_json
+
+    def put(self, key, info_json):
+        """Add an identification result to the cache.
+
+        Parameters
+        ----------
+        key : tuple
+            A key built with :meth:`~pymkv.cache.ProbeCache.key`.
+        info_json : dict
+            The parsed ``mkvmerge -J`` output of the file.
+        """
+        with self._lock:
+            if self._maxsize == 0:
+                return
+            # a file only has one current identity, drop the result of any previous version of it
+            stale_key = self._paths.get(key[:2])
+            if stale_key is not None and stale_key != key:
+                self._entries.pop(stale_key, None)
+            self._paths[key[:2]] = key
+            self._entries[key] = info_json
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def invalidate(self, file_path):
+        """Remove every cached result for a file regardless of its identity.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file to forget.
+        """
+        file_path = abspath(expanduser(file_path))
+        with self._lock:
+            for path_key in [path_key for path_key in self._paths if path_key[1] == file_path]:
+                self._entries.pop(self._paths.pop(path_key), None)
+
+    def clear(self):
+        """Remove all cached results and reset the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._paths.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Get the statistics of the cache.
+
+        Returns
+        -------
+        :obj:`CacheInfo`
+            A named tuple of the hits, misses, maximum size, and current size of the cache.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize, len(self._entries))
+
+    def _evict(self):
+        while len(self._entries) > self._maxsize:
+            key = self._entries.popitem(last=False)[0]
+            if self._paths.get(key[:2]) == key:
+                del self._paths[key[:2]]
+
+
+class ProbeStore:
+    """A persistent store of mkvmerge identification results backed by SQLite.
+
+    A :class:`~pymkv.cache.ProbeStore` can be shared by any number of threads and processes. The database is opened in
+    write-ahead logging mode so readers never block each other and writers wait for each other instead of failing.
+    Each result is stored along with the identity of the file and the version of mkvmerge that produced it, and is
+    only returned while both still match.
+
+    Parameters
+    ----------
+    db_path : str
+        Path to the SQLite database. It will be created if it does not exist.
+    max_entries : int, optional
+        The maximum number of results to keep. The least recently used results are evicted once the store grows past
+        this size.
+    timeout : float, optional
+        The number of seconds to wait for another process to release the database before giving up.
+    """
+
+    # number of writes between checks of the store size
+    _EVICT_INTERVAL = 256
+    # number of seconds a result's access time can be stale before it is refreshed
+    _TOUCH_INTERVAL = 60
+
+    def __init__(self, db_path, max_entries=100000, timeout=30.0):
+        self.db_path = abspath(expanduser(db_path))
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = local()
+        self._writes = 0
+        with self._connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS probes ('
+                               'path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, '
+                               'inode INTEGER NOT NULL, mkvmerge_version TEXT NOT NULL, info TEXT NOT NULL, '
+                               'accessed REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS probes_accessed ON probes (accessed)')
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM probes').fetchone()[0]
+
+    def __repr__(self):
+        return repr(self.__dict__)
+
+    def get(self, file_path, mkvmerge_version):
+        """Get a stored identification result.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the identified file.
+        mkvmerge_version : str
+            The version output of the mkvmerge executable in use.
+
+        Returns
+        -------
+        dict, None
+            The parsed ``mkvmerge -J`` output, or None if no valid result is stored for `file_path`.
+        """
+        path, size, mtime_ns, inode = file_identity(file_path)
+        connection = self._connection()
+        row = connection.execute('SELECT info, accessed FROM probes WHERE path = ? AND size = ? AND mtime_ns = ? '
+                                 'AND inode = ? AND mkvmerge_version = ?',
+                                 (path, size, mtime_ns, inode, mkvmerge_version)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self._TOUCH_INTERVAL:
+            connection.execute('UPDATE probes SET accessed = ? WHERE path = ?', (now, path))
+        return json.loads(row[0])
+
+    def put(self, file_path, mkvmerge_version, info_json, identity=None):
+        """Store an identification result, replacing any previous result for the file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the identified file.
+        mkvmerge_version : str
+            The version output of the mkvmerge executable that identified the file.
+        info_json : dict
+            The parsed ``mkvmerge -J`` output of the file.
+        identity : tuple, optional
+            The :func:`~pymkv.cache.file_identity` of the file taken before it was identified. It will be read from
+            the file if not given.
+        """
+        self._write([(identity or file_identity(file_path)) + (mkvmerge_version, json.dumps(info_json))])
+
+    def warm(self, file_paths, mkvmerge_path='mkvmerge', workers=4):
+        """Identify and store every file that does not already have a valid result.
+
+        Files are identified concurrently and stored in a single transaction. Files that cannot be identified are
+        skipped.
+
+        Parameters
+        ----------
+        file_paths : list of str
+            Paths to the files to identify.
+        mkvmerge_path : str, optional
+            Alternate path to mkvmerge if it is not already in the $PATH variable.
+        workers : int, optional
+            The number of files identified at the same time.
+
+        Returns
+        -------
+        int
+            The number of files that were identified and stored.
+        """
+        from pymkv.Verifications import _identify, mkvmerge_version
+
+        version = mkvmerge_version(mkvmerge_path=mkvmerge_path)
+        if version is None:
+            raise FileNotFoundError('mkvmerge is not at the specified path, add it there or change the mkvmerge_path '
+                                    'property')
+        missing = {}
+        for file_path in file_paths:
+            try:
+                if self.get(file_path, version) is None:
+                    missing[abspath(expanduser(file_path))] = None
+            except OSError:
+                pass
+
+        def probe(path):
+            try:
+                identity = file_identity(path)
+                # the rows are written below in one transaction, so identify without writing to a store
+                info_json = _identify(path, mkvmerge_path, native=True, timeout=None, use_store=False)
+                return identity + (version, json.dumps(info_json))
+            except (OSError, ValueError):
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            rows = [row for row in executor.map(probe, missing) if row is not None]
+        self._write(rows)
+        return len(rows)
+
+    def invalidate(self, file_path):
+        """Remove the stored result for a file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file to forget.
+        """
+        with self._connection() as connection:
+            connection.execute('DELETE FROM probes WHERE path = ?', (abspath(expanduser(file_path)),))
+
+    def clear(self):
+        """Remove all stored results."""
+        with self._connection() as connection:
+            connection.execute('DELETE FROM probes')
+
+    def evict(self):
+        """Remove the least recently used results until the store is no larger than *max_entries*."""
+        with self._connection() as connection:
+            connection.execute('DELETE FROM probes WHERE path IN (SELECT path FROM probes ORDER BY accessed DESC '
+                               'LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def close(self):
+        """Close the database connection of the current thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connection(self):
+        # connections can not be shared between threads or inherited by forked processes
+        if getattr(self._local, 'pid', None) != os.getpid() or self._local.connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _write(self, rows):
+        if not rows:
+            return
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany('INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                   [row + (now,) for row in rows])
+        self._writes += len(rows)
+        if self._writes >= self._EVICT_INTERVAL or len(rows) > 1:
+            self._writes = 0
+            self.evict()
+
+
+# the cache shared by every identification in the process
+probe_cache = ProbeCache()
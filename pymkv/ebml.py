@@ -0,0 +1,796 @@
+"""A pure Python reader for the metadata of Matroska files.
+
+Identifying a file with mkvmerge costs a process launch and a scan of the container. For Matroska and WebM files,
+the metadata pymkv needs is stored in a handful of EBML elements at known positions, so it can be read directly from
+the file instead. :func:`~pymkv.ebml.identify` reads the EBML header and the Segment Info, Tracks, Attachments, and
+Chapters elements. It uses the SeekHead to jump over the Clusters and stops as soon as it has the metadata. The
+result has the same structure as the output of ``mkvmerge -J`` for the parts pymkv uses.
+
+Files are read through a memory map by an :class:`~pymkv.ebml.ElementScanner`. It yields the IDs, offsets, and sizes
+of elements without copying their payloads, so only the bytes of the elements that are actually decoded are read from
+disk. This keeps random access to the index elements at the end of very large files, such as the Cues, Tags, and
+Attachments, cheap.
+
+:func:`pymkv.Verifications.identify` uses this reader for Matroska files automatically and only falls back to
+mkvmerge when it raises :class:`~pymkv.ebml.EBMLError`.
+
+Examples
+--------
+Below are some basic examples of how the reader can be used.
+
+Check if a file is a Matroska file and list its tracks.
+
+>>> from pymkv import ebml
+>>> ebml.is_matroska('path/to/file.mkv')
+True
+>>> info_json = ebml.identify('path/to/file.mkv')
+>>> [(track['id'], track['type'], track['codec']) for track in info_json['tracks']]
+[(0, 'video', 'AVC/H.264/MPEG-4p10'), (1, 'audio', 'AAC')]
+
+Decode the chapters or an attachment only when they are needed.
+
+>>> ebml.read_chapters('path/to/file.mkv')[0]
+{'edition': 0, 'uid': 1, 'start': 0, 'end': None, 'name': 'Intro', 'language': 'eng'}
+>>> font = ebml.read_attachment('path/to/file.mkv', 1)
+
+Find the Cues of a large file and look at their payload without reading the rest of the file.
+
+>>> with ebml.ElementScanner('path/to/file.mkv') as scanner:
+...     cues = scanner.find(ebml.CUES)
+...     for element in scanner.elements(cues.data_offset, cues.data_offset + cues.size):
+...         print(element)
+Element(id=187, offset=1830452611, data_offset=1830452613, size=24)
+"""
+
+from collections import namedtuple
+import mmap
+from os.path import expanduser
+import struct
+
+# EBML header
+EBML = 0x1A45DFA3
+DOC_TYPE = 0x4282
+VOID = 0xEC
+CRC32 = 0xBF
+
+# segment
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TRACKS = 0x1654AE6B
+ATTACHMENTS = 0x1941A469
+CHAPTERS = 0x1043A770
+CLUSTER = 0x1F43B675
+CUES = 0x1C53BB6B
+TAGS = 0x1254C367
+
+# segment info
+TIMESTAMP_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TITLE = 0x7BA9
+MUXING_APP = 0x4D80
+WRITING_APP = 0x5741
+SEGMENT_UID = 0x73A4
+
+# tracks
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_UID = 0x73C5
+TRACK_TYPE = 0x83
+FLAG_ENABLED = 0xB9
+FLAG_DEFAULT = 0x88
+FLAG_FORCED = 0x55AA
+NAME = 0x536E
+LANGUAGE = 0x22B59C
+LANGUAGE_IETF = 0x22B59D
+CODEC_ID = 0x86
+CODEC_PRIVATE = 0x63A2
+DEFAULT_DURATION = 0x23E383
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+DISPLAY_WIDTH = 0x54B0
+DISPLAY_HEIGHT = 0x54BA
+AUDIO = 0xE1
+SAMPLING_FREQUENCY = 0xB5
+CHANNELS = 0x9F
+BIT_DEPTH = 0x6264
+
+# attachments
+ATTACHED_FILE = 0x61A7
+FILE_DESCRIPTION = 0x467E
+FILE_NAME = 0x466E
+FILE_MIME_TYPE = 0x4660
+FILE_DATA = 0x465C
+FILE_UID = 0x46AE
+
+# chapters
+EDITION_ENTRY = 0x45B9
+CHAPTER_ATOM = 0xB6
+CHAPTER_UID = 0x73C4
+CHAPTER_TIME_START = 0x91
+CHAPTER_TIME_END = 0x92
+CHAPTER_DISPLAY = 0x80
+CHAP_STRING = 0x85
+CHAP_LANGUAGE = 0x437C
+
+# Matroska track types as reported by mkvmerge
+TRACK_TYPES = {
+    1: 'video',
+    2: 'audio',
+    17: 'subtitles',
+    18: 'buttons',
+}
+
+# codec names as reported by mkvmerge, matched by codec ID prefix
+CODEC_NAMES = (
+    ('V_MPEG4/ISO/AVC', 'AVC/H.264/MPEG-4p10'),
+    ('V_MPEGH/ISO/HEVC', 'HEVC/H.265/MPEG-H'),
+    ('V_MPEG4/ISO/', 'MPEG-4p2'),
+    ('V_MPEG1', 'MPEG-1/2'),
+    ('V_MPEG2', 'MPEG-1/2'),
+    ('V_AV1', 'AV1'),
+    ('V_VP8', 'VP8'),
+    ('V_VP9', 'VP9'),
+    ('V_THEORA', 'Theora'),
+    ('V_PRORES', 'ProRes'),
+    ('V_REAL/', 'RealVideo'),
+    ('A_AAC', 'AAC'),
+    ('A_AC3', 'AC-3'),
+    ('A_EAC3', 'E-AC-3'),
+    ('A_DTS', 'DTS'),
+    ('A_TRUEHD', 'TrueHD'),
+    ('A_MLP', 'MLP'),
+    ('A_FLAC', 'FLAC'),
+    ('A_OPUS', 'Opus'),
+    ('A_VORBIS', 'Vorbis'),
+    ('A_MPEG/L3', 'MP3'),
+    ('A_MPEG/L2', 'MP2'),
+    ('A_PCM/', 'PCM'),
+    ('A_ALAC', 'ALAC'),
+    ('A_TTA1', 'TTA'),
+    ('A_WAVPACK4', 'WavPack4'),
+    ('A_REAL/', 'RealAudio'),
+    ('S_TEXT/UTF8', 'SubRip/SRT'),
+    ('S_TEXT/ASCII', 'SubRip/SRT'),
+    ('S_TEXT/ASS', 'SubStationAlpha'),
+    ('S_TEXT/SSA', 'SubStationAlpha'),
+    ('S_TEXT/WEBVTT', 'WebVTT'),
+    ('S_TEXT/USF', 'USF'),
+    ('S_HDMV/PGS', 'HDMV PGS'),
+    ('S_HDMV/TEXTST', 'HDMV TextST'),
+    ('S_VOBSUB', 'VobSub'),
+    ('S_DVBSUB', 'DVBSUB'),
+    ('S_KATE', 'Kate'),
+)
+
+# top level segment elements holding the metadata that is read
+_METADATA = (INFO, TRACKS, ATTACHMENTS, CHAPTERS)
+
+
+Element = namedtuple('Element', ['id', 'offset', 'data_offset', 'size'])
+
+
+class EBMLError(ValueError):
+    """Raised when a file is not a valid EBML or Matroska file or can not be read by the native reader."""
+
+
+class ElementScanner:
+    """A zero-copy scanner of the EBML elements in a Matroska file.
+
+    The file is memory mapped and exposed as a :obj:`memoryview`, so scanning elements and slicing their payloads
+    never copies data. Only the pages of the elements that are decoded are read from disk. The scanner should be
+    closed when it is no longer needed, preferably by using it as a context manager.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the Matroska file.
+
+    Attributes
+    ----------
+    file_path : str
+        Path to the Matroska file.
+    data : memoryview
+        A read-only view of the whole file.
+
+    Raises
+    ------
+    EBMLError
+        Raised if the file does not start with a Matroska EBML header or does not contain a Segment.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = expanduser(file_path)
+        with open(self.file_path, 'rb') as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise EBMLError('"{}" is empty'.format(self.file_path))
+        self.data = memoryview(self._mmap)
+        self._index = None
+        try:
+            self.doc_type, self.segment = self._read_segment()
+        except EBMLError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return repr(self.__dict__)
+
+    def close(self):
+        """Release the view of the file and unmap it."""
+        self.data.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # payload views are still referenced, the map is closed once they are garbage collected
+            pass
+
+    def element_at(self, offset, end=None):
+        """Read the header of the element at an offset.
+
+        Parameters
+        ----------
+        offset : int
+            The offset of the element in the file.
+        end : int, optional
+            The end of the parent element. Elements of unknown size are assumed to extend to it. Defaults to the end
+            of the file.
+
+        Returns
+        -------
+        :obj:`Element`
+            The ID, offset, data offset, and size of the element.
+        """
+        end = len(self.data) if end is None else end
+        element_id, id_length = decode_vint(self.data, offset, marker=True)
+        size, size_length = decode_vint(self.data, offset + id_length)
+        data_offset = offset + id_length + size_length
+        if size is None:
+            size = end - data_offset
+        return Element(element_id, offset, data_offset, size)
+
+    def elements(self, start=None, end=None):
+        """Iterate over the elements between two offsets.
+
+        Payloads are skipped, not read, so iterating over the children of the Segment of a very large file only
+        touches the element headers.
+
+        Parameters
+        ----------
+        start : int, optional
+            The offset of the first element. Defaults to the start of the Segment's payload.
+        end : int, optional
+            The offset after the last element. Defaults to the end of the Segment.
+
+        Yields
+        ------
+        :obj:`Element`
+            The ID, offset, data offset, and size of each element.
+        """
+        offset = self.segment.data_offset if start is None else start
+        end = self.segment.data_offset + self.segment.size if end is None else end
+        while offset < end:
+            element = self.element_at(offset, end)
+            yield element
+            offset = element.data_offset + element.size
+
+    def payload(self, element):
+        """Get a view of the payload of an element without copying it.
+
+        Parameters
+        ----------
+        element : :obj:`Element`
+            The element to get the payload of.
+
+        Returns
+        -------
+        memoryview
+            A read-only view of the element's payload.
+        """
+        return self.data[element.data_offset:element.data_offset + element.size]
+
+    def index(self):
+        """Find the offsets of the top level elements of the Segment.
+
+        The elements before the first Cluster are scanned directly. Every SeekHead is followed, including SeekHeads
+        referenced by other SeekHeads, to find the elements after the Clusters without scanning them.
+
+        Returns
+        -------
+        dict
+            The offset of the first occurrence of each top level element ID.
+        """
+        if self._index is not None:
+            return self._index
+        index = {}
+        seek_heads = []
+        segment_start = self.segment.data_offset
+        segment_end = segment_start + self.segment.size
+        for element in self.elements():
+            if element.id == CLUSTER:
+                index.setdefault(element.id, element.offset)
+                break
+            if element.data_offset + element.size > segment_end:
+                break
+            if element.id == SEEK_HEAD:
+                seek_heads.append(element.offset)
+            index.setdefault(element.id, element.offset)
+
+        # follow every SeekHead
+        visited = set()
+        while seek_heads:
+            offset = seek_heads.pop()
+            if offset in visited:
+                continue
+            visited.add(offset)
+            seek_head = self.element_at(offset, segment_end)
+            if seek_head.id != SEEK_HEAD:
+                continue
+            for element_id, position in _parse_seek_head(self.payload(seek_head)):
+                position += segment_start
+                if position >= segment_end:
+                    continue
+                if element_id == SEEK_HEAD:
+                    seek_heads.append(position)
+                index.setdefault(element_id, position)
+        self._index = index
+        return index
+
+    def find(self, element_id):
+        """Find a top level element of the Segment.
+
+        Parameters
+        ----------
+        element_id : int
+            The ID of the element such as :data:`~pymkv.ebml.CUES`.
+
+        Returns
+        -------
+        :obj:`Element`, None
+            The element, or None if the Segment does not contain it.
+        """
+        offset = self.index().get(element_id)
+        if offset is None:
+            return None
+        element = self.element_at(offset, self.segment.data_offset + self.segment.size)
+        if element.id != element_id:
+            raise EBMLError('expected element 0x{:X} at {}'.format(element_id, offset))
+        return element
+
+    def _read_segment(self):
+        header = self.element_at(0)
+        if header.id != EBML:
+            raise EBMLError('missing EBML header')
+        doc_type = None
+        payload = self.payload(header)
+        for child_id, child_pos, child_size in iter_children(payload):
+            if child_id == DOC_TYPE:
+                doc_type = _string(payload, child_pos, child_size)
+        if doc_type not in ('matroska', 'webm'):
+            raise EBMLError('"{}" is not a Matroska document type'.format(doc_type))
+        for element in self.elements(header.data_offset + header.size, len(self.data)):
+            if element.id == SEGMENT:
+                # the segment of a file that is still being written can be larger than the file
+                return doc_type, element._replace(size=min(element.size, len(self.data) - element.data_offset))
+        raise EBMLError('missing Segment element')
+
+
+def is_matroska(file_path):
+    """Check if a file is a Matroska or WebM file from its EBML header.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file to be checked.
+
+    Returns
+    -------
+    bool
+        True if the file starts with an EBML header of the matroska or webm document type.
+    """
+    try:
+        ElementScanner(file_path).close()
+    except (EBMLError, OSError):
+        return False
+    return True
+
+
+def identify(file_path):
+    """Read the metadata of a Matroska file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the Matroska file.
+
+    Returns
+    -------
+    dict
+        The metadata of the file in the structure of the output of ``mkvmerge -J``. It contains the container type
+        and properties, the tracks, the attachments, and the number of chapters of each edition. The properties of
+        each attachment also contain the `data_offset` of its data in the file.
+
+    Raises
+    ------
+    EBMLError
+        Raised if the file is not a Matroska file, is malformed, or its metadata can't all be found without scanning
+        the Clusters.
+    """
+    with ElementScanner(file_path) as scanner:
+        elements = {element_id: scanner.find(element_id) for element_id in _METADATA}
+        if elements[TRACKS] is None:
+            raise EBMLError('"{}" has no Tracks element before its Clusters or in its SeekHead'.format(file_path))
+        index = scanner.index()
+        if CLUSTER in index and SEEK_HEAD not in index and not (elements[ATTACHMENTS] and elements[CHAPTERS]):
+            # without a SeekHead, attachments and chapters after the Clusters can't be found
+            raise EBMLError('"{}" has no SeekHead to find the elements after its Clusters'.format(file_path))
+        info = _parse_info(scanner.payload(elements[INFO])) if elements[INFO] else {}
+        tracks = _parse_tracks(scanner.payload(elements[TRACKS]))
+        attachments = _parse_attachments(scanner, elements[ATTACHMENTS]) if elements[ATTACHMENTS] else []
+        chapters = _parse_chapters(scanner.payload(elements[CHAPTERS])) if elements[CHAPTERS] else []
+
+    return {
+        'attachments': attachments,
+        'chapters': chapters,
+        'container': {
+            'properties': info,
+            'recognized': True,
+            'supported': True,
+            'type': 'Matroska',
+        },
+        'errors': [],
+        'file_name': scanner.file_path,
+        'tracks': tracks,
+        'warnings': [],
+    }
+
+
+def read_chapters(file_path):
+    """Decode the chapters of a Matroska file.
+
+    Only the top level chapters of each edition are returned.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the Matroska file.
+
+    Returns
+    -------
+    list of dict
+        The edition index, UID, start and end times in nanoseconds, name, and language of each chapter. The end time
+        and name are None if they are not set.
+
+    Raises
+    ------
+    EBMLError
+        Raised if the file is not a Matroska file or is malformed.
+    """
+    with ElementScanner(file_path) as scanner:
+        element = scanner.find(CHAPTERS)
+        if element is None:
+            return []
+        data = scanner.payload(element)
+        chapters = []
+        editions = (edition for edition in iter_children(data) if edition[0] == EDITION_ENTRY)
+        for edition_index, (_, edition_pos, edition_size) in enumerate(editions):
+            for atom_id, atom_pos, atom_size in iter_children(data, edition_pos, edition_pos + edition_size):
+                if atom_id == CHAPTER_ATOM:
+                    chapter = _parse_chapter_atom(data, atom_pos, atom_pos + atom_size)
+                    chapter['edition'] = edition_index
+                    chapters.append(chapter)
+    return chapters
+
+
+def read_attachment(file_path, attachment_id):
+    """Read the data of an attachment in a Matroska file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the Matroska file.
+    attachment_id : int
+        The ID of the attachment as reported by :func:`~pymkv.ebml.identify`, starting at 1.
+
+    Returns
+    -------
+    bytes
+        The data of the attachment.
+
+    Raises
+    ------
+    IndexError
+        Raised if the file does not contain an attachment with `attachment_id`.
+    """
+    with ElementScanner(file_path) as scanner:
+        element = scanner.find(ATTACHMENTS)
+        attachments = _parse_attachments(scanner, element) if element is not None else []
+        if not 0 < attachment_id <= len(attachments):
+            raise IndexError('attachment index out of range')
+        offset = attachments[attachment_id - 1]['properties']['data_offset']
+        return bytes(scanner.data[offset:offset + attachments[attachment_id - 1]['size']])
+
+
+def codec_name(codec_id):
+    """Get the codec name mkvmerge reports for a Matroska codec ID.
+
+    Parameters
+    ----------
+    codec_id : str
+        The Matroska codec ID such as 'V_MPEG4/ISO/AVC'.
+
+    Returns
+    -------
+    str
+        The codec name, or `codec_id` itself if the codec is not known.
+    """
+    for prefix, name in CODEC_NAMES:
+        if codec_id.startswith(prefix):
+            return name
+    return codec_id
+
+
+def decode_vint(data, pos=0, marker=False):
+    """Decode an EBML variable size integer.
+
+    Parameters
+    ----------
+    data : bytes, memoryview
+        The buffer containing the integer.
+    pos : int, optional
+        The position of the first byte of the integer in `data`.
+    marker : bool, optional
+        Keep the length marker bits in the value. Element IDs are stored with their marker bits.
+
+    Returns
+    -------
+    tuple of int
+        The value and the length in bytes of the integer. The value is None for element sizes that are unknown.
+
+    Raises
+    ------
+    EBMLError
+        Raised if `data` does not contain a valid integer at `pos`.
+    """
+    try:
+        first = data[pos]
+    except IndexError:
+        raise EBMLError('unexpected end of data')
+    if first == 0:
+        raise EBMLError('invalid variable size integer')
+    length = 9 - first.bit_length()
+    if pos + length > len(data):
+        raise EBMLError('unexpected end of data')
+    value = int.from_bytes(data[pos:pos + length], 'big')
+    if marker:
+        return value, length
+    value &= (1 << (7 * length)) - 1
+    if value == (1 << (7 * length)) - 1:
+        return None, length
+    return value, length
+
+
+def iter_children(data, start=0, end=None):
+    """Iterate over the elements in a buffer.
+
+    Parameters
+    ----------
+    data : bytes, memoryview
+        The buffer holding the elements.
+    start : int, optional
+        The position of the first element in `data`.
+    end : int, optional
+        The position after the last element. Defaults to the end of `data`.
+
+    Yields
+    ------
+    tuple of int
+        The ID, data position, and data size of each element.
+    """
+    pos = start
+    end = len(data) if end is None else end
+    while pos < end:
+        element_id, id_length = decode_vint(data, pos, marker=True)
+        size, size_length = decode_vint(data, pos + id_length)
+        data_pos = pos + id_length + size_length
+        if size is None or data_pos + size > end:
+            raise EBMLError('element 0x{:X} overflows its parent'.format(element_id))
+        yield element_id, data_pos, size
+        pos = data_pos + size
+
+
+def _parse_seek_head(data):
+    for element_id, pos, size in iter_children(data):
+        if element_id != SEEK:
+            continue
+        seek_id = seek_position = None
+        for child_id, child_pos, child_size in iter_children(data, pos, pos + size):
+            if child_id == SEEK_ID:
+                seek_id = _uint(data, child_pos, child_size)
+            elif child_id == SEEK_POSITION:
+                seek_position = _uint(data, child_pos, child_size)
+        if seek_id is not None and seek_position is not None:
+            yield seek_id, seek_position
+
+
+def _parse_info(data):
+    properties = {}
+    timestamp_scale = 1000000
+    duration = None
+    for element_id, pos, size in iter_children(data):
+        if element_id == TIMESTAMP_SCALE:
+            timestamp_scale = _uint(data, pos, size)
+        elif element_id == DURATION:
+            duration = _float(data, pos, size)
+        elif element_id == TITLE:
+            properties['title'] = _string(data, pos, size)
+        elif element_id == MUXING_APP:
+            properties['muxing_application'] = _string(data, pos, size)
+        elif element_id == WRITING_APP:
+            properties['writing_application'] = _string(data, pos, size)
+        elif element_id == SEGMENT_UID:
+            properties['segment_uid'] = bytes(data[pos:pos + size]).hex()
+    if duration is not None:
+        properties['duration'] = int(round(duration * timestamp_scale))
+    return properties
+
+
+def _parse_tracks(data):
+    tracks = []
+    for element_id, pos, size in iter_children(data):
+        if element_id != TRACK_ENTRY:
+            continue
+        track_type = None
+        codec_id = ''
+        properties = {
+            'default_track': True,
+            'enabled_track': True,
+            'forced_track': False,
+            'language': 'eng',
+        }
+        for child_id, child_pos, child_size in iter_children(data, pos, pos + size):
+            if child_id == TRACK_TYPE:
+                track_type = TRACK_TYPES.get(_uint(data, child_pos, child_size))
+            elif child_id == CODEC_ID:
+                codec_id = _string(data, child_pos, child_size)
+            elif child_id == TRACK_NUMBER:
+                properties['number'] = _uint(data, child_pos, child_size)
+            elif child_id == TRACK_UID:
+                properties['uid'] = _uint(data, child_pos, child_size)
+            elif child_id == NAME:
+                properties['track_name'] = _string(data, child_pos, child_size)
+            elif child_id == LANGUAGE:
+                properties['language'] = _string(data, child_pos, child_size)
+            elif child_id == LANGUAGE_IETF:
+                properties['language_ietf'] = _string(data, child_pos, child_size)
+            elif child_id == FLAG_DEFAULT:
+                properties['default_track'] = bool(_uint(data, child_pos, child_size))
+            elif child_id == FLAG_FORCED:
+                properties['forced_track'] = bool(_uint(data, child_pos, child_size))
+            elif child_id == FLAG_ENABLED:
+                properties['enabled_track'] = bool(_uint(data, child_pos, child_size))
+            elif child_id == CODEC_PRIVATE:
+                properties['codec_private_length'] = child_size
+            elif child_id == DEFAULT_DURATION:
+                properties['default_duration'] = _uint(data, child_pos, child_size)
+            elif child_id == VIDEO:
+                properties.update(_parse_video(data, child_pos, child_pos + child_size))
+            elif child_id == AUDIO:
+                properties.update(_parse_audio(data, child_pos, child_pos + child_size))
+
+        # mkvmerge only reports tracks of known types and numbers them in file order
+        if track_type is None:
+            continue
+        properties['codec_id'] = codec_id
+        tracks.append({
+            'codec': codec_name(codec_id),
+            'id': len(tracks),
+            'properties': properties,
+            'type': track_type,
+        })
+    return tracks
+
+
+def _parse_video(data, start, end):
+    values = {}
+    for element_id, pos, size in iter_children(data, start, end):
+        if element_id in (PIXEL_WIDTH, PIXEL_HEIGHT, DISPLAY_WIDTH, DISPLAY_HEIGHT):
+            values[element_id] = _uint(data, pos, size)
+    properties = {}
+    if PIXEL_WIDTH in values and PIXEL_HEIGHT in values:
+        properties['pixel_dimensions'] = '{}x{}'.format(values[PIXEL_WIDTH], values[PIXEL_HEIGHT])
+        properties['display_dimensions'] = '{}x{}'.format(values.get(DISPLAY_WIDTH, values[PIXEL_WIDTH]),
+                                                          values.get(DISPLAY_HEIGHT, values[PIXEL_HEIGHT]))
+    return properties
+
+
+def _parse_audio(data, start, end):
+    properties = {}
+    for element_id, pos, size in iter_children(data, start, end):
+        if element_id == SAMPLING_FREQUENCY:
+            properties['audio_sampling_frequency'] = int(_float(data, pos, size))
+        elif element_id == CHANNELS:
+            properties['audio_channels'] = _uint(data, pos, size)
+        elif element_id == BIT_DEPTH:
+            properties['audio_bits_per_sample'] = _uint(data, pos, size)
+    return properties
+
+
+def _parse_attachments(scanner, element):
+    # attached file data is skipped, not read
+    attachments = []
+    for attached_file in scanner.elements(element.data_offset, element.data_offset + element.size):
+        if attached_file.id != ATTACHED_FILE:
+            continue
+        attachment = {'id': len(attachments) + 1, 'properties': {}}
+        for child in scanner.elements(attached_file.data_offset, attached_file.data_offset + attached_file.size):
+            if child.id == FILE_DATA:
+                attachment['size'] = child.size
+                attachment['properties']['data_offset'] = child.data_offset
+            elif child.id == FILE_NAME:
+                attachment['file_name'] = _string(scanner.data, child.data_offset, child.size)
+            elif child.id == FILE_MIME_TYPE:
+                attachment['content_type'] = _string(scanner.data, child.data_offset, child.size)
+            elif child.id == FILE_DESCRIPTION:
+                attachment['description'] = _string(scanner.data, child.data_offset, child.size)
+            elif child.id == FILE_UID:
+                attachment['properties']['uid'] = _uint(scanner.data, child.data_offset, child.size)
+        attachments.append(attachment)
+    return attachments
+
+
+def _parse_chapters(data):
+    chapters = []
+    for element_id, pos, size in iter_children(data):
+        if element_id == EDITION_ENTRY:
+            num_entries = sum(1 for child_id, _, _ in iter_children(data, pos, pos + size)
+                              if child_id == CHAPTER_ATOM)
+            chapters.append({'num_entries': num_entries})
+    return chapters
+
+
+def _parse_chapter_atom(data, start, end):
+    chapter = {'uid': None, 'start': 0, 'end': None, 'name': None, 'language': 'eng'}
+    for element_id, pos, size in iter_children(data, start, end):
+        if element_id == CHAPTER_UID:
+            chapter['uid'] = _uint(data, pos, size)
+        elif element_id == CHAPTER_TIME_START:
+            chapter['start'] = _uint(data, pos, size)
+        elif element_id == CHAPTER_TIME_END:
+            chapter['end'] = _uint(data, pos, size)
+        elif element_id == CHAPTER_DISPLAY and chapter['name'] is None:
+            for child_id, child_pos, child_size in iter_children(data, pos, pos + size):
+                if child_id == CHAP_STRING:
+                    chapter['name'] = _string(data, child_pos, child_size)
+                elif child_id == CHAP_LANGUAGE:
+                    chapter['language'] = _string(data, child_pos, child_size)
+    return chapter
+
+
+def _uint(data, pos, size):
+    return int.from_bytes(data[pos:pos + size], 'big')
+
+
+def _float(data, pos, size):
+    if size == 4:
+        return struct.unpack('>f', data[pos:pos + size])[0]
+    if size == 8:
+        return struct.unpack('>d', data[pos:pos + size])[0]
+    if size == 0:
+        return 0.0
+    raise EBMLError('invalid float size {}'.format(size))
+
+
+def _string(data, pos, size):
+    return bytes(data[pos:pos + size]).rstrip(b'\x00').decode('utf-8', errors='replace')
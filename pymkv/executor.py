@@ -0,0 +1,546 @@
+"""Executors run every MKVToolNix process pymkv starts.
+
+Identifying files, verifying executables, muxing, editing headers, and extracting all start their processes through
+the executor returned by :func:`~pymkv.executor.get_executor`. Replacing it with :func:`~pymkv.executor.set_executor`
+changes how every process is run without changing any other code.
+
+:class:`~pymkv.executor.SubprocessExecutor`
+    The default. Runs processes with :mod:`subprocess`, and with :mod:`asyncio` subprocesses from coroutines.
+:class:`~pymkv.executor.PooledExecutor`
+    Caps the number of processes running at the same time and how often they are started.
+:class:`~pymkv.executor.ReplayExecutor`
+    Records the processes that are run and their output, and serves the recorded output again later without running
+    anything. This allows workloads to be replayed offline for profiling or testing.
+
+Examples
+--------
+Below are some basic examples of how executors can be used.
+
+Never run more than 4 MKVToolNix processes at once, or start more than 20 per second.
+
+>>> from pymkv.executor import PooledExecutor, set_executor
+>>> set_executor(PooledExecutor(max_processes=4, rate=20))
+
+Record the identification of a set of files and replay it later on a machine without the files or mkvmerge.
+
+>>> from pymkv import MKVFile
+>>> from pymkv.executor import ReplayExecutor, set_executor
+>>> recorder = ReplayExecutor('/path/to/recording.json', record=True)
+>>> set_executor(recorder)
+>>> files = [MKVFile(path) for path in ['/path/to/file1.mkv', '/path/to/file2.mkv']]
+>>> recorder.save()
+>>> set_executor(ReplayExecutor('/path/to/recording.json'))
+"""
+
+from abc import ABC, abstractmethod
+import asyncio
+from functools import partial
+import hashlib
+import json
+import os
+from os.path import expanduser
+import shutil
+import subprocess as sp
+import threading
+import time
+from weakref import WeakKeyDictionary
+
+
+class Executor(ABC):
+    """The interface of an executor.
+
+    Subclasses must implement :meth:`~pymkv.executor.Executor.run` and :meth:`~pymkv.executor.Executor.stream`. The
+    coroutine methods run them in a thread by default, subclasses can override them to run processes natively in the
+    event loop.
+
+    Attributes
+    ----------
+    replay : bool
+        True if the output of processes comes from a recording. pymkv then leaves the files alone: identifying a file
+        skips checking it exists, the probe caches, and the native Matroska reader, and always runs ``mkvmerge -J``.
+    """
+
+    replay = False
+
+    def __repr__(self):
+        return repr(self.__dict__)
+
+    def resolve(self, executable_path):
+        """Find an executable.
+
+        Parameters
+        ----------
+        executable_path : str
+            Path to the executable or its name if it is in the $PATH variable.
+
+        Returns
+        -------
+        tuple of (str, int, int), None
+            The resolved path, modification time, and inode of the executable, or None if it could not be found.
+        """
+        resolved_path = shutil.which(expanduser(executable_path))
+        if resolved_path is None:
+            return None
+        try:
+            stat = os.stat(resolved_path)
+        except OSError:
+            return None
+        return resolved_path, stat.st_mtime_ns, stat.st_ino
+
+    @abstractmethod
+    def run(self, args, stdout=sp.PIPE, stderr=None, check=True, timeout=None):
+        """Run a process and wait for it to finish.
+
+        Parameters
+        ----------
+        args : list of str
+            The command to run.
+        stdout : int, optional
+            Where the output of the process goes. Takes the same values as :func:`subprocess.run`.
+        stderr : int, optional
+            Where the error output of the process goes. Takes the same values as :func:`subprocess.run`.
+        check : bool, optional
+            Raise an error if the process exits with a non-zero return code.
+        timeout : float, optional
+            The number of seconds the process may run before it is killed and :exc:`subprocess.TimeoutExpired` is
+            raised.
+
+        Returns
+        -------
+        :obj:`subprocess.CompletedProcess`
+            The arguments, return code, and captured output of the process.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            Raised if `check` is True and the process exits with a non-zero return code.
+        """
+
+    @abstractmethod
+    def stream(self, args):
+        """Run a process and iterate over its output lines as they are written.
+
+        The error output of the process is merged into its output. If the iteration is stopped early, the process is
+        killed.
+
+        Parameters
+        ----------
+        args : list of str
+            The command to run.
+
+        Yields
+        ------
+        bytes
+            Each line of output, including its line ending.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            Raised after the last line if the process exits with a non-zero return code.
+        """
+
+    async def arun(self, args, stdout=sp.PIPE, stderr=None, check=True):
+        """Run a process and wait for it to finish without blocking the event loop.
+
+        This is the coroutine version of :meth:`~pymkv.executor.Executor.run`.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, partial(self.run, args, stdout=stdout, stderr=stderr, check=check))
+
+    async def astream(self, args):
+        """Run a process and iterate over its output lines without blocking the event loop.
+
+        This is the coroutine version of :meth:`~pymkv.executor.Executor.stream`. By default the lines are only
+        yielded once the process has finished.
+        """
+        completed = await self.arun(args, stdout=sp.PIPE, stderr=sp.STDOUT, check=False)
+        for line in completed.stdout.splitlines(keepends=True):
+            yield line
+        if completed.returncode != 0:
+            raise sp.CalledProcessError(completed.returncode, args)
+
+
+class SubprocessExecutor(Executor):
+    """Runs processes with :mod:`subprocess`, and with :mod:`asyncio` subprocesses from coroutines."""
+
+    def run(self, args, stdout=sp.PIPE, stderr=None, check=True, timeout=None):
+        return sp.run(args, stdout=stdout, stderr=stderr, check=check, timeout=timeout)
+
+    def stream(self, args):
+        with sp.Popen(args, stdout=sp.PIPE, stderr=sp.STDOUT) as process:
+            try:
+                for line in process.stdout:
+                    yield line
+            finally:
+                if process.poll() is None:
+                    process.kill()
+        if process.returncode != 0:
+            raise sp.CalledProcessError(process.returncode, args)
+
+    async def arun(self, args, stdout=sp.PIPE, stderr=None, check=True):
+        process = await asyncio.create_subprocess_exec(*args, stdout=stdout, stderr=stderr)
+        try:
+            output, error = await process.communicate()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        if check and process.returncode != 0:
+            raise sp.CalledProcessError(process.returncode, args, output, error)
+        return sp.CompletedProcess(args, process.returncode, output, error)
+
+    async def astream(self, args):
+        process = await asyncio.create_subprocess_exec(*args, stdout=sp.PIPE, stderr=sp.STDOUT)
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                yield line
+            await process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        if process.returncode != 0:
+            raise sp.CalledProcessError(process.returncode, args)
+
+
+class PooledExecutor(Executor):
+    """Runs processes with another executor while limiting how many run at once and how often they start.
+
+    The rate is shared by every thread and event loop that uses the executor. The number of processes is limited once
+    for all threads and separately in each event loop, like :mod:`pymkv.aio`, so coroutines waiting for a slot never
+    hold a thread.
+
+    Parameters
+    ----------
+    executor : :class:`~pymkv.executor.Executor`, optional
+        The executor that runs the processes. Defaults to a new :class:`~pymkv.executor.SubprocessExecutor`.
+    max_processes : int, optional
+        The maximum number of processes running at the same time. By default there is no limit.
+    rate : float, optional
+        The maximum number of processes started per second. By default there is no limit.
+
+    Raises
+    ------
+    ValueError
+        Raised if `max_processes` or `rate` is not positive.
+    """
+
+    def __init__(self, executor=None, max_processes=None, rate=None):
+        if max_processes is not None and max_processes < 1:
+            raise ValueError('"{}" is not a valid number of processes'.format(max_processes))
+        if rate is not None and rate <= 0:
+            raise ValueError('"{}" is not a valid rate'.format(rate))
+        self.executor = executor if executor is not None else SubprocessExecutor()
+        self.max_processes = max_processes
+        self.rate = rate
+        self._slots = threading.BoundedSemaphore(max_processes) if max_processes is not None else None
+        self._semaphores = WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @property
+    def replay(self):
+        return self.executor.replay
+
+    def resolve(self, executable_path):
+        return self.executor.resolve(executable_path)
+
+    def run(self, args, stdout=sp.PIPE, stderr=None, check=True, timeout=None):
+        self._acquire()
+        try:
+            return self.executor.run(args, stdout=stdout, stderr=stderr, check=check, timeout=timeout)
+        finally:
+            self._release()
+
+    def stream(self, args):
+        self._acquire()
+        try:
+            yield from self.executor.stream(args)
+        finally:
+            self._release()
+
+    async def arun(self, args, stdout=sp.PIPE, stderr=None, check=True):
+        semaphore = await self._aacquire()
+        try:
+            return await self.executor.arun(args, stdout=stdout, stderr=stderr, check=check)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    async def astream(self, args):
+        semaphore = await self._aacquire()
+        try:
+            lines = self.executor.astream(args)
+            try:
+                async for line in lines:
+                    yield line
+            finally:
+                await lines.aclose()
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    def _acquire(self):
+        # wait for a free slot, then for the next start allowed by the rate
+        if self._slots is not None:
+            self._slots.acquire()
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def _aacquire(self):
+        # the same as _acquire without blocking a thread, with a separate limit for each event loop like pymkv.aio
+        semaphore = None
+        if self.max_processes is not None:
+            loop = asyncio.get_event_loop()
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_processes)
+            await semaphore.acquire()
+        try:
+            delay = self._delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if semaphore is not None:
+                semaphore.release()
+            raise
+        return semaphore
+
+    def _delay(self):
+        # reserve the next start allowed by the rate and get the number of seconds until it
+        if self.rate is None:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + 1 / self.rate
+        return start - now
+
+    def _release(self):
+        if self._slots is not None:
+            self._slots.release()
+
+
+class ReplayExecutor(Executor):
+    """Serves recorded process output instead of running processes.
+
+    Each recording is keyed by the exact command that was run, except that option files passed with ``@`` are
+    matched by their content rather than their temporary path. When recording, commands that have not been recorded
+    yet are run with another executor and their output is kept until :meth:`~pymkv.executor.ReplayExecutor.save` is
+    called. When replaying, a command that was not recorded is run with the fallback executor if there is one.
+
+    Every file is identified with ``mkvmerge -J`` while a :class:`~pymkv.executor.ReplayExecutor` is set, including
+    Matroska files that are otherwise read natively, so the recording holds the identification of every file and
+    they don't need to exist when it is replayed.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the recording. It is loaded if it exists.
+    record : bool, optional
+        Record the commands that have not been recorded yet.
+    executor : :class:`~pymkv.executor.Executor`, optional
+        The executor that runs commands that have not been recorded. Defaults to a new
+        :class:`~pymkv.executor.SubprocessExecutor` when recording and to None when replaying.
+
+    Attributes
+    ----------
+    hits : int
+        The number of commands served from the recording.
+    misses : int
+        The number of commands that were not in the recording.
+    """
+
+    replay = True
+
+    def __init__(self, file_path, record=False, executor=None):
+        self.file_path = expanduser(file_path)
+        self.record = record
+        self.executor = executor if executor is not None or not record else SubprocessExecutor()
+        self.hits = 0
+        self.misses = 0
+        self._recordings = {}
+        self._lock = threading.Lock()
+        if os.path.isfile(self.file_path):
+            with open(self.file_path, encoding='utf-8') as recording_file:
+                recording = json.load(recording_file)
+            for entry in recording['commands']:
+                self._recordings[(entry['kind'], tuple(entry['args']))] = entry
+
+    def __len__(self):
+        return len(self._recordings)
+
+    def save(self):
+        """Save the recording to its file."""
+        with self._lock:
+            commands = list(self._recordings.values())
+        with open(self.file_path, 'w', encoding='utf-8') as recording_file:
+            json.dump({'commands': commands}, recording_file, indent=1)
+
+    def resolve(self, executable_path):
+        entry = self._lookup('resolve', [executable_path])
+        if entry is not None:
+            return tuple(entry['result']) if entry['result'] is not None else None
+        result = self._fallback().resolve(executable_path)
+        self._store('resolve', [executable_path], result=list(result) if result is not None else None)
+        return result
+
+    def run(self, args, stdout=sp.PIPE, stderr=None, check=True, timeout=None):
+        entry = self._lookup('run', args)
+        if entry is None:
+            completed = self._fallback().run(args, stdout=stdout, stderr=stderr, check=False, timeout=timeout)
+            entry = self._store('run', args, returncode=completed.returncode, stdout=_encode(completed.stdout),
+                                stderr=_encode(completed.stderr))
+        return self._completed(args, entry, check)
+
+    def stream(self, args):
+        entry = self._lookup('stream', args)
+        if entry is None:
+            lines = []
+            returncode = 0
+            stream = self._fallback().stream(args)
+            try:
+                for line in stream:
+                    lines.append(line)
+                    yield line
+            except sp.CalledProcessError as error:
+                returncode = error.returncode
+            finally:
+                stream.close()
+            self._store('stream', args, returncode=returncode, stdout=_encode(b''.join(lines)), stderr=None)
+            if returncode != 0:
+                raise sp.CalledProcessError(returncode, args)
+            return
+        yield from _decode(entry['stdout']).splitlines(keepends=True)
+        if entry['returncode'] != 0:
+            raise sp.CalledProcessError(entry['returncode'], args)
+
+    async def arun(self, args, stdout=sp.PIPE, stderr=None, check=True):
+        entry = self._lookup('run', args)
+        if entry is None:
+            completed = await self._fallback().arun(args, stdout=stdout, stderr=stderr, check=False)
+            entry = self._store('run', args, returncode=completed.returncode, stdout=_encode(completed.stdout),
+                                stderr=_encode(completed.stderr))
+        return self._completed(args, entry, check)
+
+    async def astream(self, args):
+        entry = self._lookup('stream', args)
+        if entry is None:
+            lines = []
+            returncode = 0
+            stream = self._fallback().astream(args)
+            try:
+                async for line in stream:
+                    lines.append(line)
+                    yield line
+            except sp.CalledProcessError as error:
+                returncode = error.returncode
+            finally:
+                await stream.aclose()
+            self._store('stream', args, returncode=returncode, stdout=_encode(b''.join(lines)), stderr=None)
+            if returncode != 0:
+                raise sp.CalledProcessError(returncode, args)
+            return
+        for line in _decode(entry['stdout']).splitlines(keepends=True):
+            yield line
+        if entry['returncode'] != 0:
+            raise sp.CalledProcessError(entry['returncode'], args)
+
+    def _lookup(self, kind, args):
+        key = (kind, _command_key(args))
+        with self._lock:
+            entry = self._recordings.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def _store(self, kind, args, **values):
+        key = _command_key(args)
+        entry = dict(kind=kind, args=list(key), **values)
+        if self.record:
+            with self._lock:
+                self._recordings[(kind, key)] = entry
+        return entry
+
+    def _fallback(self):
+        if self.executor is None:
+            raise ValueError('the command is not in the recording "{}" and there is no executor to run it'
+                             .format(self.file_path))
+        return self.executor
+
+    @staticmethod
+    def _completed(args, entry, check):
+        stdout = _decode(entry['stdout'])
+        stderr = _decode(entry['stderr'])
+        if check and entry['returncode'] != 0:
+            raise sp.CalledProcessError(entry['returncode'], args, stdout, stderr)
+        return sp.CompletedProcess(args, entry['returncode'], stdout, stderr)
+
+
+def _command_key(args):
+    # option files get a new temporary path every time, so they are matched by their content instead
+    key = []
+    for arg in args:
+        if arg.startswith('@') and os.path.isfile(arg[1:]):
+            with open(arg[1:], 'rb') as options_file:
+                arg = '@sha256:' + hashlib.sha256(options_file.read()).hexdigest()
+        key.append(arg)
+    return tuple(key)
+
+
+def _encode(output):
+    # output bytes as a JSON str that decodes back to the same bytes
+    return output.decode('latin-1') if output is not None else None
+
+
+def _decode(output):
+    return output.encode('latin-1') if output is not None else None
+
+
+_executor = SubprocessExecutor()
+
+
+def get_executor():
+    """Get the executor that runs MKVToolNix processes.
+
+    Returns
+    -------
+    :class:`~pymkv.executor.Executor`
+        The current executor.
+    """
+    return _executor
+
+
+def set_executor(executor):
+    """Set the executor that runs MKVToolNix processes.
+
+    Verified executables and cached identifications are forgotten so the new executor runs them again, which lets a
+    recording hold every process a workload needs.
+
+    Parameters
+    ----------
+    executor : :class:`~pymkv.executor.Executor`, None
+        The new executor. Set to None to go back to a :class:`~pymkv.executor.SubprocessExecutor`.
+
+    Raises
+    ------
+    TypeError
+        Raised if `executor` is not an :class:`~pymkv.executor.Executor` or None.
+    """
+    from pymkv.cache import probe_cache
+    from pymkv.Verifications import invalidate_executables
+
+    global _executor
+    if executor is not None and not isinstance(executor, Executor):
+        raise TypeError('"{}" is not an Executor'.format(executor))
+    _executor = executor if executor is not None else SubprocessExecutor()
+    # results found with the previous executor would never reach the new one, such as a recording
+    invalidate_executables()
+    probe_cache.clear()
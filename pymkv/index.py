@@ -0,0 +1,321 @@
+""":class:`~pymkv.index.TrackIndex` answers questions about the tracks of many files without loading them.
+
+Every track is stored as a row of small integer codes, one for each indexed property, and each value of each property
+has a posting list of the tracks that have it. A query starts from the shortest posting list of its criteria and only
+checks those tracks against the other criteria, so its cost depends on how rare the values it asks for are rather than
+on the number of indexed tracks. Queries that combine conditions across tracks of the same file, such as a file having
+English subtitles but no English audio, are answered with set operations on the files of simpler queries.
+
+The index is saved as compressed arrays of the codes and posting lists and loads without rebuilding anything.
+
+Examples
+--------
+Below are some basic examples of how a :class:`~pymkv.index.TrackIndex` can be used.
+
+Index a scanned library.
+
+>>> from pymkv.index import TrackIndex
+>>> from pymkv.scan import Library
+>>> library = Library('/path/to/library')
+>>> for result in library.scan():
+...     pass
+>>> index = TrackIndex.from_library(library)
+
+Find the files with English subtitles but no English audio.
+
+>>> index.files(track_type='subtitles', language='eng') - index.files(track_type='audio', language='eng')
+{'/path/to/library/file.mkv'}
+
+Find the HEVC videos that have a forced track.
+
+>>> index.files(track_type='video', track_codec='HEVC/H.265/MPEG-H') & index.files(forced_track=True)
+set()
+
+Save the index and load it again later.
+
+>>> index.save('/path/to/library.idx')
+>>> index = TrackIndex.load('/path/to/library.idx')
+"""
+
+from array import array
+import json
+import os
+from os.path import abspath, dirname, expanduser
+import sys
+from tempfile import mkstemp
+import zlib
+
+
+# the track properties that are indexed
+FIELDS = ('track_type', 'track_codec', 'language', 'default_track', 'forced_track')
+
+# identifies saved indexes and their format version
+_MAGIC = b'PYMKVIDX\x01'
+
+
+class TrackIndex:
+    """An index of the tracks of many files by type, codec, language, and flags.
+
+    Tracks are added with :meth:`~pymkv.index.TrackIndex.add` or all at once from a scanned
+    :class:`~pymkv.scan.Library` with :meth:`~pymkv.index.TrackIndex.from_library`. The index only grows, create a
+    new one to reflect files that changed or were removed.
+
+    Queries take criteria as keyword arguments named after the indexed properties: `track_type`, `track_codec`,
+    `language`, `default_track`, and `forced_track`. A track matches if it has every given value.
+
+    Attributes
+    ----------
+    paths : list of str
+        The path of every indexed file, in the order they were added.
+    """
+
+    def __init__(self):
+        self.paths = []
+        self._file_numbers = {}
+        self._file_column = array('I')
+        self._track_ids = array('I')
+        self._values = {field: [] for field in FIELDS}
+        self._codes = {field: {} for field in FIELDS}
+        self._columns = {field: array('I') for field in FIELDS}
+        self._postings = {field: [] for field in FIELDS}
+
+    def __len__(self):
+        return len(self._track_ids)
+
+    def __repr__(self):
+        return repr(self.__dict__)
+
+    @classmethod
+    def from_library(cls, library):
+        """Create an index of every supported file in a library.
+
+        Parameters
+        ----------
+        library : :class:`~pymkv.scan.Library`
+            The library to index.
+
+        Returns
+        -------
+        :class:`~pymkv.index.TrackIndex`
+            The index of the library's tracks.
+        """
+        index = cls()
+        for entry in library:
+            if entry.supported:
+                index.add(entry.path, entry.tracks)
+        return index
+
+    def add(self, file_path, tracks):
+        """Add the tracks of a file to the index.
+
+        Parameters
+        ----------
+        file_path : str
+            The path of the file containing the tracks.
+        tracks : iterable
+            The tracks of the file, such as :obj:`~pymkv.scan.LibraryTrack` or :class:`~pymkv.MKVTrack` objects.
+            Each needs a `track_id` and the indexed properties.
+        """
+        file_number = self._file_numbers.get(file_path)
+        if file_number is None:
+            file_number = self._file_numbers[file_path] = len(self.paths)
+            self.paths.append(file_path)
+        for track in tracks:
+            track_number = len(self._track_ids)
+            self._file_column.append(file_number)
+            self._track_ids.append(track.track_id)
+            for field in FIELDS:
+                value = getattr(track, field)
+                if field in ('default_track', 'forced_track'):
+                    value = bool(value)
+                code = self._codes[field].get(value)
+                if code is None:
+                    code = self._codes[field][value] = len(self._values[field])
+                    self._values[field].append(value)
+                    self._postings[field].append(array('I'))
+                self._columns[field].append(code)
+                self._postings[field][code].append(track_number)
+
+    def values(self, field):
+        """Count the tracks with each value of a property.
+
+        Parameters
+        ----------
+        field : str
+            The name of an indexed property, such as 'language'.
+
+        Returns
+        -------
+        dict
+            The number of tracks keyed by value.
+
+        Raises
+        ------
+        ValueError
+            Raised if `field` is not an indexed property.
+        """
+        if field not in self._values:
+            raise ValueError('"{}" is not an indexed property'.format(field))
+        return {value: len(postings) for value, postings in zip(self._values[field], self._postings[field])}
+
+    def count(self, **criteria):
+        """Count the tracks that match the criteria.
+
+        Returns
+        -------
+        int
+            The number of matching tracks.
+
+        Raises
+        ------
+        ValueError
+            Raised if a criterion is not an indexed property.
+        """
+        return len(self._match(criteria))
+
+    def tracks(self, **criteria):
+        """Find the tracks that match the criteria.
+
+        Yields
+        ------
+        tuple of (str, int)
+            The path of the file and the id of each matching track.
+
+        Raises
+        ------
+        ValueError
+            Raised if a criterion is not an indexed property.
+        """
+        for track_number in self._match(criteria):
+            yield self.paths[self._file_column[track_number]], self._track_ids[track_number]
+
+    def files(self, **criteria):
+        """Find the files with at least one track that matches the criteria.
+
+        Returns
+        -------
+        set of str
+            The paths of the matching files.
+
+        Raises
+        ------
+        ValueError
+            Raised if a criterion is not an indexed property.
+        """
+        return set(map(self.paths.__getitem__, set(map(self._file_column.__getitem__, self._match(criteria)))))
+
+    def save(self, file_path):
+        """Save the index to a file.
+
+        The file is replaced atomically, so an interrupted save never leaves a partial index behind.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file to save the index to.
+        """
+        file_path = abspath(expanduser(file_path))
+        arrays = [self._file_column, self._track_ids]
+        arrays.extend(self._columns[field] for field in FIELDS)
+        for field in FIELDS:
+            arrays.extend(self._postings[field])
+        header = json.dumps({
+            'byteorder': sys.byteorder,
+            'itemsize': self._track_ids.itemsize,
+            'paths': self.paths,
+            'values': self._values,
+            'lengths': [len(values) for values in arrays],
+        }, separators=(',', ':')).encode()
+        compressor = zlib.compressobj()
+        fd, temp_path = mkstemp(prefix='.pymkv-', suffix='.idx', dir=dirname(file_path))
+        try:
+            with open(fd, 'wb') as index_file:
+                index_file.write(_MAGIC)
+                index_file.write(compressor.compress(len(header).to_bytes(8, 'little') + header))
+                for values in arrays:
+                    index_file.write(compressor.compress(values.tobytes()))
+                index_file.write(compressor.flush())
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, file_path):
+        """Load an index saved with :meth:`~pymkv.index.TrackIndex.save`.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the saved index.
+
+        Returns
+        -------
+        :class:`~pymkv.index.TrackIndex`
+            The saved index.
+
+        Raises
+        ------
+        ValueError
+            Raised if the file is not a saved index.
+        """
+        with open(expanduser(file_path), 'rb') as index_file:
+            if index_file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError('"{}" is not a saved track index'.format(file_path))
+            try:
+                data = zlib.decompress(index_file.read())
+            except zlib.error:
+                raise ValueError('"{}" is not a saved track index'.format(file_path))
+        header_length = int.from_bytes(data[:8], 'little')
+        header = json.loads(data[8:8 + header_length].decode())
+        if header['itemsize'] != array('I').itemsize:
+            raise ValueError('"{}" was saved on an incompatible platform'.format(file_path))
+
+        # read the arrays in the order they were saved
+        position = 8 + header_length
+        arrays = []
+        for length in header['lengths']:
+            values = array('I')
+            values.frombytes(data[position:position + length * values.itemsize])
+            if header['byteorder'] != sys.byteorder:
+                values.byteswap()
+            arrays.append(values)
+            position += length * values.itemsize
+        arrays.reverse()
+
+        index = cls()
+        index.paths = header['paths']
+        index._file_numbers = {path: file_number for file_number, path in enumerate(index.paths)}
+        index._file_column = arrays.pop()
+        index._track_ids = arrays.pop()
+        for field in FIELDS:
+            index._columns[field] = arrays.pop()
+        for field in FIELDS:
+            index._values[field] = header['values'][field]
+            index._codes[field] = {value: code for code, value in enumerate(index._values[field])}
+            index._postings[field] = [arrays.pop() for _ in index._values[field]]
+        return index
+
+    def _match(self, criteria):
+        # the numbers of the tracks that have every value, checked from the shortest posting list
+        terms = []
+        for field, value in criteria.items():
+            if field not in self._codes:
+                raise ValueError('"{}" is not an indexed property'.format(field))
+            if field in ('default_track', 'forced_track'):
+                value = bool(value)
+            code = self._codes[field].get(value)
+            if code is None:
+                return ()
+            terms.append((len(self._postings[field][code]), field, code))
+        if not terms:
+            return range(len(self))
+        terms.sort()
+        _, field, code = terms[0]
+        postings = self._postings[field][code]
+        if len(terms) == 1:
+            return postings
+        for _, field, code in terms[1:]:
+            column = self._columns[field]
+            postings = [track_number for track_number in postings if column[track_number] == code]
+        return postings
@@ -0,0 +1,272 @@
+"""Progress reporting for MKVToolNix processes.
+
+When a progress callback is passed to :meth:`~pymkv.MKVFile.mux` or :meth:`~pymkv.MKVFile.amux`, or when
+:meth:`~pymkv.MKVFile.amux_progress` is iterated, mkvmerge is run in its machine readable GUI mode and its output is
+read line by line as it is written. Each progress line becomes a :obj:`~pymkv.progress.Progress` update. Only the most
+recent output lines are kept, so long muxes with many warnings use a constant amount of memory.
+
+:meth:`~pymkv.MKVFile.extract` runs one mkvextract process per source file at the same time. Their progress is
+combined by a :class:`~pymkv.progress.ProgressGroup` into a single stream of updates.
+
+Examples
+--------
+Below are some basic examples of how progress updates can be used.
+
+Print the progress of a mux.
+
+>>> from pymkv import MKVFile
+>>> mkv = MKVFile('path/to/file.mkv')
+>>> mkv.mux('path/to/output.mkv', silent=True, progress=lambda update: print(update.percent))
+
+Follow the progress of a mux from a coroutine.
+
+>>> async def remux():
+...     async for update in mkv.amux_progress('path/to/output.mkv'):
+...         print('{}% {:.1f} MB/s'.format(update.percent, update.throughput / 1000000))
+"""
+
+from collections import deque, namedtuple
+from glob import escape, glob
+from os.path import getsize, isfile, splitext
+import re
+import threading
+import time
+
+
+Progress = namedtuple('Progress', ['percent', 'bytes_written', 'elapsed', 'throughput'])
+Progress.__doc__ = """A progress update of a running process.
+
+Attributes
+----------
+percent : int
+    The percentage of the work that is done.
+bytes_written : int
+    The number of bytes written to the output files so far.
+elapsed : float
+    The number of seconds since the process was started.
+throughput : float
+    The average number of bytes written per second.
+"""
+
+# progress lines in GUI mode and in the regular output
+_PROGRESS = re.compile(r'(?:#GUI#progress|Progress:)\s+(\d+)%')
+
+
+def parse_progress(line):
+    """Parse a progress line of MKVToolNix output.
+
+    Parameters
+    ----------
+    line : str
+        A line of output.
+
+    Returns
+    -------
+    int, None
+        The percentage of the line, or None if it is not a progress line.
+    """
+    progress_match = _PROGRESS.match(line)
+    return int(progress_match.group(1)) if progress_match else None
+
+
+def output_files(output_path):
+    """Find the files written for an output path.
+
+    Parameters
+    ----------
+    output_path : str
+        The output path given to mkvmerge.
+
+    Returns
+    -------
+    set of str
+        The output file and the numbered files mkvmerge writes in its place when splitting that exist.
+    """
+    output_root, output_ext = splitext(output_path)
+    files = {path for path in glob(escape(output_root) + '-*' + escape(output_ext))
+             if re.fullmatch(r'-\d+', path[len(output_root):len(path) - len(output_ext)])}
+    if isfile(output_path):
+        files.add(output_path)
+    return files
+
+
+class ProgressMonitor:
+    """Turns the output lines of a process into :obj:`~pymkv.progress.Progress` updates.
+
+    Parameters
+    ----------
+    output_path : str, optional
+        The output path given to mkvmerge. The size of the files written to it is reported in each update.
+    callback : callable, optional
+        Called with every new :obj:`~pymkv.progress.Progress` update.
+    tail : int, optional
+        The number of non-progress output lines to keep.
+
+    Attributes
+    ----------
+    lines : :obj:`collections.deque`
+        The most recent non-progress output lines.
+    percent : int, None
+        The last reported percentage.
+    """
+
+    def __init__(self, output_path=None, callback=None, tail=100):
+        self.output_path = output_path
+        self.callback = callback
+        self.lines = deque(maxlen=tail)
+        self.percent = None
+        self._start = time.monotonic()
+        self._existing = output_files(output_path) if output_path is not None else set()
+
+    def feed(self, line):
+        """Process a line of output.
+
+        Parameters
+        ----------
+        line : str, bytes
+            A line of output.
+
+        Returns
+        -------
+        :obj:`~pymkv.progress.Progress`, None
+            The new update if the line reported a new percentage.
+        """
+        if isinstance(line, bytes):
+            line = line.decode(errors='replace')
+        line = line.rstrip('\r\n')
+        percent = parse_progress(line)
+        if percent is None:
+            if line:
+                self.lines.append(line)
+            return None
+        if percent == self.percent:
+            return None
+        self.percent = percent
+        elapsed = time.monotonic() - self._start
+        bytes_written = self.bytes_written()
+        update = Progress(percent, bytes_written, elapsed, bytes_written / elapsed if elapsed > 0 else 0.0)
+        if self.callback is not None:
+            self.callback(update)
+        return update
+
+    def bytes_written(self):
+        """Get the number of bytes written to the output files so far.
+
+        Returns
+        -------
+        int
+            The combined size of the output files.
+        """
+        if self.output_path is None:
+            return 0
+        size = 0
+        for path in output_files(self.output_path):
+            try:
+                size += getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def new_files(self):
+        """Get the output files that did not exist when the monitor was created.
+
+        Returns
+        -------
+        set of str
+            The paths of the new output files.
+        """
+        return output_files(self.output_path) - self._existing if self.output_path is not None else set()
+
+    def output(self):
+        """Get the kept output lines.
+
+        Returns
+        -------
+        str
+            The most recent non-progress output lines joined by newlines.
+        """
+        return '\n'.join(self.lines)
+
+
+class ProgressGroup:
+    """Combines the progress of processes that run at the same time into one stream of updates.
+
+    Each process reports to its own :class:`~pymkv.progress.ProgressMonitor` from
+    :meth:`~pymkv.progress.ProgressGroup.monitor`. The percentage of the group is the average percentage of its
+    monitors weighted by the amount of work each one does. Monitors may be fed from different threads.
+
+    Parameters
+    ----------
+    output_paths : iterable of str, optional
+        The files written by the processes. Their combined size is reported in each update.
+    callback : callable, optional
+        Called with every new :obj:`~pymkv.progress.Progress` update of the group.
+
+    Attributes
+    ----------
+    percent : int, None
+        The last reported percentage of the group.
+    """
+
+    def __init__(self, output_paths=(), callback=None):
+        self.output_paths = list(output_paths)
+        self.callback = callback
+        self.percent = None
+        self._monitors = []
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def monitor(self, weight=1, tail=100):
+        """Create a monitor for one of the processes.
+
+        Every monitor should be created before any process starts. A monitor added later increases the total amount
+        of work, which can make the percentage of the group go down.
+
+        Parameters
+        ----------
+        weight : int, float, optional
+            The amount of work the process does, such as the size of the file it reads.
+        tail : int, optional
+            The number of non-progress output lines the monitor keeps.
+
+        Returns
+        -------
+        :class:`~pymkv.progress.ProgressMonitor`
+            The monitor to feed the output lines of the process to.
+        """
+        monitor = ProgressMonitor(callback=self._update, tail=tail)
+        with self._lock:
+            self._monitors.append((monitor, weight))
+        return monitor
+
+    def bytes_written(self):
+        """Get the number of bytes written to the output files so far.
+
+        Returns
+        -------
+        int
+            The combined size of the output files.
+        """
+        size = 0
+        for path in self.output_paths:
+            try:
+                size += getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _update(self, _):
+        with self._lock:
+            total = sum(weight for _, weight in self._monitors)
+            if total > 0:
+                percent = int(sum((monitor.percent or 0) * weight for monitor, weight in self._monitors) / total)
+            else:
+                percent = int(sum(monitor.percent or 0 for monitor, _ in self._monitors) / len(self._monitors))
+            if percent == self.percent:
+                return
+            self.percent = percent
+            elapsed = time.monotonic() - self._start
+            bytes_written = self.bytes_written()
+            update = Progress(percent, bytes_written, elapsed, bytes_written / elapsed if elapsed > 0 else 0.0)
+            if self.callback is not None:
+                self.callback(update)
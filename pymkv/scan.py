@@ -0,0 +1,347 @@
+""":class:`~pymkv.scan.Library` keeps track of every supported media file in a directory tree.
+
+A scan walks the tree and identifies each file with :func:`~pymkv.Verifications.identify`, in parallel. Only the
+facts needed to search a library are kept for each file: its tracks, their codecs and languages, and its attachments.
+Files whose size and modification time have not changed since the last scan are not identified again, so re-scanning
+a large library only costs a walk of the tree. Results are yielded as they are ready, so memory stays flat no matter
+how large the tree is.
+
+Examples
+--------
+Below are some basic examples of how a :class:`~pymkv.scan.Library` can be used.
+
+Scan a library and print the files that changed.
+
+>>> from pymkv.scan import Library
+>>> library = Library('/path/to/library', workers=8)
+>>> for result in library.scan():
+...     if result.status != 'unchanged':
+...         print(result.status, result.entry.path)
+
+Save the library and only identify new or modified files the next time.
+
+>>> library.save('/path/to/library.json')
+>>> library = Library.load('/path/to/library.json')
+>>> for result in library.scan():
+...     pass
+>>> library.languages()
+Counter({'eng': 1042, 'jpn': 310, 'und': 12})
+"""
+
+from collections import Counter, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import json
+import os
+from os.path import abspath, dirname, expanduser, splitext
+from sys import intern
+from tempfile import mkstemp
+
+from pymkv.Verifications import identify, verify_mkvmerge
+
+
+# extensions of the files mkvmerge can read
+MEDIA_EXTENSIONS = frozenset((
+    '.mkv', '.mka', '.mks', '.mk3d', '.webm', '.mp4', '.m4v', '.m4a', '.mov', '.avi', '.ts', '.m2ts', '.mts', '.mpg',
+    '.mpeg', '.vob', '.ogg', '.ogm', '.opus', '.flac', '.wav', '.mp3', '.aac', '.ac3', '.eac3', '.dts', '.thd',
+    '.h264', '.264', '.h265', '.265', '.hevc', '.ivf', '.srt', '.ass', '.ssa', '.sup', '.idx', '.vtt',
+))
+
+ADDED = 'added'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+REMOVED = 'removed'
+FAILED = 'failed'
+
+LibraryTrack = namedtuple('LibraryTrack', ['track_id', 'track_type', 'track_codec', 'track_name', 'language',
+                                           'default_track', 'forced_track'])
+LibraryTrack.__doc__ = """A track of a file in a :class:`~pymkv.scan.Library`.
+
+The attributes have the same meaning as the properties of an :class:`~pymkv.MKVTrack`.
+"""
+
+LibraryAttachment = namedtuple('LibraryAttachment', ['name', 'mime_type', 'size'])
+LibraryAttachment.__doc__ = """An attachment of a file in a :class:`~pymkv.scan.Library`.
+
+Attributes
+----------
+name : str
+    The file name of the attachment.
+mime_type : str
+    The MIME type of the attachment.
+size : int
+    The size of the attachment in bytes.
+"""
+
+LibraryEntry = namedtuple('LibraryEntry', ['path', 'size', 'mtime_ns', 'container', 'supported', 'tracks',
+                                           'attachments'])
+LibraryEntry.__doc__ = """A file in a :class:`~pymkv.scan.Library`.
+
+Attributes
+----------
+path : str
+    The absolute path of the file.
+size : int
+    The size of the file in bytes when it was identified.
+mtime_ns : int
+    The modification time of the file when it was identified.
+container : str
+    The container type reported by mkvmerge, such as 'Matroska'.
+supported : bool
+    True if the file is supported by mkvmerge. Unsupported files are kept so they are not identified again.
+tracks : tuple of :obj:`~pymkv.scan.LibraryTrack`
+    The tracks of the file.
+attachments : tuple of :obj:`~pymkv.scan.LibraryAttachment`
+    The attachments of the file.
+"""
+
+ScanResult = namedtuple('ScanResult', ['status', 'path', 'entry', 'error'])
+ScanResult.__doc__ = """The result of scanning one file.
+
+Attributes
+----------
+status : str
+    One of 'added', 'changed', 'unchanged', 'removed', or 'failed'.
+path : str
+    The absolute path of the file, or of the directory that could not be read.
+entry : :obj:`~pymkv.scan.LibraryEntry`, None
+    The entry of the file. For removed files it is the last known entry, for failed files it is None.
+error : Exception, None
+    The error raised while reading or identifying the file if it failed.
+"""
+
+
+def _intern(string):
+    # share the few distinct languages between all tracks
+    return intern(string) if isinstance(string, str) else string
+
+
+class Library:
+    """A directory tree of media files and the tracks and attachments they contain.
+
+    Parameters
+    ----------
+    root : str
+        The directory to scan.
+    extensions : iterable of str, optional
+        The file extensions to identify, including the leading dot. Defaults to
+        :data:`~pymkv.scan.MEDIA_EXTENSIONS`. Set to None to identify every file.
+    mkvmerge_path : str, optional
+        Alternate path to mkvmerge if it is not already in the $PATH variable.
+    workers : int, optional
+        The maximum number of files identified at the same time. Defaults to the default of
+        :class:`concurrent.futures.ThreadPoolExecutor`.
+    timeout : float, optional
+        The number of seconds mkvmerge may run for each file.
+    follow_symlinks : bool, optional
+        Follow symbolic links to files and directories while walking the tree.
+
+    Attributes
+    ----------
+    entries : dict
+        The :obj:`~pymkv.scan.LibraryEntry` of every identified file keyed by its path.
+    """
+
+    def __init__(self, root, extensions=MEDIA_EXTENSIONS, mkvmerge_path='mkvmerge', workers=None, timeout=None,
+                 follow_symlinks=False):
+        self.root = abspath(expanduser(root))
+        self.extensions = frozenset(extension.lower() for extension in extensions) if extensions is not None else None
+        self.mkvmerge_path = mkvmerge_path
+        self.workers = workers
+        self.timeout = timeout
+        self.follow_symlinks = follow_symlinks
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def __repr__(self):
+        return repr(self.__dict__)
+
+    def scan(self):
+        """Walk the tree and bring the library up to date.
+
+        New and modified files are identified in parallel. Files with the same size and modification time as when
+        they were last identified are not identified again. Files that no longer exist are removed from the library
+        after the walk. Files that fail to be identified are left out and tried again on the next scan. Directories and
+        files that can't be read during the walk are reported as failed and their entries are kept, so a temporary
+        error or an unmounted root does not empty the library.
+
+        Yields
+        ------
+        :obj:`~pymkv.scan.ScanResult`
+            The result of each file as soon as it is known.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if the path to mkvmerge could not be verified.
+        """
+        if not verify_mkvmerge(mkvmerge_path=self.mkvmerge_path):
+            raise FileNotFoundError('mkvmerge is not at the specified path, add it there or change the mkvmerge_path '
+                                    'property')
+        seen = set()
+        unreadable = []
+        with ThreadPoolExecutor(self.workers) as executor:
+            # bound the number of queued files so a huge tree is never held in memory at once
+            limit = 2 * (self.workers or min(32, (os.cpu_count() or 1) + 4))
+            running = {}
+            for path, stat, error in self._walk():
+                seen.add(path)
+                if error is not None:
+                    unreadable.append(path + os.sep)
+                    yield ScanResult(FAILED, path, None, error)
+                    continue
+                entry = self.entries.get(path)
+                if entry is not None and (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                    yield ScanResult(UNCHANGED, path, entry, None)
+                    continue
+                running[executor.submit(self._identify, path, stat)] = path
+                if len(running) >= limit:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._finish(running.pop(future), future)
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._finish(running.pop(future), future)
+
+        unreadable = tuple(unreadable)
+        for path in [path for path in self.entries if path not in seen and not path.startswith(unreadable)]:
+            yield ScanResult(REMOVED, path, self.entries.pop(path), None)
+
+    def tracks(self):
+        """Iterate over every track in the library.
+
+        Yields
+        ------
+        tuple of (:obj:`~pymkv.scan.LibraryEntry`, :obj:`~pymkv.scan.LibraryTrack`)
+            Each track and the file it is in.
+        """
+        for entry in self.entries.values():
+            for track in entry.tracks:
+                yield entry, track
+
+    def codecs(self):
+        """Count the tracks of each codec.
+
+        Returns
+        -------
+        :obj:`collections.Counter`
+            The number of tracks keyed by codec.
+        """
+        return Counter(track.track_codec for _, track in self.tracks())
+
+    def languages(self):
+        """Count the tracks of each language.
+
+        Returns
+        -------
+        :obj:`collections.Counter`
+            The number of tracks keyed by language.
+        """
+        return Counter(track.language for _, track in self.tracks())
+
+    def save(self, file_path):
+        """Save the library to a file.
+
+        The file is replaced atomically, so an interrupted save never leaves a partial library behind.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the file to save the library to.
+        """
+        file_path = abspath(expanduser(file_path))
+        library = {
+            'root': self.root,
+            'extensions': sorted(self.extensions) if self.extensions is not None else None,
+            'entries': [[entry.path, entry.size, entry.mtime_ns, entry.container, entry.supported,
+                         [list(track) for track in entry.tracks],
+                         [list(attachment) for attachment in entry.attachments]]
+                        for entry in self.entries.values()],
+        }
+        fd, temp_path = mkstemp(prefix='.pymkv-', suffix='.json', dir=dirname(file_path))
+        try:
+            with open(fd, 'w', encoding='utf-8') as library_file:
+                json.dump(library, library_file, separators=(',', ':'))
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, file_path, **kwargs):
+        """Load a library saved with :meth:`~pymkv.scan.Library.save`.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the saved library.
+        **kwargs
+            The other parameters of :class:`~pymkv.scan.Library`.
+
+        Returns
+        -------
+        :class:`~pymkv.scan.Library`
+            The library with the saved entries.
+        """
+        with open(expanduser(file_path), encoding='utf-8') as library_file:
+            library = json.load(library_file)
+        kwargs.setdefault('extensions', library['extensions'])
+        loaded = cls(library['root'], **kwargs)
+        for path, size, mtime_ns, container, supported, tracks, attachments in library['entries']:
+            loaded.entries[path] = LibraryEntry(path, size, mtime_ns, container, supported,
+                                                tuple(LibraryTrack(track_id, intern(track_type), intern(track_codec),
+                                                                   track_name, _intern(language), default_track,
+                                                                   forced_track)
+                                                      for track_id, track_type, track_codec, track_name, language,
+                                                      default_track, forced_track in tracks),
+                                                tuple(LibraryAttachment(*attachment) for attachment in attachments))
+        return loaded
+
+    def _walk(self):
+        # depth first walk with one open directory at a time, yielding the error of anything that can't be read
+        directories = [self.root]
+        while directories:
+            directory = directories.pop()
+            try:
+                with os.scandir(directory) as scanned:
+                    dir_entries = list(scanned)
+            except OSError as error:
+                yield directory, None, error
+                continue
+            for dir_entry in dir_entries:
+                try:
+                    if dir_entry.is_dir(follow_symlinks=self.follow_symlinks):
+                        directories.append(dir_entry.path)
+                    elif (dir_entry.is_file(follow_symlinks=self.follow_symlinks)
+                          and (self.extensions is None or splitext(dir_entry.name)[1].lower() in self.extensions)):
+                        yield dir_entry.path, dir_entry.stat(follow_symlinks=self.follow_symlinks), None
+                except OSError as error:
+                    yield dir_entry.path, None, error
+
+    def _identify(self, path, stat):
+        info_json = identify(path, mkvmerge_path=self.mkvmerge_path, timeout=self.timeout)
+        tracks = tuple(LibraryTrack(track['id'], intern(track['type']), intern(track['codec']),
+                                    track['properties'].get('track_name'), _intern(track['properties'].get('language')),
+                                    track['properties'].get('default_track', False),
+                                    track['properties'].get('forced_track', False))
+                       for track in info_json.get('tracks', ()))
+        attachments = tuple(LibraryAttachment(attachment.get('file_name'), attachment.get('content_type'),
+                                              attachment.get('size'))
+                            for attachment in info_json.get('attachments', ()))
+        return LibraryEntry(path, stat.st_size, stat.st_mtime_ns, info_json['container'].get('type'),
+                            info_json['container']['supported'], tracks, attachments)
+
+    def _finish(self, path, future):
+        try:
+            entry = future.result()
+        except Exception as error:
+            # one bad file, such as unexpected mkvmerge output, must not stop the scan
+            return ScanResult(FAILED, path, None, error)
+        status = CHANGED if path in self.entries else ADDED
+        self.entries[path] = entry
+        return ScanResult(status, path, entry, None)
@@ -47,4 +47,7 @@ setup(
     use_scm_version=True,
     setup_requires=setup_requires,
     install_requires=install_requires,
+    extras_require={
+        'numpy': ['numpy'],
+    },
 )
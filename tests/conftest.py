@@ -0,0 +1,91 @@
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+from pymkv.cache import probe_cache
+from pymkv.Verifications import invalidate_executables
+
+
+# answers -V and --help like MKVToolNix, -J from a JSON file of identifications, and any other command as a success
+FAKE_TOOL = '''#!{python}
+import json
+import os
+import sys
+
+name = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+with open(os.environ['PYMKV_TEST_LOG'], 'a') as log_file:
+    log_file.write(json.dumps([name] + args) + '\\n')
+if args == ['-V']:
+    print(name + " v70.0.0 ('Caught A Lite Sneeze') 64-bit")
+elif args == ['--help']:
+    print('  -o, --output out\\n  --gui-mode\\n  --track-order\\n  -J <file>')
+elif len(args) == 2 and args[0] == '-J':
+    with open(os.environ['PYMKV_TEST_IDENTIFY']) as identify_file:
+        identifications = json.load(identify_file)
+    if args[1] not in identifications:
+        print('Error: The file could not be opened.')
+        sys.exit(2)
+    print(json.dumps(identifications[args[1]]))
+else:
+    print('Progress: 100%')
+'''
+
+
+class FakeTools:
+    """Fake mkvmerge, mkvpropedit, and mkvextract executables first in $PATH.
+
+    Every call is logged, and ``mkvmerge -J`` answers with the identifications given to
+    :meth:`~FakeTools.identify_as`.
+    """
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self.log_path = os.path.join(self.directory, 'calls.log')
+        self.identify_path = os.path.join(self.directory, 'identify.json')
+        self._identifications = {}
+        open(self.log_path, 'w').close()
+        self._save()
+        for name in ('mkvmerge', 'mkvpropedit', 'mkvextract'):
+            path = os.path.join(self.directory, name)
+            with open(path, 'w') as tool_file:
+                tool_file.write(FAKE_TOOL.format(python=sys.executable))
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+    def identify_as(self, file_path, info_json):
+        """Make ``mkvmerge -J file_path`` print `info_json`."""
+        self._identifications[file_path] = info_json
+        self._save()
+
+    def calls(self, name='mkvmerge'):
+        """Get the arguments of every call to a tool."""
+        with open(self.log_path) as log_file:
+            calls = [json.loads(line) for line in log_file]
+        return [call[1:] for call in calls if call[0] == name]
+
+    def _save(self):
+        with open(self.identify_path, 'w') as identify_file:
+            json.dump(self._identifications, identify_file)
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    probe_cache.clear()
+    invalidate_executables()
+    yield
+    probe_cache.clear()
+    invalidate_executables()
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    directory = tmp_path / 'bin'
+    directory.mkdir()
+    fake_tools = FakeTools(directory)
+    monkeypatch.setenv('PATH', fake_tools.directory + os.pathsep + os.environ.get('PATH', ''))
+    monkeypatch.setenv('PYMKV_TEST_LOG', fake_tools.log_path)
+    monkeypatch.setenv('PYMKV_TEST_IDENTIFY', fake_tools.identify_path)
+    return fake_tools
@@ -0,0 +1,240 @@
+"""Write small synthetic Matroska files and the identification mkvmerge reports for them.
+
+The files only hold the elements pymkv reads: a SeekHead, the Segment Info, Tracks, one Cluster with a single block,
+Attachments, and Chapters. Where the SeekHead and Tracks are placed, unknown sizes, and truncation can be chosen to
+cover the layouts that real muxers write.
+"""
+
+import struct
+
+from pymkv import ebml
+
+
+# a SeekHead position is always written with 8 bytes so the size of a SeekHead only depends on its number of entries
+_POSITION_SIZE = 8
+_UNKNOWN_SIZE = b'\x01\xff\xff\xff\xff\xff\xff\xff'
+
+# elements pymkv skips when it identifies a file
+_CLUSTER_TIMESTAMP = 0xE7
+_SIMPLE_BLOCK = 0xA3
+_CHAPTER_UID = 0x73C4
+_CHAPTER_TIME_START = 0x91
+_CHAPTER_DISPLAY = 0x80
+_CHAP_STRING = 0x85
+_CHAP_LANGUAGE = 0x437C
+_DOC_TYPE_VERSION = 0x4287
+_DOC_TYPE_READ_VERSION = 0x4285
+
+TRACKS = (
+    {'type': 1, 'codec_id': 'V_MPEG4/ISO/AVC', 'language': 'und', 'name': None, 'default': True, 'forced': False,
+     'video': (1920, 1080)},
+    {'type': 2, 'codec_id': 'A_AAC', 'language': 'jpn', 'name': 'Stereo', 'default': True, 'forced': False,
+     'audio': (48000.0, 2)},
+    {'type': 17, 'codec_id': 'S_TEXT/ASS', 'language': 'eng', 'name': 'Signs', 'default': False, 'forced': True},
+)
+
+ATTACHMENTS = (
+    {'name': 'font.ttf', 'mime_type': 'font/ttf', 'uid': 42, 'data': b'F' * 300},
+    {'name': 'cover.jpg', 'mime_type': 'image/jpeg', 'uid': 43, 'data': b'J' * 100},
+)
+
+# the start times in milliseconds of the chapters of each edition
+CHAPTERS = (
+    (0, 60000, 120000),
+    (0,),
+)
+
+
+def vint(value, length=None):
+    """Encode an EBML variable size integer."""
+    length = length or next(length for length in range(1, 9) if value < (1 << (7 * length)) - 1)
+    return ((1 << (7 * length)) | value).to_bytes(length, 'big')
+
+
+def element(element_id, payload, unknown_size=False):
+    """Encode an element."""
+    header = element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big')
+    return header + (_UNKNOWN_SIZE if unknown_size else vint(len(payload))) + payload
+
+
+def uint(element_id, value):
+    """Encode an unsigned integer element."""
+    return element(element_id, value.to_bytes(max(1, (value.bit_length() + 7) // 8), 'big'))
+
+
+def string(element_id, value):
+    """Encode a string element."""
+    return element(element_id, value.encode('utf-8'))
+
+
+def float64(element_id, value):
+    """Encode a float element."""
+    return element(element_id, struct.pack('>d', value))
+
+
+def seek_head(entries):
+    """Encode a SeekHead from (element ID, position) pairs."""
+    return element(ebml.SEEK_HEAD, b''.join(
+        element(ebml.SEEK, element(ebml.SEEK_ID, element_id.to_bytes(4, 'big')) +
+                element(ebml.SEEK_POSITION, position.to_bytes(_POSITION_SIZE, 'big')))
+        for element_id, position in entries))
+
+
+def write(path, seek='before', seek_tracks=True, tracks_after_clusters=False, unknown_size_segment=False,
+          unknown_size_cluster=False, truncate=0, title='Synthetic', tracks=TRACKS, attachments=ATTACHMENTS,
+          chapters=CHAPTERS):
+    """Write a Matroska file and get the identification mkvmerge reports for it.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file to write.
+    seek : str, None
+        'before' writes one SeekHead before the Clusters listing every metadata element. 'after' writes a SeekHead
+        before the Clusters that only points to a second SeekHead after them, which lists every metadata element.
+        None writes no SeekHead.
+    seek_tracks : bool
+        List the Tracks in the SeekHead.
+    tracks_after_clusters : bool
+        Write the Tracks after the Clusters.
+    unknown_size_segment, unknown_size_cluster : bool
+        Write the size of the Segment or of the Cluster as unknown.
+    truncate : int
+        The number of bytes cut from the end of the file.
+
+    Returns
+    -------
+    dict
+        The parts of the ``mkvmerge -J`` output for the file that pymkv reads.
+    """
+    info = element(ebml.INFO, uint(ebml.TIMESTAMP_SCALE, 1000000) + float64(ebml.DURATION, 5000.0) +
+                   string(ebml.TITLE, title) + string(ebml.MUXING_APP, 'libebml v1.4.4 + libmatroska v1.7.1') +
+                   string(ebml.WRITING_APP, 'mkvmerge v70.0.0'))
+    tracks_element = element(ebml.TRACKS, b''.join(_track(number, track) for number, track in enumerate(tracks, 1)))
+    cluster = element(ebml.CLUSTER, uint(_CLUSTER_TIMESTAMP, 0) + element(_SIMPLE_BLOCK, b'\x81\x00\x00\x80' + b'x' * 64),
+                      unknown_size=unknown_size_cluster)
+    attachments_element = element(ebml.ATTACHMENTS, b''.join(
+        element(ebml.ATTACHED_FILE, string(ebml.FILE_NAME, attachment['name']) +
+                string(ebml.FILE_MIME_TYPE, attachment['mime_type']) + uint(ebml.FILE_UID, attachment['uid']) +
+                element(ebml.FILE_DATA, attachment['data']))
+        for attachment in attachments)) if attachments else b''
+    chapters_element = element(ebml.CHAPTERS, b''.join(
+        element(ebml.EDITION_ENTRY, b''.join(
+            element(ebml.CHAPTER_ATOM, uint(_CHAPTER_UID, edition * 100 + number + 1) +
+                    uint(_CHAPTER_TIME_START, start * 1000000) +
+                    element(_CHAPTER_DISPLAY, string(_CHAP_STRING, 'Chapter {}'.format(number + 1)) +
+                            string(_CHAP_LANGUAGE, 'eng')))
+            for number, start in enumerate(starts)))
+        for edition, starts in enumerate(chapters))) if chapters else b''
+
+    # lay out the elements to find their positions, then write the SeekHeads pointing at them
+    before = [(ebml.INFO, info)] + ([] if tracks_after_clusters else [(ebml.TRACKS, tracks_element)])
+    after = ([(ebml.TRACKS, tracks_element)] if tracks_after_clusters else []) + \
+        [(element_id, data) for element_id, data in ((ebml.ATTACHMENTS, attachments_element),
+                                                     (ebml.CHAPTERS, chapters_element)) if data]
+    indexed = [element_id for element_id, _ in before + after if seek_tracks or element_id != ebml.TRACKS]
+    if seek == 'before':
+        head_size, tail_size = len(seek_head([(0, 0)] * len(indexed))), 0
+    elif seek == 'after':
+        head_size, tail_size = len(seek_head([(0, 0)])), len(seek_head([(0, 0)] * len(indexed)))
+    else:
+        head_size, tail_size = 0, 0
+    positions = {}
+    position = head_size
+    for element_id, data in before:
+        positions[element_id] = position
+        position += len(data)
+    position += len(cluster)
+    for element_id, data in after:
+        positions[element_id] = position
+        position += len(data)
+    entries = [(element_id, positions[element_id]) for element_id in indexed]
+    if seek == 'before':
+        head, tail = seek_head(entries), b''
+    elif seek == 'after':
+        head, tail = seek_head([(ebml.SEEK_HEAD, position)]), seek_head(entries)
+    else:
+        head, tail = b'', b''
+    assert len(head) == head_size and len(tail) == tail_size
+
+    body = head + b''.join(data for _, data in before) + cluster + b''.join(data for _, data in after) + tail
+    header = element(ebml.EBML, string(ebml.DOC_TYPE, 'matroska') + uint(_DOC_TYPE_VERSION, 4) + uint(_DOC_TYPE_READ_VERSION, 2))
+    segment = ebml.SEGMENT.to_bytes(4, 'big') + (_UNKNOWN_SIZE if unknown_size_segment else vint(len(body), 8))
+    data = header + segment + body
+    with open(path, 'wb') as matroska_file:
+        matroska_file.write(data[:len(data) - truncate])
+    return identification(path, title, tracks, attachments, chapters)
+
+
+def identification(path, title='Synthetic', tracks=TRACKS, attachments=ATTACHMENTS, chapters=CHAPTERS):
+    """Get the parts of the ``mkvmerge -J`` output pymkv reads for a file written by :func:`write`."""
+    identified_tracks = []
+    for track_id, track in enumerate(tracks):
+        properties = {
+            'codec_id': track['codec_id'],
+            'default_track': track['default'],
+            'enabled_track': True,
+            'forced_track': track['forced'],
+            'language': track['language'],
+            'number': track_id + 1,
+            'uid': 1000 + track_id,
+        }
+        if track['name'] is not None:
+            properties['track_name'] = track['name']
+        if 'video' in track:
+            properties['pixel_dimensions'] = properties['display_dimensions'] = '{}x{}'.format(*track['video'])
+        if 'audio' in track:
+            properties['audio_sampling_frequency'] = int(track['audio'][0])
+            properties['audio_channels'] = track['audio'][1]
+        identified_tracks.append({
+            'codec': ebml.codec_name(track['codec_id']),
+            'id': track_id,
+            'properties': properties,
+            'type': ebml.TRACK_TYPES[track['type']],
+        })
+    return {
+        'attachments': [{'content_type': attachment['mime_type'], 'file_name': attachment['name'], 'id': number,
+                         'properties': {'uid': attachment['uid']}, 'size': len(attachment['data'])}
+                        for number, attachment in enumerate(attachments, 1)],
+        'chapters': [{'num_entries': len(starts)} for starts in chapters],
+        'container': {
+            'properties': {
+                'duration': 5000000000,
+                'muxing_application': 'libebml v1.4.4 + libmatroska v1.7.1',
+                'title': title,
+                'writing_application': 'mkvmerge v70.0.0',
+            },
+            'recognized': True,
+            'supported': True,
+            'type': 'Matroska',
+        },
+        'errors': [],
+        'file_name': path,
+        'tracks': identified_tracks,
+        'warnings': [],
+    }
+
+
+def contains(actual, expected):
+    """Check that `actual` has every value of `expected`, allowing extra keys in dicts."""
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and all(key in actual and contains(actual[key], value)
+                                                for key, value in expected.items())
+    if isinstance(expected, list):
+        return (isinstance(actual, list) and len(actual) == len(expected)
+                and all(contains(a, e) for a, e in zip(actual, expected)))
+    return actual == expected
+
+
+def _track(number, track):
+    data = (uint(ebml.TRACK_NUMBER, number) + uint(ebml.TRACK_UID, 999 + number) + uint(ebml.TRACK_TYPE, track['type'])
+            + string(ebml.CODEC_ID, track['codec_id']) + string(ebml.LANGUAGE, track['language'])
+            + uint(ebml.FLAG_DEFAULT, int(track['default'])) + uint(ebml.FLAG_FORCED, int(track['forced'])))
+    if track['name'] is not None:
+        data += string(ebml.NAME, track['name'])
+    if 'video' in track:
+        data += element(ebml.VIDEO, uint(ebml.PIXEL_WIDTH, track['video'][0]) + uint(ebml.PIXEL_HEIGHT, track['video'][1]))
+    if 'audio' in track:
+        data += element(ebml.AUDIO, float64(ebml.SAMPLING_FREQUENCY, track['audio'][0]) +
+                        uint(ebml.CHANNELS, track['audio'][1]))
+    return element(ebml.TRACK_ENTRY, data)
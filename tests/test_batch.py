@@ -0,0 +1,62 @@
+import pytest
+
+from pymkv import MKVFile
+from pymkv.batch import MuxQueue
+
+from tests import matroska
+
+
+@pytest.fixture
+def files(tools, tmp_path):
+    mkv_files = []
+    for name in ('a.mkv', 'b.mkv', 'c.mkv'):
+        path = str(tmp_path / name)
+        matroska.write(path)
+        mkv_files.append(MKVFile(path))
+    return mkv_files
+
+
+def test_queue_runs_every_job(tools, files, tmp_path):
+    queue = MuxQueue(workers=2, per_volume=1, retry_delay=0)
+    for number, mkv in enumerate(files):
+        queue.add(mkv, str(tmp_path / 'out{}.mkv'.format(number)))
+    results = queue.run()
+    assert len(queue) == 0
+    assert [result.output_path for result in results] == [str(tmp_path / 'out{}.mkv'.format(number))
+                                                          for number in range(3)]
+    assert all(result.success and result.attempts == 1 for result in results)
+    assert sorted(call[call.index('-o') + 1] for call in tools.calls() if '-o' in call) == \
+        [result.output_path for result in results]
+
+
+def test_queue_records_a_failing_job_and_keeps_going(tools, files, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('broken job')
+
+    monkeypatch.setattr(files[1], 'command', fail)
+    queue = MuxQueue(workers=1, retry_delay=0)
+    for number, mkv in enumerate(files):
+        queue.add(mkv, str(tmp_path / 'out{}.mkv'.format(number)))
+    results = queue.run()
+    assert [result.success for result in results] == [True, False, True]
+    assert isinstance(results[1].error, RuntimeError)
+    assert results[1].returncode is None and results[1].attempts == 1
+
+
+def test_queue_retries_transient_errors(files, tmp_path, monkeypatch):
+    attempts = []
+
+    def interrupted(*args, **kwargs):
+        attempts.append(None)
+        raise InterruptedError(4, 'Interrupted system call')
+
+    monkeypatch.setattr(files[0], 'command', interrupted)
+    queue = MuxQueue(retries=2, retry_delay=0)
+    queue.add(files[0], str(tmp_path / 'out.mkv'))
+    result, = queue.run()
+    assert not result.success and result.attempts == 3 and len(attempts) == 3
+
+
+def test_queue_rejects_invalid_volume_limits():
+    with pytest.raises(ValueError):
+        MuxQueue(per_volume=0)
@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+from pymkv.cache import ProbeCache, ProbeStore, file_identity, probe_cache
+from pymkv.Verifications import identify
+
+
+VERSION = "mkvmerge v70.0.0 ('Caught A Lite Sneeze') 64-bit"
+
+
+def _info(path, title='Probe'):
+    return {'container': {'properties': {'title': title}}, 'file_name': path, 'tracks': []}
+
+
+@pytest.fixture
+def media(tools, tmp_path):
+    paths = []
+    for name in ('a.mkv', 'b.mkv', 'c.mkv'):
+        path = str(tmp_path / name)
+        with open(path, 'wb') as media_file:
+            media_file.write(b'not matroska ' + name.encode())
+        tools.identify_as(path, _info(path))
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def store(tmp_path):
+    probe_store = ProbeStore(str(tmp_path / 'probes.db'))
+    probe_cache.store = probe_store
+    yield probe_store
+    probe_cache.store = None
+    probe_store.close()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    paths = []
+    for name in ('a', 'b', 'c'):
+        paths.append(str(tmp_path / name))
+        open(paths[-1], 'w').close()
+    cache = ProbeCache(maxsize=2)
+    for path in paths[:2]:
+        cache.put(cache.key(path), _info(path))
+    assert cache.get(cache.key(paths[0])) is not None
+    cache.put(cache.key(paths[2]), _info(paths[2]))
+    assert cache.get(cache.key(paths[1])) is None
+    assert cache.info() == (1, 1, 2, 2)
+
+    cache.maxsize = 0
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        cache.maxsize = -1
+
+
+def test_cache_forgets_changed_files(tmp_path):
+    path = str(tmp_path / 'a')
+    with open(path, 'w') as media_file:
+        media_file.write('a')
+    cache = ProbeCache()
+    cache.put(cache.key(path), _info(path, 'old'))
+    with open(path, 'w') as media_file:
+        media_file.write('changed')
+    assert cache.get(cache.key(path)) is None
+    cache.put(cache.key(path), _info(path, 'new'))
+    assert len(cache) == 1
+
+
+def test_identify_runs_mkvmerge_once_per_file(tools, media):
+    for _ in range(3):
+        assert identify(media[0]) == _info(media[0])
+    assert tools.calls() == [['-J', media[0]]]
+
+
+def test_store_checks_identity_and_version(store, media):
+    store.put(media[0], VERSION, _info(media[0]))
+    assert store.get(media[0], VERSION) == _info(media[0])
+    assert store.get(media[0], 'mkvmerge v71.0.0') is None
+
+    with open(media[0], 'ab') as media_file:
+        media_file.write(b'changed')
+    assert store.get(media[0], VERSION) is None
+
+    store.put(media[1], VERSION, _info(media[1]))
+    store.invalidate(media[1])
+    assert store.get(media[1], VERSION) is None
+
+
+def test_store_evicts_least_recently_used(tmp_path, media):
+    probe_store = ProbeStore(str(tmp_path / 'probes.db'), max_entries=2)
+    probe_store._write([file_identity(path) + (VERSION, '{}') for path in media])
+    assert len(probe_store) == 2
+    probe_store.clear()
+    assert len(probe_store) == 0
+    probe_store.close()
+
+
+def test_store_is_shared_between_caches(tools, store, media):
+    assert identify(media[0]) == _info(media[0])
+    probe_cache.clear()
+    assert identify(media[0]) == _info(media[0])
+    assert [call for call in tools.calls() if call[0] == '-J'] == [['-J', media[0]]]
+    assert ProbeStore(store.db_path).get(media[0], VERSION) == _info(media[0])
+
+
+def test_warm_writes_each_result_once(tools, store, media, monkeypatch):
+    writes = []
+    write = store._write
+
+    def counted_write(rows):
+        writes.append(len(rows))
+        write(rows)
+
+    monkeypatch.setattr(store, '_write', counted_write)
+    store.put(media[0], VERSION, _info(media[0]))
+    missing = str(os.path.join(os.path.dirname(media[0]), 'missing.mkv'))
+    assert store.warm(media + [missing], workers=2) == 2
+    assert writes == [1, 2]
+    assert sorted(call[1] for call in tools.calls() if call[0] == '-J') == media[1:]
+    assert store.warm(media) == 0
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from pymkv import MKVFile
+
+from tests import matroska
+
+
+@pytest.fixture
+def mkv(tools, tmp_path):
+    path = str(tmp_path / 'file.mkv')
+    matroska.write(path)
+    return MKVFile(path)
+
+
+def test_imported_file_is_clean(mkv):
+    assert mkv.changes() == {}
+    assert not mkv.is_dirty()
+    mkv.title = None
+    mkv.tracks[0].language = None
+    assert not mkv.is_dirty()
+
+
+def test_changes_name_the_changed_properties(mkv):
+    mkv.title = 'New title'
+    mkv.tracks[1].language = 'fre'
+    mkv.tracks[2].default_track = True
+    assert mkv.changes() == {
+        'title': ('Synthetic', 'New title'),
+        'tracks[1].language': ('jpn', 'fre'),
+        'tracks[2].default_track': (False, True),
+    }
+    mkv.tracks[1].language = 'jpn'
+    mkv.tracks[2].default_track = False
+    mkv.title = 'Synthetic'
+    assert not mkv.is_dirty()
+
+    mkv.move_track_front(2)
+    assert list(mkv.changes()) == ['tracks']
+
+
+def test_new_file_is_dirty(mkv):
+    new = MKVFile()
+    assert not new.is_dirty()
+    new.add_track(mkv.tracks[0])
+    assert new.is_dirty()
+
+
+@pytest.mark.parametrize('unchanged', ['skip', 'link', 'copy'])
+def test_unchanged_file_is_not_muxed(tools, mkv, tmp_path, unchanged):
+    output_path = str(tmp_path / 'out.mkv')
+    assert not mkv.mux(output_path, silent=True, unchanged=unchanged)
+    assert [call for call in tools.calls() if '-o' in call] == []
+    if unchanged == 'skip':
+        assert not os.path.exists(output_path)
+    else:
+        with open(output_path, 'rb') as output, open(mkv._file_path, 'rb') as original:
+            assert output.read() == original.read()
+        assert os.path.samefile(output_path, mkv._file_path) == (unchanged == 'link')
+
+
+def test_changed_file_is_muxed(tools, mkv, tmp_path):
+    mkv.tracks[0].track_name = 'Video'
+    assert mkv.mux(str(tmp_path / 'out.mkv'), silent=True, unchanged='skip')
+    assert [call for call in tools.calls() if '-o' in call]
+    with pytest.raises(ValueError):
+        mkv.mux(str(tmp_path / 'out.mkv'), silent=True, unchanged='move')
@@ -0,0 +1,77 @@
+import pytest
+
+from pymkv import MKVFile, MKVTrack
+
+from tests import matroska
+
+
+@pytest.fixture
+def paths(tools, tmp_path):
+    file_paths = [str(tmp_path / 'a.mkv'), str(tmp_path / 'b.mkv')]
+    for path in file_paths:
+        matroska.write(path)
+    return file_paths
+
+
+def _inputs(command, paths):
+    return [argument for argument in command if argument in paths]
+
+
+def test_tracks_of_one_file_share_an_input(paths):
+    mkv = MKVFile()
+    for path, track_id in ((paths[0], 0), (paths[1], 1), (paths[0], 1)):
+        mkv.add_track(MKVTrack(path, track_id))
+    command = mkv.command('out.mkv', subprocess=True)
+    assert _inputs(command, paths) == [paths[0], paths[1]]
+    assert command[command.index('--track-order') + 1] == '0:0,1:1,0:1'
+    first_input = command[:command.index(paths[0])]
+    assert first_input[first_input.index('-d') + 1] == '0' and first_input[first_input.index('-a') + 1] == '1'
+
+
+def test_tracks_in_file_order_need_no_track_order(paths):
+    mkv = MKVFile()
+    for path, track_id in ((paths[0], 0), (paths[0], 2), (paths[1], 1)):
+        mkv.add_track(MKVTrack(path, track_id))
+    command = mkv.command('out.mkv', subprocess=True)
+    assert _inputs(command, paths) == paths
+    assert '--track-order' not in command
+
+
+def test_same_track_twice_needs_two_inputs(paths):
+    mkv = MKVFile()
+    mkv.add_track(MKVTrack(paths[0], 1))
+    mkv.add_track(MKVTrack(paths[0], 1))
+    command = mkv.command('out.mkv', subprocess=True)
+    assert _inputs(command, paths) == [paths[0], paths[0]]
+    assert '--track-order' not in command
+
+
+def test_different_exclusions_need_separate_inputs(paths):
+    mkv = MKVFile()
+    mkv.add_track(MKVTrack(paths[0], 0))
+    mkv.add_track(MKVTrack(paths[0], 1))
+    mkv.tracks[1].no_chapters = True
+    command = mkv.command('out.mkv', subprocess=True)
+    assert _inputs(command, paths) == [paths[0], paths[0]]
+    assert command.count('--no-chapters') == 1
+
+
+def test_minimal_command_leaves_out_unchanged_options(paths):
+    mkv = MKVFile(paths[0])
+    assert mkv.command('out.mkv', subprocess=True, minimal=True) == ['mkvmerge', '-o', 'out.mkv', paths[0]]
+    assert '--language' in mkv.command('out.mkv', subprocess=True)
+
+    mkv.tracks[1].language = 'fre'
+    mkv.remove_track(2)
+    assert mkv.command('out.mkv', subprocess=True, minimal=True) == [
+        'mkvmerge', '-o', 'out.mkv', '--language', '1:fre', '-S', paths[0]]
+
+
+def test_track_options_are_cached_until_changed(paths):
+    track = MKVTrack(paths[0], 1, default_track=True)
+    options = track.options()
+    assert track.options() is options
+    assert track.options(minimal=True) == []
+    track.track_name = 'Commentary'
+    assert track.options() is not options
+    assert track.options(minimal=True) == ['--track-name', '1:Commentary']
@@ -0,0 +1,81 @@
+import pytest
+
+from pymkv import ebml
+from pymkv.cache import probe_cache
+from pymkv.Verifications import identify
+
+from tests import matroska
+
+
+def _metadata(info_json):
+    return {key: info_json[key] for key in ('container', 'tracks', 'attachments', 'chapters')}
+
+
+@pytest.mark.parametrize('layout', [
+    {'seek': 'before'},
+    {'seek': 'after'},
+    {'seek': 'before', 'tracks_after_clusters': True},
+    {'seek': 'after', 'tracks_after_clusters': True},
+    {'seek': 'before', 'unknown_size_cluster': True},
+    {'seek': 'after', 'unknown_size_segment': True, 'unknown_size_cluster': True},
+])
+def test_identify_follows_seek_heads(tmp_path, layout):
+    path = str(tmp_path / 'file.mkv')
+    expected = matroska.write(path, **layout)
+    assert matroska.contains(ebml.identify(path), _metadata(expected))
+
+
+@pytest.mark.parametrize('layout', [
+    {'seek': None},
+    {'seek': None, 'tracks_after_clusters': True},
+    {'seek': 'before', 'tracks_after_clusters': True, 'seek_tracks': False},
+])
+def test_identify_rejects_metadata_it_cannot_find(tmp_path, layout):
+    path = str(tmp_path / 'file.mkv')
+    matroska.write(path, **layout)
+    with pytest.raises(ebml.EBMLError):
+        ebml.identify(path)
+
+
+@pytest.mark.parametrize('layout', [
+    {'seek': 'before', 'truncate': 20},
+    {'seek': 'after', 'truncate': 5},
+])
+def test_identify_rejects_truncated_files(tmp_path, layout):
+    path = str(tmp_path / 'file.mkv')
+    matroska.write(path, **layout)
+    with pytest.raises(ebml.EBMLError):
+        ebml.identify(path)
+
+
+def test_identify_rejects_other_files(tmp_path):
+    path = tmp_path / 'file.mkv'
+    path.write_bytes(b'RIFF' + bytes(60))
+    assert not ebml.is_matroska(str(path))
+    with pytest.raises(ebml.EBMLError):
+        ebml.identify(str(path))
+
+
+def test_native_identification_matches_mkvmerge(tools, tmp_path):
+    path = str(tmp_path / 'file.mkv')
+    expected = matroska.write(path, seek='after', tracks_after_clusters=True)
+    tools.identify_as(path, expected)
+
+    native = identify(path)
+    assert tools.calls() == []
+    probe_cache.clear()
+    mkvmerge = identify(path, native=False)
+    assert tools.calls() == [['-J', path]]
+    assert matroska.contains(native, _metadata(mkvmerge))
+
+
+@pytest.mark.parametrize('layout', [
+    {'seek': None},
+    {'seek': 'before', 'truncate': 20},
+])
+def test_identify_falls_back_to_mkvmerge(tools, tmp_path, layout):
+    path = str(tmp_path / 'file.mkv')
+    expected = matroska.write(path, **layout)
+    tools.identify_as(path, expected)
+    assert identify(path) == expected
+    assert tools.calls() == [['-J', path]]
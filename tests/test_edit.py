@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from pymkv import MKVFile
+
+from tests import matroska
+
+
+@pytest.fixture
+def mkv(tools, tmp_path):
+    path = str(tmp_path / 'file.mkv')
+    tools.identify_as(path, matroska.write(path))
+    return MKVFile(path)
+
+
+def test_header_changes_are_edited_in_place(tools, mkv):
+    mkv.title = 'New title'
+    mkv.tracks[1].language = 'fre'
+    mkv.tracks[2].track_name = 'Full'
+    mkv.tracks[2].forced_track = False
+    assert mkv.apply_in_place(silent=True)
+    assert tools.calls('mkvpropedit') == [['-V'], [
+        mkv._file_path, '--edit', 'info', '--set', 'title=New title',
+        '--edit', 'track:@2', '--set', 'language=fre',
+        '--edit', 'track:@3', '--set', 'name=Full', '--set', 'flag-forced=0',
+    ]]
+    assert [call for call in tools.calls() if '-o' in call] == []
+
+
+def test_unchanged_file_is_not_edited(tools, mkv):
+    assert mkv.apply_in_place(silent=True)
+    assert tools.calls('mkvpropedit') == []
+
+
+def test_other_changes_are_muxed_and_replace_the_file(tools, mkv, tmp_path):
+    mkv.remove_track(2)
+    assert not mkv.apply_in_place(silent=True)
+    assert tools.calls('mkvpropedit') == []
+    mux, = [call for call in tools.calls() if '-o' in call]
+    temp_path = mux[mux.index('-o') + 1]
+    assert os.path.dirname(temp_path) == str(tmp_path) and not os.path.exists(temp_path)
+    assert sorted(os.listdir(str(tmp_path))) == ['bin', 'file.mkv']
+
+
+def test_split_files_can_not_be_edited_in_place(mkv):
+    mkv.split_size(1000)
+    with pytest.raises(ValueError):
+        mkv.apply_in_place(silent=True)
+    with pytest.raises(ValueError):
+        MKVFile().apply_in_place(silent=True)
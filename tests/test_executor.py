@@ -0,0 +1,120 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import subprocess as sp
+import threading
+import time
+
+import pytest
+
+from pymkv import MKVFile
+from pymkv.executor import Executor, PooledExecutor, ReplayExecutor, SubprocessExecutor, get_executor, set_executor
+from pymkv.Verifications import verify_mkvmerge
+
+from tests import matroska
+
+
+class SleepExecutor(Executor):
+    """Pretends every process takes a while and counts how many run at once."""
+
+    def __init__(self):
+        self.running = 0
+        self.most_running = 0
+        self._lock = threading.Lock()
+
+    def run(self, args, stdout=sp.PIPE, stderr=None, check=True, timeout=None):
+        with self._lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(0.02)
+        with self._lock:
+            self.running -= 1
+        return sp.CompletedProcess(args, 0, b'', None)
+
+    def stream(self, args):
+        yield from self.run(args).stdout.splitlines(keepends=True)
+
+
+@pytest.fixture(autouse=True)
+def default_executor():
+    yield
+    set_executor(None)
+
+
+def test_executors_must_run_and_stream():
+    class RunOnly(Executor):
+        def run(self, args, stdout=sp.PIPE, stderr=None, check=True, timeout=None):
+            pass
+
+    with pytest.raises(TypeError):
+        Executor()
+    with pytest.raises(TypeError):
+        RunOnly()
+    with pytest.raises(TypeError):
+        set_executor(object())
+
+
+def test_pooled_executor_limits_running_processes():
+    inner = SleepExecutor()
+    pooled = PooledExecutor(inner, max_processes=2)
+    with ThreadPoolExecutor(8) as threads:
+        list(threads.map(lambda number: pooled.run(['tool', str(number)]), range(8)))
+    assert inner.most_running == 2
+    with pytest.raises(ValueError):
+        PooledExecutor(max_processes=0)
+
+
+def test_pooled_coroutines_do_not_hold_threads_while_waiting():
+    inner = SleepExecutor()
+    pooled = PooledExecutor(inner, max_processes=1)
+
+    async def run_all():
+        asyncio.get_event_loop().set_default_executor(ThreadPoolExecutor(4))
+        return await asyncio.wait_for(asyncio.gather(*(pooled.arun(['tool', str(number)]) for number in range(8))),
+                                      timeout=10)
+
+    assert len(asyncio.run(run_all())) == 8
+    assert inner.most_running == 1
+
+
+def test_pooled_executor_limits_the_start_rate():
+    pooled = PooledExecutor(SleepExecutor(), rate=50)
+    start = time.monotonic()
+    for number in range(5):
+        pooled.run(['tool', str(number)])
+    assert time.monotonic() - start >= 4 / 50
+
+
+def test_recorded_workload_replays_without_the_files_or_mkvmerge(tools, tmp_path, monkeypatch):
+    path = str(tmp_path / 'file.mkv')
+    tools.identify_as(path, matroska.write(path))
+    # an executable verified before recording must still be recorded
+    assert verify_mkvmerge()
+
+    recorder = ReplayExecutor(str(tmp_path / 'recording.json'), record=True)
+    set_executor(recorder)
+    recorded = MKVFile(path)
+    tracks = [(track.track_type, track.language) for track in recorded.tracks]
+    recorded.tracks[1].language = 'fre'
+    recorded.mux(str(tmp_path / 'out.mkv'), silent=True)
+    recorder.save()
+    calls = tools.calls()
+
+    os.remove(path)
+    monkeypatch.setenv('PATH', str(tmp_path / 'empty'))
+    replayer = ReplayExecutor(str(tmp_path / 'recording.json'))
+    set_executor(replayer)
+    replayed = MKVFile(path)
+    assert [(track.track_type, track.language) for track in replayed.tracks] == tracks
+    replayed.tracks[1].language = 'fre'
+    replayed.mux(str(tmp_path / 'out.mkv'), silent=True)
+    assert replayer.misses == 0 and replayer.hits > 0
+    assert tools.calls() == calls
+
+
+def test_replay_without_recording_fails(tmp_path):
+    set_executor(ReplayExecutor(str(tmp_path / 'missing.json')))
+    with pytest.raises(ValueError):
+        get_executor().run(['mkvmerge', '-V'])
+    set_executor(None)
+    assert isinstance(get_executor(), SubprocessExecutor)
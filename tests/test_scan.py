@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from pymkv import scan
+from pymkv.scan import ADDED, CHANGED, FAILED, REMOVED, UNCHANGED, Library
+
+from tests import matroska
+
+
+@pytest.fixture
+def root(tools, tmp_path):
+    library_root = tmp_path / 'library'
+    (library_root / 'season').mkdir(parents=True)
+    for path in ('a.mkv', 'season/b.mkv', 'season/c.mkv'):
+        matroska.write(str(library_root / path))
+    (library_root / 'notes.txt').write_text('not media')
+    return str(library_root)
+
+
+def _statuses(root, results):
+    return {os.path.relpath(result.path, root): result.status for result in results}
+
+
+def test_scan_only_identifies_new_and_changed_files(tools, root):
+    library = Library(root, workers=2)
+    assert _statuses(root, library.scan()) == {'a.mkv': ADDED, 'season/b.mkv': ADDED, 'season/c.mkv': ADDED}
+    assert library.languages() == {'und': 3, 'jpn': 3, 'eng': 3}
+    assert library.codecs()['AAC'] == 3
+
+    matroska.write(os.path.join(root, 'a.mkv'), title='Changed', attachments=())
+    os.remove(os.path.join(root, 'season', 'c.mkv'))
+    assert _statuses(root, library.scan()) == {'a.mkv': CHANGED, 'season/b.mkv': UNCHANGED, 'season/c.mkv': REMOVED}
+    assert len(library) == 2 and library.entries[os.path.join(root, 'a.mkv')].attachments == ()
+
+
+def test_scan_reports_files_that_fail(tools, root):
+    bad_path = os.path.join(root, 'bad.mkv')
+    with open(bad_path, 'wb') as bad_file:
+        bad_file.write(b'not matroska')
+    # mkvmerge answers with output that is missing the container
+    tools.identify_as(bad_path, {'tracks': []})
+    library = Library(root)
+    results = {result.path: result for result in library.scan()}
+    assert results[bad_path].status == FAILED and isinstance(results[bad_path].error, KeyError)
+    assert bad_path not in library.entries and len(library) == 3
+
+
+def test_scan_keeps_entries_of_unreadable_directories(tools, root, monkeypatch):
+    library = Library(root)
+    list(library.scan())
+    season = os.path.join(root, 'season')
+    scandir = os.scandir
+
+    def failing_scandir(path):
+        if path == season:
+            raise PermissionError(13, 'Permission denied', path)
+        return scandir(path)
+
+    monkeypatch.setattr(scan.os, 'scandir', failing_scandir)
+    failed = [result for result in library.scan() if result.status != UNCHANGED]
+    assert [(result.status, result.path) for result in failed] == [(FAILED, season)]
+    assert isinstance(failed[0].error, PermissionError)
+    assert len(library) == 3
+
+
+def test_saved_library_is_not_identified_again(tools, root, tmp_path):
+    library = Library(root)
+    list(library.scan())
+    library.save(str(tmp_path / 'library.json'))
+    calls = len(tools.calls())
+
+    loaded = Library.load(str(tmp_path / 'library.json'))
+    assert loaded.entries == library.entries
+    assert {result.status for result in loaded.scan()} == {UNCHANGED}
+    assert [call for call in tools.calls()[calls:] if call[0] == '-J'] == []